@@ -0,0 +1,204 @@
+# bench_hand.py
+"""
+Per-frame benchmarks for the gesture and overlay hot paths.
+
+    python bench_hand.py                       # run and print p50/p99
+    python bench_hand.py --save bench_baseline.json
+    python bench_hand.py --compare bench_baseline.json   # exit 1 on regression
+
+Fixtures are synthetic (hand_synth) unless --recording points at a
+hand_record.py recording.
+"""
+import argparse
+import itertools
+import json
+import platform
+import sys
+import time
+
+import numpy as np
+
+from hand_calc import HandCalc
+from hand_mouse import MouseController, RecordingBackend
+from hand_record import LandmarkRecording, ReplayImage
+from hand_smooth import HandSmoother
+from hand_synth import synth_dataset, to_landmarks, to_result
+from hand_utils import HandUtils
+from hand_vec import HandVec
+
+
+CALLBACK_TOGGLES = ("DRAW", "DRAW_LANDMARKS", "SHOW_BBOX", "TRACK_NUMBERS", "CALCULATOR", "MOUSE_CONTROL")
+
+
+def _timed(fn, items):
+    # Per-item wall time in microseconds
+    out = np.empty(len(items), dtype=np.float64)
+    clock = time.perf_counter_ns
+    for i, item in enumerate(items):
+        t0 = clock()
+        fn(item)
+        out[i] = clock() - t0
+    return out / 1000.0
+
+
+def make_fixtures(n_hands, recording=None, seed=0):
+    """
+    Returns (hands array (N, 21, 3), landmark lists, callback frames,
+    frame size (w, h)). Callback frames hold two hands each, drifting
+    slowly so smoothing has real work to do.
+    """
+    if recording:
+        rec = LandmarkRecording(recording)
+        hands = np.concatenate([rec.hands(i) for i in range(len(rec))]) if len(rec) else np.zeros((0, 21, 3), np.float32)
+        frames = [rec.result(i) for i in range(len(rec))]
+        size = (rec.width, rec.height)
+    else:
+        rng = np.random.default_rng(seed)
+        hands, _, _ = synth_dataset(n_hands, rng, noise=0.003, jitter_angle=10)
+        frames = []
+        for i in range(0, len(hands) - 1, 2):
+            pair = hands[i:i + 2].copy()
+            pair[0, :, 0] -= 0.2
+            pair[1, :, 0] += 0.2
+            pair[:, :, :2] += 0.02 * np.sin(i / 25.0)
+            frames.append(to_result(pair))
+        size = (1280, 720)
+
+    landmarks = [to_landmarks(h) for h in hands]
+    return hands, landmarks, frames, size
+
+
+def bench_gestures(hands, landmarks):
+    results = {}
+    states = [HandUtils.get_finger_states(h) for h in landmarks]
+    pairs = list(zip(landmarks, states))
+
+    results["get_finger_states"] = _timed(HandUtils.get_finger_states, landmarks)
+    results["recognize_number"] = _timed(lambda p: HandUtils.recognize_number(*p), pairs)
+    results["recognize_op"] = _timed(lambda p: HandCalc.recognize_op(*p), pairs)
+
+    # Batched engine, reported per hand
+    if len(hands):
+        def batch(_):
+            codes = HandVec.finger_codes(hands)
+            HandVec.recognize_numbers(hands, codes)
+            HandVec.recognize_ops(hands, codes)
+        results["vec_batch_per_hand"] = _timed(batch, range(20)) / len(hands)
+    return results
+
+
+def bench_smoothing(landmarks, size):
+    w, h = size
+    smoother = HandSmoother(max_hands=1)
+
+    def one_hand(item):
+        ts, hand = item
+        pts = np.array([[(lm.x, lm.y) for lm in hand]]) * (w, h)
+        smoother.update(pts, None, ts * 33)
+
+    return {"smooth_per_hand": _timed(one_hand, list(enumerate(landmarks)))}
+
+
+def bench_callback(frames, size, warmup=10):
+    import hand_tracking_cam as htc
+    # Keeps MOUSE_CONTROL benchmarks from moving the real cursor
+    saved_mouse, htc._mouse = htc._mouse, MouseController(RecordingBackend())
+    image = ReplayImage(*size)
+    saved = {name: getattr(htc, name) for name in CALLBACK_TOGGLES}
+
+    results = {}
+    try:
+        for combo in itertools.product((False, True), repeat=len(CALLBACK_TOGGLES)):
+            for name, value in zip(CALLBACK_TOGGLES, combo):
+                setattr(htc, name, value)
+            htc._smoother.reset()
+            htc._temporal.reset()
+            htc._calc.clear()
+
+            for ts, result in enumerate(frames[:warmup]):
+                htc.hand_result_callback(result, image, ts)
+            items = list(enumerate(frames))
+            times = _timed(lambda item: htc.hand_result_callback(item[1], image, item[0]), items)
+
+            label = "+".join(n for n, v in zip(CALLBACK_TOGGLES, combo) if v) or "none"
+            results[f"callback[{label}]"] = times
+    finally:
+        for name, value in saved.items():
+            setattr(htc, name, value)
+        htc._mouse.stop()
+        htc._mouse = saved_mouse
+    return results
+
+
+def summarize(samples):
+    return {name: {"p50_us": float(np.percentile(t, 50)),
+                   "p99_us": float(np.percentile(t, 99)),
+                   "n": int(len(t))}
+            for name, t in samples.items() if len(t)}
+
+
+def report(summary, baseline=None, tolerance=0.25):
+    """Print the table; returns names whose p50 regressed past tolerance."""
+    regressions = []
+    width = max(len(n) for n in summary)
+    header = f"{'benchmark':<{width}}  {'p50 us':>10}  {'p99 us':>10}"
+    if baseline:
+        header += f"  {'base p50':>10}  {'delta':>7}"
+    print(header)
+
+    for name, s in summary.items():
+        line = f"{name:<{width}}  {s['p50_us']:>10.2f}  {s['p99_us']:>10.2f}"
+        base = (baseline or {}).get(name)
+        if base:
+            delta = s["p50_us"] / max(base["p50_us"], 1e-9) - 1.0
+            flag = ""
+            if delta > tolerance:
+                regressions.append(name)
+                flag = "  REGRESSION"
+            line += f"  {base['p50_us']:>10.2f}  {delta:>+6.0%}{flag}"
+        print(line)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-frame hot paths.")
+    parser.add_argument("--hands", type=int, default=400, help="synthetic hands per benchmark")
+    parser.add_argument("--recording", help="use a hand_record.py recording as fixtures")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--skip-callback", action="store_true", help="only time gesture/smoothing paths")
+    parser.add_argument("--save", metavar="PATH", help="write results as a baseline JSON")
+    parser.add_argument("--compare", metavar="PATH", help="compare against a saved baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed p50 slowdown (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    hands, landmarks, frames, size = make_fixtures(args.hands, args.recording, args.seed)
+
+    samples = bench_gestures(hands, landmarks)
+    samples.update(bench_smoothing(landmarks, size))
+    if not args.skip_callback:
+        samples.update(bench_callback(frames, size))
+    summary = summarize(samples)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+    regressions = report(summary, baseline, args.tolerance)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"meta": {"python": sys.version.split()[0],
+                                "machine": platform.machine(),
+                                "processor": platform.processor(),
+                                "frame_size": list(size),
+                                "hands": len(hands)},
+                       "results": summary}, f, indent=2)
+        print("Baseline saved to", args.save)
+
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) regressed more than {args.tolerance:.0%}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+# hand_batch.py
+"""
+Offline batch processing: runs the HandLandmarker in VIDEO mode over video
+files or image directories, sharded into time chunks across a process pool
+(one landmarker per worker), and writes a columnar .npz file with one row
+per detected hand.
+
+    python hand_batch.py session1.mp4 session2.mp4 frames_dir/ -o out.npz
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import cv2
+import mediapipe as mp
+import numpy as np
+from mediapipe.tasks.python.vision import (
+    HandLandmarker,
+    HandLandmarkerOptions,
+    RunningMode,
+)
+from mediapipe.tasks.python.core.base_options import BaseOptions
+
+from hand_vec import HandVec
+
+
+# --- CONFIG -----------------------------------------------------------------
+MODEL_PATH = str(Path(__file__).parent / "hand_landmarker.task")
+CHUNK_SECONDS = 60        # length of one work unit
+IMAGE_FPS = 30            # assumed frame rate for image directories
+NUM_HANDS = 2
+IMAGE_EXTS = {".png", ".jpg", ".jpeg", ".bmp"}
+# Gap inserted into the landmarker clock between chunks so VIDEO-mode
+# tracking never links frames from unrelated chunks.
+CHUNK_CLOCK_GAP_MS = 10_000
+# ---------------------------------------------------------------------------
+
+# Handedness column values
+LEFT, RIGHT, UNKNOWN = 0, 1, -1
+
+# Per-worker state (set by _init_worker)
+_worker_landmarker = None
+_worker_clock_ms = 0
+
+
+def _list_images(directory):
+    return sorted(str(p) for p in Path(directory).iterdir()
+                  if p.suffix.lower() in IMAGE_EXTS)
+
+
+def plan_chunks(sources, chunk_seconds=CHUNK_SECONDS, image_fps=IMAGE_FPS):
+    """
+    Split every source into (source_id, path, start_frame, end_frame, fps)
+    work units of roughly chunk_seconds each.
+    """
+    chunks = []
+    for source_id, path in enumerate(sources):
+        if os.path.isdir(path):
+            n_frames = len(_list_images(path))
+            fps = image_fps
+        else:
+            cap = cv2.VideoCapture(path)
+            if not cap.isOpened():
+                print(f"Cannot open {path}, skipping.")
+                continue
+            n_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            fps = cap.get(cv2.CAP_PROP_FPS) or image_fps
+            cap.release()
+
+        step = max(1, int(chunk_seconds * fps))
+        for start in range(0, n_frames, step):
+            chunks.append((source_id, path, start, min(start + step, n_frames), fps))
+    return chunks
+
+
+def _init_worker(model_path, num_hands):
+    global _worker_landmarker
+    options = HandLandmarkerOptions(
+        base_options=BaseOptions(model_asset_path=model_path),
+        running_mode=RunningMode.VIDEO,
+        num_hands=num_hands,
+    )
+    _worker_landmarker = HandLandmarker.create_from_options(options)
+
+
+def _iter_frames(path, start, end):
+    # Yields (frame_index, BGR frame) for frames in [start, end)
+    if os.path.isdir(path):
+        for idx, image_path in enumerate(_list_images(path)[start:end], start):
+            frame = cv2.imread(image_path)
+            if frame is not None:
+                yield idx, frame
+        return
+
+    cap = cv2.VideoCapture(path)
+    cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+    try:
+        for idx in range(start, end):
+            ret, frame = cap.read()
+            if not ret:
+                break
+            yield idx, frame
+    finally:
+        cap.release()
+
+
+def _empty_columns():
+    return {
+        "source": np.empty(0, np.int32),
+        "frame": np.empty(0, np.int32),
+        "timestamp_ms": np.empty(0, np.int64),
+        "hand": np.empty(0, np.uint8),
+        "handedness": np.empty(0, np.int8),
+        "handedness_score": np.empty(0, np.float32),
+        "landmarks": np.empty((0, 21, 3), np.float32),
+        "finger_code": np.empty(0, np.uint8),
+        "number": np.empty(0, np.int8),
+        "op": np.empty(0, np.int8),
+    }
+
+
+def process_chunk(chunk):
+    """
+    Worker entry point: run one chunk through this worker's landmarker and
+    return its rows as a dict of column arrays plus the frame count.
+    """
+    global _worker_clock_ms
+    source_id, path, start, end, fps = chunk
+
+    rows = {k: [] for k in _empty_columns()}
+    hands = []
+    n_frames = 0
+    _worker_clock_ms += CHUNK_CLOCK_GAP_MS
+
+    for frame_idx, frame in _iter_frames(path, start, end):
+        n_frames += 1
+        timestamp_ms = int(round(frame_idx * 1000.0 / fps))
+        # VIDEO mode needs strictly increasing timestamps per landmarker
+        _worker_clock_ms += max(1, int(1000 / fps))
+
+        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=frame_rgb)
+        result = _worker_landmarker.detect_for_video(mp_image, _worker_clock_ms)
+
+        for hand_idx, hand_landmarks in enumerate(result.hand_landmarks):
+            category = result.handedness[hand_idx][0] if result.handedness else None
+            if category is None:
+                side, score = UNKNOWN, 0.0
+            else:
+                side = RIGHT if category.category_name == "Right" else LEFT
+                score = category.score
+
+            rows["source"].append(source_id)
+            rows["frame"].append(frame_idx)
+            rows["timestamp_ms"].append(timestamp_ms)
+            rows["hand"].append(hand_idx)
+            rows["handedness"].append(side)
+            rows["handedness_score"].append(score)
+            hands.append(hand_landmarks)
+
+    columns = _empty_columns()
+    for key, values in rows.items():
+        if values:
+            columns[key] = np.asarray(values, dtype=columns[key].dtype)
+
+    if hands:
+        # Recognition runs batched over the whole chunk
+        arr = HandVec.from_landmarks(hands)
+        codes = HandVec.finger_codes(arr, columns["handedness"] != LEFT)   # UNKNOWN counts as right
+        columns["landmarks"] = arr
+        columns["finger_code"] = codes
+        columns["number"] = HandVec.recognize_numbers(arr, codes)
+        columns["op"] = HandVec.recognize_ops(arr, codes)
+
+    return columns, n_frames
+
+
+def run_batch(sources, output, workers=None, chunk_seconds=CHUNK_SECONDS,
+              image_fps=IMAGE_FPS, model_path=MODEL_PATH, num_hands=NUM_HANDS):
+    chunks = plan_chunks(sources, chunk_seconds, image_fps)
+    print(f"{len(sources)} input(s), {len(chunks)} chunk(s), "
+          f"{workers or os.cpu_count()} worker(s)")
+
+    start = time.perf_counter()
+    parts = []
+    frames_per_source = np.zeros(len(sources), dtype=np.int64)
+    with ProcessPoolExecutor(max_workers=workers,
+                             initializer=_init_worker,
+                             initargs=(model_path, num_hands)) as pool:
+        # map() keeps chunk order, so rows come out sorted by source/frame
+        for chunk, (columns, n_frames) in zip(chunks, pool.map(process_chunk, chunks)):
+            parts.append(columns)
+            frames_per_source[chunk[0]] += n_frames
+
+    merged = _empty_columns()
+    for key in merged:
+        merged[key] = np.concatenate([merged[key]] + [p[key] for p in parts])
+
+    np.savez_compressed(
+        output,
+        sources=np.asarray(sources, dtype=str),
+        frames_per_source=frames_per_source,
+        op_symbols=np.asarray([s or "" for s in HandVec.OP_SYMBOLS], dtype=str),
+        **merged,
+    )
+
+    elapsed = time.perf_counter() - start
+    total = int(frames_per_source.sum())
+    print(f"Processed {total} frames, {len(merged['frame'])} hands in {elapsed:.1f}s "
+          f"({total / max(elapsed, 1e-9):.1f} frames/s) -> {output}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline hand tracking over videos or image directories.")
+    parser.add_argument("inputs", nargs="+", help="video files and/or image directories")
+    parser.add_argument("-o", "--output", default="landmarks.npz", help="columnar output file (.npz)")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--chunk-seconds", type=float, default=CHUNK_SECONDS)
+    parser.add_argument("--image-fps", type=float, default=IMAGE_FPS)
+    parser.add_argument("--num-hands", type=int, default=NUM_HANDS)
+    parser.add_argument("--model", default=MODEL_PATH)
+    args = parser.parse_args()
+
+    run_batch(args.inputs, args.output, args.workers, args.chunk_seconds,
+              args.image_fps, args.model, args.num_hands)
+
+
+if __name__ == "__main__":
+    main()
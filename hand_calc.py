@@ -1,4 +1,8 @@
+import numpy as np
+
 from hand_utils import HandUtils
+
+
 class HandCalc:
 
     @staticmethod
@@ -46,6 +50,11 @@ class HandCalc:
     
     @staticmethod
     def recognize_op(hand, f):
+        if isinstance(hand, np.ndarray):
+            from hand_vec import HandVec
+            op = HandVec.recognize_ops(hand, [HandUtils.finger_code(f)])[0]
+            return HandVec.OP_SYMBOLS[op]
+
         if not any(f.values()):
             return "="
         if HandCalc.minus(hand, f):
@@ -0,0 +1,136 @@
+# hand_cams.py
+"""
+Camera discovery: probes device indices in parallel (each probe on its own
+daemon thread, so a device that hangs in VideoCapture only costs its
+timeout) and caches what was found, so startup can open the best camera
+without probing again.
+"""
+import json
+import threading
+import time
+from pathlib import Path
+
+import cv2
+
+
+CACHE_PATH = str(Path(__file__).parent / "cameras.json")
+MAX_INDEX = 6            # probe indices 0 .. MAX_INDEX-1
+PROBE_TIMEOUT_S = 3.0
+CACHE_VERSION = 1
+
+
+def probe(index):
+    """Open one device and read a frame; returns its capabilities dict."""
+    info = {"index": index, "ok": False}
+    t0 = time.monotonic()
+    cap = cv2.VideoCapture(index)
+    try:
+        info["open_ms"] = (time.monotonic() - t0) * 1000
+        if not cap.isOpened():
+            return info
+        ok, frame = cap.read()
+        info["first_frame_ms"] = (time.monotonic() - t0) * 1000
+        info["backend"] = cap.getBackendName()
+        info["fps"] = cap.get(cv2.CAP_PROP_FPS)
+        if ok and frame is not None:
+            info["height"], info["width"] = frame.shape[:2]
+            info["ok"] = True
+        else:
+            info["width"] = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+            info["height"] = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    finally:
+        cap.release()
+    return info
+
+
+def discover(indices=range(MAX_INDEX), timeout=PROBE_TIMEOUT_S):
+    """
+    Probe all indices at once and wait at most timeout seconds in total.
+    Devices still opening by then are reported with "timeout": True.
+    """
+    results = {}
+    lock = threading.Lock()
+
+    def run(index):
+        try:
+            info = probe(index)
+        except Exception as e:
+            info = {"index": index, "ok": False, "error": str(e)}
+        with lock:
+            results[index] = info
+
+    threads = [threading.Thread(target=run, args=(i,), name=f"probe-{i}", daemon=True)
+               for i in indices]
+    for t in threads:
+        t.start()
+    deadline = time.monotonic() + timeout
+    for t in threads:
+        t.join(max(0.0, deadline - time.monotonic()))
+
+    with lock:
+        found = dict(results)
+    return [found.get(i, {"index": i, "ok": False, "timeout": True}) for i in indices]
+
+
+def best_device(devices, preferred=None):
+    """
+    Index to use: preferred if it works, otherwise the working device with
+    the most pixels, then highest FPS, then fastest first frame.
+    """
+    working = [d for d in devices if d.get("ok")]
+    for d in working:
+        if d["index"] == preferred:
+            return d["index"]
+    if not working:
+        return None
+    best = max(working, key=lambda d: (d["width"] * d["height"], d.get("fps") or 0,
+                                       -d.get("first_frame_ms", 0)))
+    return best["index"]
+
+
+def save_cache(devices, path=CACHE_PATH):
+    with open(path, "w") as f:
+        json.dump({"version": CACHE_VERSION, "probed_at": time.time(), "devices": devices}, f, indent=2)
+
+
+def load_cache(path=CACHE_PATH):
+    # Cached device list, or None if missing/unreadable/outdated
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if data.get("version") != CACHE_VERSION:
+        return None
+    return data.get("devices")
+
+
+def select_camera(preferred=None, path=CACHE_PATH, reprobe=False, timeout=PROBE_TIMEOUT_S):
+    """
+    Camera index to open: from the cache when there is one, otherwise (or
+    with reprobe) after a parallel discovery whose result is cached.
+    Returns (index or None, devices, from_cache).
+    """
+    devices = None if reprobe else load_cache(path)
+    if devices is not None:
+        index = best_device(devices, preferred)
+        if index is not None:
+            return index, devices, True
+
+    devices = discover(timeout=timeout)
+    try:
+        save_cache(devices, path)
+    except OSError as e:
+        print("Couldn't write camera cache:", e)
+    return best_device(devices, preferred), devices, False
+
+
+def format_devices(devices):
+    lines = []
+    for d in devices:
+        if d.get("ok"):
+            lines.append(f"Camera index {d['index']}: {d['width']}x{d['height']} @ {d.get('fps') or 0:.0f} fps, "
+                         f"{d.get('backend', '?')}, first frame {d.get('first_frame_ms', 0):.0f} ms")
+        elif d.get("timeout"):
+            lines.append(f"Camera index {d['index']}: no answer (timed out)")
+    return "\n".join(lines) or "No cameras found."
@@ -0,0 +1,176 @@
+# hand_capture.py
+import threading
+
+import cv2
+import numpy as np
+
+from hand_metrics import now_ns
+
+
+class CaptureThread:
+    """
+    Reads a cv2.VideoCapture on its own thread into a small ring of
+    preallocated BGR buffers (grab() + retrieve() into the reused array).
+
+    Consumers call acquire() to pin the newest frame and release() when
+    done with it; the writer never touches a pinned slot or the newest one,
+    so frames are handed out without copies or allocations.
+    """
+
+    def __init__(self, cap, ring_size=4, metrics=None):
+        if ring_size < 3:
+            raise ValueError("ring_size must be at least 3")
+        self.cap = cap
+        self.metrics = metrics
+        w = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        h = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        if w > 0 and h > 0:
+            self.ring = [np.empty((h, w, 3), dtype=np.uint8) for _ in range(ring_size)]
+        else:
+            self.ring = [None] * ring_size   # sized by the first retrieve()
+        self._refs = [0] * ring_size
+        self._seq = [0] * ring_size
+        self._capture_ns = [0] * ring_size
+        self._latest = -1
+        self._next = 0
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stop = False
+        self.frames = 0
+        self.overruns = 0     # frames discarded because every slot was pinned
+        self.failed = False   # grab() failed (camera gone / end of file)
+
+    def start(self):
+        self._stop = False
+        self._thread = threading.Thread(target=self._run, name="capture", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop = True
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def _claim_slot(self):
+        # Next slot that is neither pinned nor the newest frame
+        with self._cond:
+            n = len(self.ring)
+            for i in range(n):
+                slot = (self._next + i) % n
+                if slot != self._latest and self._refs[slot] == 0:
+                    self._next = (slot + 1) % n
+                    return slot
+        return None
+
+    def _run(self):
+        while not self._stop:
+            read_ns = now_ns()
+            if not self.cap.grab():
+                break
+            capture_ns = now_ns()
+
+            slot = self._claim_slot()
+            if slot is None:
+                self.overruns += 1
+                continue
+
+            buf = self.ring[slot]
+            ok, img = self.cap.retrieve(buf) if buf is not None else self.cap.retrieve()
+            if not ok:
+                break
+            if img is not buf:
+                # First frame or resolution change: keep the new array as this slot's buffer
+                self.ring[slot] = img
+
+            with self._cond:
+                self.frames += 1
+                self._seq[slot] = self.frames
+                self._capture_ns[slot] = capture_ns
+                self._latest = slot
+                self._cond.notify_all()
+            if self.metrics is not None:
+                self.metrics.record("capture", read_ns, capture_ns)
+
+        with self._cond:
+            self.failed = True
+            self._cond.notify_all()
+
+    def acquire(self, after_seq=0, timeout=None):
+        """
+        Pin the newest frame with a sequence number above after_seq, waiting
+        up to timeout seconds. Returns (slot, frame, seq, capture_ns), or
+        None on timeout or when the camera stopped.
+        """
+        with self._cond:
+            ok = self._cond.wait_for(
+                lambda: self.failed or (self._latest >= 0 and self._seq[self._latest] > after_seq),
+                timeout)
+            if not ok or self._latest < 0 or self._seq[self._latest] <= after_seq:
+                return None
+            slot = self._latest
+            self._refs[slot] += 1
+            return slot, self.ring[slot], self._seq[slot], self._capture_ns[slot]
+
+    def retain(self, slot):
+        # Extra pin on an already acquired slot (hand it to another owner)
+        with self._cond:
+            self._refs[slot] += 1
+
+    def release(self, slot):
+        with self._cond:
+            self._refs[slot] -= 1
+
+    def frame_shape(self, timeout=5.0):
+        # Shape of captured frames, waiting for the first one
+        got = self.acquire(timeout=timeout)
+        if got is None:
+            return None
+        self.release(got[0])
+        return got[1].shape
+
+
+class FrameHandoff:
+    """
+    Hands finished (annotated) frames from the result callback to the
+    display loop by swapping references instead of copying pixels.
+
+    Frames that live in a CaptureThread ring carry their slot; the handoff
+    owns one pin on the current front frame and drops it when a newer frame
+    replaces it. Readers pin the front frame while they show it.
+    """
+
+    def __init__(self, camera=None):
+        self.camera = camera
+        self._lock = threading.Lock()
+        self._front = None      # (frame, capture_ns, slot)
+        self.seq = 0            # bumped on every publish
+
+    def publish(self, frame, capture_ns=None, slot=None):
+        # Takes over the caller's pin on slot
+        with self._lock:
+            old = self._front
+            self._front = (frame, capture_ns, slot)
+            self.seq += 1
+        if old is not None and old[2] is not None:
+            self.camera.release(old[2])
+
+    def acquire(self):
+        """Returns (frame, capture_ns, slot, seq) of the front frame, pinned, or None."""
+        with self._lock:
+            if self._front is None:
+                return None
+            frame, capture_ns, slot = self._front
+            if slot is not None:
+                self.camera.retain(slot)
+            return frame, capture_ns, slot, self.seq
+
+    def release(self, slot):
+        if slot is not None:
+            self.camera.release(slot)
+
+    def clear(self):
+        with self._lock:
+            old, self._front = self._front, None
+        if old is not None and old[2] is not None:
+            self.camera.release(old[2])
@@ -0,0 +1,135 @@
+# hand_control.py
+"""
+Control channel for hand_tracking_cam.py, mainly for headless runs:
+commands arrive as text lines on a Unix socket (or from signal handlers)
+and the capture loop executes them between frames, like key presses.
+Every socket command gets one JSON line back.
+
+    python hand_control.py /tmp/hand_tracking.ctl stats
+    python hand_control.py /tmp/hand_tracking.ctl calculator
+    python hand_control.py /tmp/hand_tracking.ctl set PINCH_THRESHOLD 60
+"""
+import argparse
+import json
+import os
+import socket
+import socketserver
+import threading
+from collections import deque
+
+
+class _Request:
+    __slots__ = ("command", "args", "reply", "done", "cancelled")
+
+    def __init__(self, line):
+        words = line.split()
+        self.command = words[0].lower() if words else ""
+        self.args = words[1:]
+        self.reply = None
+        self.done = threading.Event()
+        self.cancelled = False
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            line = line.decode("utf-8", "replace").strip()
+            if not line:
+                continue
+            reply = self.server.controls.request(line)
+            self.wfile.write(json.dumps(reply, default=str).encode() + b"\n")
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class Controls:
+    """
+    Command queue drained by the owner's loop with poll(handler).
+    request() (socket clients) waits up to timeout for the reply;
+    post() (signal handlers) only queues.
+    """
+
+    def __init__(self, path=None, timeout=2.0):
+        self.path = path
+        self.timeout = timeout
+        self._queue = deque()
+        self._lock = threading.Lock()   # a request is either run or cancelled, never both
+        self._server = None
+        self._thread = None
+
+    def start(self):
+        if self.path is not None:
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+            self._server = _Server(self.path, _Handler)
+            self._server.controls = self
+            self._thread = threading.Thread(target=self._server.serve_forever, name="control-socket",
+                                            daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+            self._thread.join(1.0)
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+        # Nobody will run what is left
+        while self._queue:
+            req = self._queue.popleft()
+            req.reply = {"error": "stopped"}
+            req.done.set()
+
+    def post(self, line):
+        self._queue.append(_Request(line))
+
+    def request(self, line):
+        req = _Request(line)
+        self._queue.append(req)
+        if not req.done.wait(self.timeout):
+            with self._lock:
+                if not req.done.is_set():
+                    # Not started yet: the client is told it failed, so it must never run
+                    req.cancelled = True
+                    return {"error": "timeout"}
+            req.done.wait()   # running right now; its reply is moments away
+        return req.reply
+
+    def poll(self, handler):
+        """Runs queued commands: handler(command, args) -> reply dict (errors become {"error": ...})."""
+        while self._queue:
+            req = self._queue.popleft()
+            with self._lock:
+                if req.cancelled:
+                    continue
+                try:
+                    req.reply = handler(req.command, req.args)
+                except Exception as e:
+                    req.reply = {"error": f"{type(e).__name__}: {e}"}
+                req.done.set()
+
+
+def send(path, line, timeout=5.0):
+    """One command to a running tracker; returns its reply."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(path)
+        sock.sendall(line.encode() + b"\n")
+        with sock.makefile("rb") as f:
+            return json.loads(f.readline())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Send a command to hand_tracking_cam.py.")
+    parser.add_argument("socket", help="CONTROL_SOCKET of the running tracker")
+    parser.add_argument("command", nargs="+", help="e.g. stats, get, calculator, set PINCH_THRESHOLD 60, quit")
+    args = parser.parse_args()
+    print(json.dumps(send(args.socket, " ".join(args.command)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+# hand_eval.py
+"""
+Accuracy and throughput of the gesture backends on labeled hands.
+
+Every backend labels each hand with a number ("1".."9"), an operator
+("=", "-", "+", "*", "/") or "none"; the report is a confusion matrix
+(true label rows, predicted columns) and hands/s per backend, so a faster
+recognizer is only accepted if it is as accurate as the one it replaces.
+
+    python hand_eval.py                                  # mixed synthetic set
+    python hand_eval.py --noise 0.01 --jitter-angle 30 --right-ratio 0.5
+    python hand_eval.py --sweep                          # accuracy per condition
+    python hand_eval.py --save eval_baseline.json
+    python hand_eval.py --compare eval_baseline.json     # exit 1 on accuracy loss
+    python hand_eval.py --recording s.hlr --labels s.txt # recorded hands, one label per line
+
+Each backend gets its hands in its native form (MediaPipe-like landmark
+lists for the scalar paths, one (N, 21, 3) array for the batched ones);
+building that input is not timed.
+"""
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+from hand_calc import HandCalc
+from hand_gestures import GESTURES
+from hand_record import LEFT, LandmarkRecording
+from hand_synth import OP_POSES, synth_dataset, to_landmarks
+from hand_utils import HandUtils
+from hand_vec import HandVec
+
+NONE = "none"
+LABELS = [str(n) for n in sorted(set(HandUtils.NUMBER_MAP.values()))] + list(OP_POSES) + [NONE]
+
+# Synthetic conditions for --sweep: (name, synth_dataset keyword arguments)
+CONDITIONS = [
+    ("clean", {}),
+    ("noise 0.005", {"noise": 0.005}),
+    ("noise 0.01", {"noise": 0.01}),
+    ("rotation 15", {"jitter_angle": 15}),
+    ("rotation 30", {"jitter_angle": 30}),
+    ("scale 0.5", {"scales": (0.5,)}),
+    ("scale 1.5", {"scales": (1.5,)}),
+    ("left hands", {"right_ratio": 0.0}),
+]
+
+
+def _label(number, op):
+    if number:
+        return str(int(number))
+    return op if op is not None else NONE
+
+
+def _hand_utils(lists, hands, right):
+    # Production scalar path before GestureTable; thumb_extended assumes a right hand
+    out = []
+    for hand in lists:
+        f = HandUtils.get_finger_states(hand)
+        out.append(_label(HandUtils.recognize_number(hand, f), HandCalc.recognize_op(hand, f)))
+    return out
+
+
+def _hand_vec(lists, hands, right):
+    codes = HandVec.finger_codes(hands, right)
+    numbers = HandVec.recognize_numbers(hands, codes)
+    ops = HandVec.recognize_ops(hands, codes)
+    return [_label(n, HandVec.OP_SYMBOLS[o]) for n, o in zip(numbers.tolist(), ops.tolist())]
+
+
+def _table_keys(lists, hands, right):
+    # Scalar path, one key per hand; thumb_extended assumes a right hand
+    lookup = GESTURES.lookup
+    return [_label(lookup("number", k), lookup("op", k)) for k in map(GESTURES.key, lists)]
+
+
+def _table_batch(lists, hands, right):
+    found = GESTURES.recognize(hands, ("number", "op"), right)
+    return [_label(n, o) for n, o in zip(found["number"], found["op"])]
+
+
+# name -> fn(landmark lists, (N, 21, 3) array, (N,) right-hand flags) -> labels
+BACKENDS = {
+    "HandUtils": _hand_utils,
+    "HandVec": _hand_vec,
+    "GestureTable.key": _table_keys,
+    "GestureTable": _table_batch,
+}
+
+
+def load_recording(path, labels_path):
+    """
+    Hands of a hand_record.py recording with labels from a text file (one
+    per recorded hand, in order; "?" skips a hand). Returns (hands, labels, right).
+    """
+    rec = LandmarkRecording(path)
+    hands, right = [], []
+    for i in range(len(rec)):
+        r = rec.records[i]
+        n = int(r["n_hands"])
+        hands.extend(r["landmarks"][:n])
+        right.extend(r["handedness"][:n] != LEFT)
+    with open(labels_path) as f:
+        labels = [line.strip() for line in f if line.strip()]
+    if len(labels) != len(hands):
+        raise ValueError(f"{labels_path} has {len(labels)} labels for {len(hands)} recorded hands")
+    keep = [i for i, label in enumerate(labels) if label != "?"]
+    return (np.array([hands[i] for i in keep], dtype=np.float32).reshape(-1, 21, 3),
+            [labels[i] for i in keep], np.array([right[i] for i in keep], dtype=bool))
+
+
+def confusion(truth, predicted, labels=LABELS):
+    """(L, L) int counts, rows = true label, columns = predicted."""
+    index = {label: i for i, label in enumerate(labels)}
+    matrix = np.zeros((len(labels), len(labels)), dtype=np.int64)
+    np.add.at(matrix, ([index[t] for t in truth], [index[p] for p in predicted]), 1)
+    return matrix
+
+
+def evaluate(hands, labels, right, backends=BACKENDS, repeat=3):
+    """{backend: {"accuracy", "hands_per_s", "confusion"}}; time is the best of `repeat` runs."""
+    lists = [to_landmarks(h) for h in hands]
+    results = {}
+    for name, fn in backends.items():
+        best = float("inf")
+        for _ in range(repeat):
+            t0 = time.perf_counter_ns()
+            predicted = fn(lists, hands, right)
+            best = min(best, time.perf_counter_ns() - t0)
+        matrix = confusion(labels, predicted)
+        results[name] = {
+            "accuracy": float(np.trace(matrix) / max(len(labels), 1)),
+            "hands_per_s": len(labels) / max(best / 1e9, 1e-12),
+            "confusion": matrix,
+        }
+    return results
+
+
+def format_confusion(matrix, labels=LABELS):
+    # Only labels that occur (as truth or prediction) get a row/column
+    used = [i for i in range(len(labels)) if matrix[i].any() or matrix[:, i].any()]
+    lines = ["true\\pred " + "".join(f"{labels[i]:>6}" for i in used)]
+    for i in used:
+        if matrix[i].any():
+            lines.append(f"{labels[i]:>9} " + "".join(f"{matrix[i, j] or '.':>6}" for j in used))
+    return "\n".join(lines)
+
+
+def report(results, baseline=None, max_drop=0.0, show_confusion=True):
+    """Prints the results; returns the backends whose accuracy fell more than max_drop below baseline."""
+    regressions = []
+    reference = next(iter(results.values()))["accuracy"]
+    for name, r in results.items():
+        line = (f"{name:<18} accuracy {r['accuracy']:7.2%} ({r['accuracy'] - reference:+.2%} vs first)  "
+                f"{r['hands_per_s']:>12,.0f} hands/s")
+        base = (baseline or {}).get(name)
+        if base:
+            line += f"  baseline {base['accuracy']:7.2%}"
+            if r["accuracy"] < base["accuracy"] - max_drop:
+                regressions.append(name)
+                line += "  REGRESSION"
+        print(line)
+        if show_confusion:
+            print(format_confusion(r["confusion"]))
+            print()
+    return regressions
+
+
+def sweep(n, seed=0, backends=BACKENDS):
+    """Accuracy per CONDITIONS entry and backend: {condition: {backend: accuracy}}."""
+    table = {}
+    for name, kwargs in CONDITIONS:
+        hands, labels, right = synth_dataset(n, np.random.default_rng(seed), **kwargs)
+        results = evaluate(hands, labels, right, backends, repeat=1)
+        table[name] = {b: r["accuracy"] for b, r in results.items()}
+    return table
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gesture backend accuracy and throughput.")
+    parser.add_argument("--hands", type=int, default=2000, help="synthetic hands")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--noise", type=float, default=0.003, help="landmark noise (normalized units)")
+    parser.add_argument("--jitter-angle", type=float, default=10.0, help="random rotation, +/- degrees")
+    parser.add_argument("--scales", type=float, nargs="+", default=[0.7, 1.0, 1.3])
+    parser.add_argument("--right-ratio", type=float, default=1.0, help="share of right hands")
+    parser.add_argument("--recording", help="hand_record.py recording instead of synthetic hands")
+    parser.add_argument("--labels", help="labels for --recording, one per recorded hand")
+    parser.add_argument("--backends", nargs="+", choices=list(BACKENDS), default=list(BACKENDS))
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per backend (best counts)")
+    parser.add_argument("--sweep", action="store_true", help="also report accuracy per synthetic condition")
+    parser.add_argument("--no-confusion", action="store_true", help="only the summary lines")
+    parser.add_argument("--save", metavar="PATH", help="write results as a baseline JSON")
+    parser.add_argument("--compare", metavar="PATH", help="compare accuracy against a saved baseline")
+    parser.add_argument("--max-drop", type=float, default=0.0, help="allowed accuracy loss (0.01 = 1 point)")
+    args = parser.parse_args()
+
+    backends = {name: BACKENDS[name] for name in args.backends}
+    if args.recording:
+        if not args.labels:
+            parser.error("--recording needs --labels")
+        hands, labels, right = load_recording(args.recording, args.labels)
+        unknown = sorted(set(labels) - set(LABELS))
+        if unknown:
+            parser.error(f"unknown labels {unknown}; expected {LABELS}")
+    else:
+        hands, labels, right = synth_dataset(args.hands, np.random.default_rng(args.seed), args.noise,
+                                             args.jitter_angle, tuple(args.scales), args.right_ratio)
+    print(f"{len(labels)} hands, {np.count_nonzero(~right)} left")
+    if args.recording:
+        dataset = {"recording": args.recording, "labels": args.labels}
+    else:
+        dataset = {"hands": args.hands, "seed": args.seed, "noise": args.noise, "jitter_angle": args.jitter_angle,
+                   "scales": args.scales, "right_ratio": args.right_ratio}
+
+    results = evaluate(hands, labels, right, backends, args.repeat)
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            saved = json.load(f)
+        baseline = saved["results"]
+        if saved["meta"].get("dataset") != dataset:
+            print("Warning: the baseline was measured on a different dataset:", saved["meta"].get("dataset"))
+    regressions = report(results, baseline, args.max_drop, not args.no_confusion)
+
+    if args.sweep:
+        table = sweep(args.hands, args.seed, backends)
+        width = max(len(b) for b in backends)
+        print(f"{'condition':<12} " + " ".join(f"{b:>{width}}" for b in backends))
+        for condition, row in table.items():
+            print(f"{condition:<12} " + " ".join(f"{row[b]:>{width}.2%}" for b in backends))
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"meta": {"dataset": dataset, "labels": LABELS},
+                       "results": {name: {"accuracy": r["accuracy"], "hands_per_s": r["hands_per_s"],
+                                          "confusion": r["confusion"].tolist()}
+                                   for name, r in results.items()}}, f, indent=2)
+        print("Baseline saved to", args.save)
+
+    if regressions:
+        print(f"{len(regressions)} backend(s) lost more than {args.max_drop:.2%} accuracy")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+# hand_gate.py
+"""
+Motion gate in front of the landmarker: once no hand has been seen for a
+while, frames only go to inference at a low idle rate unless the scene
+moves. Motion is cheap frame differencing on a tiny grayscale copy.
+
+    python hand_gate.py session.mp4      # gate a recorded video (no model)
+"""
+import argparse
+
+import cv2
+import numpy as np
+
+from hand_metrics import now_ns
+
+
+class MotionGate:
+    """
+    States:
+      ACTIVE  a hand was seen in the last idle_after_ms: every frame passes
+      MOTION  no hand, but the scene moved in the last motion_hold_ms: every frame passes
+      IDLE    no hand and a static scene: one frame per idle_interval_ms passes
+
+    A frame "moves" when more than motion_fraction of the downsampled
+    pixels changed by more than pixel_delta since the previous check. The
+    check runs only outside ACTIVE, so tracking hands costs nothing extra.
+    """
+
+    ACTIVE, MOTION, IDLE = "active", "motion", "idle"
+
+    def __init__(self, idle_after_ms=3000, idle_interval_ms=500, motion_hold_ms=1000,
+                 size=(64, 48), pixel_delta=25, motion_fraction=0.01, metrics=None):
+        self.idle_after_ms = idle_after_ms
+        self.idle_interval_ms = idle_interval_ms
+        self.motion_hold_ms = motion_hold_ms
+        self.size = size
+        self.pixel_delta = pixel_delta
+        self.min_changed = max(1, int(motion_fraction * size[0] * size[1]))
+        self.metrics = metrics
+        self.enabled = True
+        self.state = self.ACTIVE
+        self._last_hand_ms = None
+        self._last_motion_ms = None
+        self._last_pass_ms = None
+        self._prev = None
+        self._small = None
+        self.passed = 0
+        self.skipped = 0
+
+    def reset(self):
+        self.state = self.ACTIVE
+        self._last_hand_ms = self._last_motion_ms = self._last_pass_ms = None
+        self._prev = None
+
+    def observe(self, n_hands, t_ms):
+        """Landmarker result at t_ms (same clock as should_infer) with n_hands hands."""
+        if n_hands:
+            self._last_hand_ms = t_ms
+
+    def motion(self, frame_bgr):
+        # Changed pixels between this frame and the previous check, above threshold?
+        self._small = cv2.resize(frame_bgr, self.size, dst=self._small, interpolation=cv2.INTER_LINEAR)
+        gray = cv2.cvtColor(self._small, cv2.COLOR_BGR2GRAY)
+        prev, self._prev = self._prev, gray
+        if prev is None:
+            return False
+        changed = cv2.countNonZero(cv2.threshold(cv2.absdiff(gray, prev), self.pixel_delta, 255,
+                                                 cv2.THRESH_BINARY)[1])
+        return changed >= self.min_changed
+
+    def should_infer(self, frame_bgr, t_ms):
+        """True if the frame captured at t_ms should go to the landmarker."""
+        if not self.enabled:
+            return True
+        if self._last_hand_ms is None:
+            self._last_hand_ms = t_ms   # start at full rate
+
+        if t_ms - self._last_hand_ms < self.idle_after_ms:
+            self.state = self.ACTIVE
+            self._prev = None   # stale once we leave ACTIVE
+            ok = True
+        else:
+            if self.motion(frame_bgr):
+                self._last_motion_ms = t_ms
+            if self._last_motion_ms is not None and t_ms - self._last_motion_ms < self.motion_hold_ms:
+                self.state = self.MOTION
+                ok = True
+            else:
+                self.state = self.IDLE
+                ok = self._last_pass_ms is None or t_ms - self._last_pass_ms >= self.idle_interval_ms
+
+        if ok:
+            self._last_pass_ms = t_ms
+            self.passed += 1
+        else:
+            self.skipped += 1
+            if self.metrics is not None:
+                self.metrics.count("gate_skipped")
+        return ok
+
+    def skip_ratio(self):
+        total = self.passed + self.skipped
+        return self.skipped / total if total else 0.0
+
+    def summary(self):
+        return (f"Motion gate: {self.state}, {self.skipped} of {self.passed + self.skipped} frames skipped "
+                f"({self.skip_ratio():.0%})")
+
+
+def gate_video(path, gate, fps=None):
+    """
+    Runs a video through the gate without a model (no hand is ever seen, so
+    this measures the static/motion behaviour). Returns the timeline
+    [(frame index, state, passed)] and the mean gate check time in ms.
+    """
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise OSError(f"cannot open {path}")
+    fps = fps or cap.get(cv2.CAP_PROP_FPS) or 30.0
+    timeline = []
+    check_ns = 0
+    i = 0
+    try:
+        while True:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            t = now_ns()
+            passed = gate.should_infer(frame, int(i * 1000 / fps))
+            check_ns += now_ns() - t
+            timeline.append((i, gate.state, passed))
+            i += 1
+    finally:
+        cap.release()
+    return timeline, check_ns / max(i, 1) / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a video through the motion gate.")
+    parser.add_argument("video")
+    parser.add_argument("--fps", type=float, help="override the file's frame rate")
+    parser.add_argument("--idle-after-ms", type=int, default=3000)
+    parser.add_argument("--idle-interval-ms", type=int, default=500)
+    parser.add_argument("--motion-hold-ms", type=int, default=1000)
+    parser.add_argument("--pixel-delta", type=int, default=25)
+    parser.add_argument("--motion-fraction", type=float, default=0.01)
+    args = parser.parse_args()
+
+    gate = MotionGate(args.idle_after_ms, args.idle_interval_ms, args.motion_hold_ms,
+                      pixel_delta=args.pixel_delta, motion_fraction=args.motion_fraction)
+    timeline, check_ms = gate_video(args.video, gate, args.fps)
+
+    # State changes, then totals
+    last = None
+    for i, state, _ in timeline:
+        if state != last:
+            print(f"frame {i:>6}: {state}")
+            last = state
+    states = np.array([s for _, s, _ in timeline])
+    for state in (MotionGate.ACTIVE, MotionGate.MOTION, MotionGate.IDLE):
+        print(f"{state:<7} {np.count_nonzero(states == state):>6} frames")
+    print(gate.summary() + f", {check_ms:.3f} ms per gate check")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+# hand_gestures.py
+import numpy as np
+
+from hand_utils import HandUtils
+from hand_vec import HandVec
+
+
+class GestureTable:
+    """
+    Gesture rules compiled into lookup tables.
+
+    Each hand is reduced once to a key: the finger bitcode (HandUtils.finger_code
+    layout, bits 0-4) plus one bit per registered direction feature
+    ("tip points <direction> relative to base"). A rule is an exact finger
+    code plus the direction features it requires; compiling expands every
+    rule into all keys it matches, so recognition is one table index no
+    matter how many gestures are registered. Earlier registrations win,
+    like the order of the old predicate chains.
+    """
+
+    CODE_BITS = 5
+    MAX_FEATURES = 16
+
+    def __init__(self, deadzone=0.02):
+        self.deadzone = deadzone
+        self.features = []   # (tip, base, direction name)
+        self.rules = {}      # kind -> [(value, code, feature mask)]
+        self._tables = {}    # kind -> (values, int16 table), built lazily
+        self._pairs = None
+
+    def feature(self, tip, base, direction):
+        """Bit index (0-based, above the finger code) for a direction feature."""
+        key = (tip, base, direction)
+        if key not in self.features:
+            if direction not in HandVec.DIRECTION_NAMES:
+                raise ValueError(f"unknown direction {direction!r}")
+            if len(self.features) == self.MAX_FEATURES:
+                raise ValueError("too many direction features")
+            self.features.append(key)
+            self._tables.clear()
+            self._pairs = None
+        return self.features.index(key)
+
+    def register(self, kind, value, code, directions=()):
+        """
+        Add a gesture: `kind` groups gestures looked up together ("number",
+        "op", ...), `code` is the exact finger bitcode and `directions` an
+        iterable of (tip, base, direction) that must all hold.
+        """
+        mask = 0
+        for tip, base, direction in directions:
+            mask |= 1 << self.feature(tip, base, direction)
+        self.rules.setdefault(kind, []).append((value, int(code), mask))
+        self._tables.pop(kind, None)
+
+    def _table(self, kind):
+        compiled = self._tables.get(kind)
+        if compiled is not None:
+            return compiled
+
+        n_feat = len(self.features)
+        feature_keys = np.arange(1 << n_feat)
+        table = np.zeros(1 << (self.CODE_BITS + n_feat), dtype=np.int16)
+        values = [None]
+        for value, code, mask in self.rules.get(kind, []):
+            match = feature_keys[(feature_keys & mask) == mask]
+            slots = (match << self.CODE_BITS) | code
+            free = table[slots] == 0   # first registered rule wins
+            values.append(value)
+            table[slots[free]] = len(values) - 1
+
+        compiled = self._tables[kind] = (values, table)
+        return compiled
+
+    def keys(self, hands, codes=None, right=True):
+        """Lookup keys for (N, 21, 3) landmark arrays, shape (N,)."""
+        hands = np.asarray(hands)
+        if hands.ndim == 2:
+            hands = hands[None]
+        if codes is None:
+            codes = HandVec.finger_codes(hands, right)
+        keys = np.asarray(codes, dtype=np.int64)
+        if not self.features or not len(hands):
+            return keys
+
+        # Directions are computed once per distinct (tip, base) pair
+        if self._pairs is None:
+            pairs = sorted({(tip, base) for tip, base, _ in self.features})
+            pair_idx = np.array([pairs.index((t, b)) for t, b, _ in self.features])
+            want = np.array([HandVec.DIRECTION_NAMES.index(d) for _, _, d in self.features])
+            self._pairs = (np.array(pairs), pair_idx, want)
+        pairs, pair_idx, want = self._pairs
+
+        dirs = HandVec.directions(hands, pairs[:, 0], pairs[:, 1], self.deadzone)
+        bits = (dirs[:, pair_idx] == want).astype(np.int64)
+        return keys | (bits << (self.CODE_BITS + np.arange(len(self.features)))).sum(axis=1)
+
+    def key(self, hand, fingers=None):
+        """
+        Lookup key for one hand of MediaPipe landmarks (scalar path; for a
+        single hand this beats building arrays). fingers: optional
+        get_finger_states() result to reuse.
+        """
+        if fingers is None:
+            fingers = HandUtils.get_finger_states(hand)
+        key = HandUtils.finger_code(fingers)
+        dirs = {}
+        for bit, (tip, base, direction) in enumerate(self.features):
+            d = dirs.get((tip, base))
+            if d is None:
+                d = dirs[(tip, base)] = HandUtils.finger_direction(hand, tip, base, self.deadzone)
+            if d == direction:
+                key |= 1 << (self.CODE_BITS + bit)
+        return key
+
+    def lookup(self, kind, keys):
+        """Gesture value for each key (None where nothing matches)."""
+        values, table = self._table(kind)
+        if isinstance(keys, int):
+            return values[table[keys]]
+        idx = table[np.asarray(keys)]
+        if np.ndim(idx) == 0:
+            return values[int(idx)]
+        return [values[i] for i in idx.tolist()]
+
+    def recognize(self, hands, kinds=None, right=True):
+        # {kind: [value per hand]} for a batch of hands
+        keys = self.keys(hands, right=right)
+        return {kind: self.lookup(kind, keys) for kind in (kinds or self.rules)}
+
+
+def default_table():
+    """Number (HandUtils.NUMBER_MAP) and calculator (HandCalc) gestures."""
+    table = GestureTable()
+    tips = [HandUtils.FINGER_TIPS[f] for f in ("index", "middle", "ring", "pinky")]
+
+    # Numbers: every extended finger (except the thumb) points up from its MCP
+    for code, number in HandUtils.NUMBER_MAP.items():
+        ups = [(tip, tip - 3, "up") for i, tip in enumerate(tips) if code & (2 << i)]
+        table.register("number", number, code, ups)
+
+    # Operators: fist is "=", otherwise exactly the first k fingers point left
+    table.register("op", "=", 0)
+    for k, (op, code) in enumerate((("-", 2), ("+", 6), ("*", 14), ("/", 30)), start=1):
+        table.register("op", op, code, [(tip, tip - 2, "left") for tip in tips[:k]])
+
+    return table
+
+
+# Shared default instance; register extra gestures on it at startup
+GESTURES = default_table()
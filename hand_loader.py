@@ -0,0 +1,117 @@
+# hand_loader.py
+import threading
+
+import numpy as np
+
+from hand_metrics import now_ns
+
+
+class LandmarkerLoader:
+    """
+    Imports mediapipe and builds the HandLandmarker on a background thread,
+    so the camera can open in the meantime.
+
+    The model file is read once into memory (model_asset_buffer) and one
+    warm-up inference on a blank frame runs before the landmarker is handed
+    out, so the first real frame doesn't pay for graph setup. In
+    LIVE_STREAM mode (result_callback given) the warm-up result is swallowed
+    and its timestamp is reported as warmup_timestamp_ms; real frames must
+    use later timestamps.
+    """
+
+    def __init__(self, model_path, num_hands=2, result_callback=None, warmup_size=(640, 480)):
+        self.model_path = model_path
+        self.num_hands = num_hands
+        self.result_callback = result_callback
+        self.warmup_size = warmup_size
+        self.warmup_timestamp_ms = 0
+        self.timings = {}     # stage -> ms
+        self.mp = None        # the mediapipe module, once imported
+        self.landmarker = None
+        self.error = None
+        self._done = threading.Event()
+        self._warm = threading.Event()
+        self._lock = threading.Lock()
+        self._cancelled = False
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="model-loader", daemon=True)
+        self._thread.start()
+        return self
+
+    @property
+    def ready(self):
+        return self._done.is_set()
+
+    def result(self, timeout=None):
+        """The landmarker, waiting for it if needed; re-raises a loading error."""
+        if not self._done.wait(timeout):
+            return None
+        if self.error is not None:
+            raise self.error
+        return self.landmarker
+
+    def cancel(self):
+        """Landmarker not wanted after all: closed now, or as soon as loading ends."""
+        with self._lock:
+            self._cancelled = True
+            landmarker, self.landmarker = self.landmarker, None
+        if landmarker is not None:
+            landmarker.close()
+
+    def _on_result(self, result, output_image, timestamp_ms):
+        # Only the warm-up result is swallowed: if it is late, the first real
+        # results still reach the callback (and release their capture slots)
+        if timestamp_ms == self.warmup_timestamp_ms:
+            self._warm.set()
+            return
+        self.result_callback(result, output_image, timestamp_ms)
+
+    def _mark(self, stage, start_ns):
+        t = now_ns()
+        self.timings[stage] = (t - start_ns) / 1e6
+        return t
+
+    def _run(self):
+        try:
+            t = now_ns()
+            import mediapipe as mp
+            from mediapipe.tasks.python.core.base_options import BaseOptions
+            from mediapipe.tasks.python.vision import HandLandmarker, HandLandmarkerOptions, RunningMode
+            t = self._mark("import_mediapipe", t)
+
+            with open(self.model_path, "rb") as f:
+                model = f.read()
+            t = self._mark("read_model", t)
+
+            live = self.result_callback is not None
+            options = HandLandmarkerOptions(
+                base_options=BaseOptions(model_asset_buffer=model),
+                running_mode=RunningMode.LIVE_STREAM if live else RunningMode.VIDEO,
+                num_hands=self.num_hands,
+                result_callback=self._on_result if live else None,
+            )
+            landmarker = HandLandmarker.create_from_options(options)
+            t = self._mark("create_landmarker", t)
+
+            w, h = self.warmup_size
+            blank = mp.Image(image_format=mp.ImageFormat.SRGB, data=np.zeros((h, w, 3), np.uint8))
+            if live:
+                landmarker.detect_async(blank, self.warmup_timestamp_ms)
+                self._warm.wait(timeout=10.0)
+            else:
+                landmarker.detect_for_video(blank, self.warmup_timestamp_ms)
+                self._warm.set()
+            self._mark("warmup", t)
+
+            self.mp = mp
+            with self._lock:
+                if not self._cancelled:
+                    self.landmarker, landmarker = landmarker, None
+            if landmarker is not None:
+                landmarker.close()
+        except BaseException as e:
+            self.error = e
+        finally:
+            self._done.set()
@@ -0,0 +1,125 @@
+# hand_metrics.py
+"""
+Per-stage latency histograms. Every stage has exactly one writer thread, so
+recording is a couple of array increments with no locks; readers work on
+snapshots and may see a sample or two in flight, which is fine for stats.
+"""
+import json
+import math
+import threading
+import time
+
+import numpy as np
+
+
+now_ns = time.monotonic_ns
+
+BUCKETS_PER_OCTAVE = 8
+MIN_NS = 1_000            # 1 us
+OCTAVES = 24              # up to ~16 s
+N_BUCKETS = BUCKETS_PER_OCTAVE * OCTAVES
+
+
+class LatencyHistogram:
+    """Log-bucketed histogram (~9% bucket width) of durations in ns."""
+
+    def __init__(self):
+        self.counts = np.zeros(N_BUCKETS + 1, dtype=np.int64)   # last = overflow
+        self.n = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def record(self, ns):
+        if ns < MIN_NS:
+            idx = 0
+        else:
+            idx = min(int(math.log2(ns / MIN_NS) * BUCKETS_PER_OCTAVE), N_BUCKETS)
+        self.counts[idx] += 1
+        self.n += 1
+        self.total_ns += ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+
+    @staticmethod
+    def bucket_ns(idx):
+        # Geometric middle of bucket idx
+        return MIN_NS * 2 ** ((idx + 0.5) / BUCKETS_PER_OCTAVE)
+
+    def percentile(self, p):
+        counts = self.counts.copy()
+        total = counts.sum()
+        if not total:
+            return 0.0
+        idx = int(np.searchsorted(np.cumsum(counts), math.ceil(total * p / 100.0)))
+        return min(self.bucket_ns(idx), self.max_ns)
+
+    def snapshot(self):
+        n = self.n
+        return {
+            "count": n,
+            "mean_ms": self.total_ns / n / 1e6 if n else 0.0,
+            "p50_ms": self.percentile(50) / 1e6,
+            "p90_ms": self.percentile(90) / 1e6,
+            "p99_ms": self.percentile(99) / 1e6,
+            "max_ms": self.max_ns / 1e6,
+        }
+
+
+class StageMetrics:
+    """Named latency histograms plus counters, with summary and JSON dump."""
+
+    def __init__(self, stages=()):
+        self.started_ns = now_ns()
+        self.histograms = {name: LatencyHistogram() for name in stages}
+        self.counters = {}
+        self._create_lock = threading.Lock()
+        self._last_print_ns = self.started_ns
+
+    def hist(self, stage):
+        h = self.histograms.get(stage)
+        if h is None:
+            # Only taken the first time a stage is seen
+            with self._create_lock:
+                h = self.histograms.setdefault(stage, LatencyHistogram())
+        return h
+
+    def record(self, stage, start_ns, end_ns=None):
+        if end_ns is None:
+            end_ns = now_ns()
+        self.hist(stage).record(end_ns - start_ns)
+        return end_ns
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def snapshot(self):
+        return {
+            "uptime_s": (now_ns() - self.started_ns) / 1e9,
+            "stages": {name: h.snapshot() for name, h in list(self.histograms.items())},
+            "counters": dict(self.counters),
+        }
+
+    def summary(self):
+        snap = self.snapshot()
+        lines = [f"--- latency (ms) after {snap['uptime_s']:.1f}s ---",
+                 f"{'stage':<20} {'count':>7} {'p50':>7} {'p90':>7} {'p99':>7} {'max':>7}"]
+        for name, s in snap["stages"].items():
+            if s["count"]:
+                lines.append(f"{name:<20} {s['count']:>7} {s['p50_ms']:>7.2f} {s['p90_ms']:>7.2f} "
+                             f"{s['p99_ms']:>7.2f} {s['max_ms']:>7.2f}")
+        if snap["counters"]:
+            lines.append("  ".join(f"{k}={v}" for k, v in snap["counters"].items()))
+        return "\n".join(lines)
+
+    def maybe_print(self, interval_s):
+        # Print the summary at most once per interval (0 disables)
+        if interval_s <= 0:
+            return
+        t = now_ns()
+        if t - self._last_print_ns >= interval_s * 1e9:
+            self._last_print_ns = t
+            print(self.summary())
+
+    def dump(self, path):
+        with open(path, "w") as f:
+            json.dump(self.snapshot(), f, indent=2)
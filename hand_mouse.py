@@ -0,0 +1,215 @@
+# hand_mouse.py
+import threading
+from collections import deque
+
+from hand_metrics import now_ns
+
+
+class PyAutoGuiBackend:
+    """Real cursor via pyautogui, imported on open() (needs a display)."""
+
+    def __init__(self):
+        self.gui = None
+
+    def open(self):
+        if self.gui is None:
+            import pyautogui
+            pyautogui.PAUSE = 0      # remove small automatic pause
+            pyautogui.FAILSAFE = False
+            self.gui = pyautogui
+
+    def size(self):
+        return tuple(self.gui.size())
+
+    def move(self, x, y):
+        self.gui.moveTo(x, y, duration=0)   # instantaneous jump
+
+    def down(self):
+        self.gui.mouseDown()
+
+    def up(self):
+        self.gui.mouseUp()
+
+
+class RecordingBackend:
+    """
+    Stand-in backend for headless tests: records (time_ns, event, x, y)
+    instead of touching the cursor.
+    """
+
+    def __init__(self, size=(1920, 1080)):
+        self._size = size
+        self.events = []
+        self.position = None
+
+    def open(self):
+        pass
+
+    def size(self):
+        return self._size
+
+    def move(self, x, y):
+        self.position = (x, y)
+        self.events.append((now_ns(), "move", x, y))
+
+    def down(self):
+        self.events.append((now_ns(), "down") + (self.position or (None, None)))
+
+    def up(self):
+        self.events.append((now_ns(), "up") + (self.position or (None, None)))
+
+
+class MouseController:
+    """
+    Cursor output on its own thread, woken by a condition variable.
+
+    set_target() (normalized 0..1 screen position) and press()/release()
+    only record the request and notify, so the inference callback never
+    blocks on the backend. A new target is applied as soon as the thread
+    wakes; between landmark updates the cursor is optionally extrapolated
+    along the last velocity at refresh_hz, for at most max_extrapolate_ms,
+    so it keeps gliding instead of stepping at the inference rate. Clicks
+    are dispatched in order, after the move of the same wake-up.
+
+    If the backend cannot be opened the thread ends and keeps the exception
+    in `error` (running is False again) until the next start().
+    """
+
+    def __init__(self, backend=None, refresh_hz=60, interpolate=True, move_threshold=2,
+                 max_extrapolate_ms=50, metrics=None):
+        self.backend = backend if backend is not None else PyAutoGuiBackend()
+        self.period_ns = int(1e9 / refresh_hz)
+        self.interpolate = interpolate
+        self.move_threshold = move_threshold
+        self.max_extrapolate_ns = int(max_extrapolate_ms * 1e6)
+        self.metrics = metrics
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stop = False
+        self._events = deque()
+        self._fresh = False
+        self._target = None       # (nx, ny, source t_ns, arrival t_ns)
+        self._velocity = None     # normalized units per ns, None when not moving
+        self.error = None         # why the backend could not be opened
+        self._source_ns = None
+        self._next_tick_ns = 0
+        self.moves = 0
+        self.clicks = 0
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+    def start(self):
+        if self._thread is None:
+            self._stop = False
+            self.error = None
+            self._thread = threading.Thread(target=self._run, name="mouse", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=0.5):
+        with self._cond:
+            self._stop = True
+            self._cond.notify()
+        thread = self._thread   # None already if the backend failed to open
+        if thread is not None:
+            thread.join(timeout)
+            self._thread = None
+
+    def set_target(self, nx, ny, source_ns=None):
+        """
+        New cursor target, normalized to the screen. source_ns: capture time
+        of the frame it came from (for the capture_to_cursor latency) and
+        the clock for velocity estimation.
+        """
+        arrival = now_ns()
+        t = source_ns if source_ns is not None else arrival
+        with self._cond:
+            prev = self._target
+            if prev is not None and 0 < t - prev[2] <= 4 * self.max_extrapolate_ns:
+                dt = t - prev[2]
+                self._velocity = ((nx - prev[0]) / dt, (ny - prev[1]) / dt)
+            else:
+                self._velocity = None
+            self._target = (nx, ny, t, arrival)
+            self._source_ns = source_ns
+            self._fresh = True
+            self._cond.notify()
+
+    def press(self):
+        with self._cond:
+            if self._thread is not None:   # nobody would ever send it otherwise
+                self._events.append("down")
+                self._cond.notify()
+
+    def release(self):
+        with self._cond:
+            if self._thread is not None:
+                self._events.append("up")
+                self._cond.notify()
+
+    def _gliding(self):
+        return self.interpolate and self._velocity is not None and self._target is not None
+
+    def _run(self):
+        try:
+            self.backend.open()
+            width, height = self.backend.size()
+        except Exception as e:
+            with self._cond:
+                self.error = e
+                self._thread = None
+                self._events.clear()
+            return
+        last_pos = None
+        while True:
+            with self._cond:
+                while not (self._stop or self._events or self._fresh):
+                    if not self._gliding():
+                        self._cond.wait()
+                        continue
+                    timeout = (self._next_tick_ns - now_ns()) / 1e9
+                    if timeout <= 0:
+                        break
+                    self._cond.wait(timeout)
+                if self._stop:
+                    return
+                events = list(self._events)
+                self._events.clear()
+                fresh, self._fresh = self._fresh, False
+                target, velocity, source_ns = self._target, self._velocity, self._source_ns
+
+            t = now_ns()
+            if target is not None:
+                nx, ny, _, arrival = target
+                if not fresh and velocity is not None:
+                    ahead = t - arrival
+                    if ahead > self.max_extrapolate_ns:
+                        # Stop gliding; wait for the next landmark update
+                        with self._cond:
+                            if self._target is target:
+                                self._velocity = None
+                        ahead = self.max_extrapolate_ns
+                    nx += velocity[0] * ahead
+                    ny += velocity[1] * ahead
+                x = int(min(max(nx, 0.0), 1.0) * (width - 1))
+                y = int(min(max(ny, 0.0), 1.0) * (height - 1))
+                if last_pos is None or abs(x - last_pos[0]) > self.move_threshold \
+                        or abs(y - last_pos[1]) > self.move_threshold:
+                    try:
+                        self.backend.move(x, y)
+                        self.moves += 1
+                    except Exception:
+                        pass
+                    last_pos = (x, y)
+                if fresh and source_ns is not None and self.metrics is not None:
+                    self.metrics.record("capture_to_cursor", source_ns)
+
+            for event in events:
+                try:
+                    self.backend.down() if event == "down" else self.backend.up()
+                    self.clicks += event == "down"
+                except Exception:
+                    pass
+            self._next_tick_ns = t + self.period_ns
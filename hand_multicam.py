@@ -0,0 +1,424 @@
+# hand_multicam.py
+"""
+Multi-camera tracking: one process per camera (capture thread + its own
+HandLandmarker), each streaming annotated tiles and landmarks through a
+shared-memory block to a coordinator that shows a tiled window and merges
+the gesture output of all cameras.
+
+    python hand_multicam.py 0 2                    # two cameras
+    python hand_multicam.py a.mp4 b.mp4 --loop     # video files as cameras
+
+Every pipeline has its own interpreter, so cameras scale across cores
+instead of sharing one GIL.
+"""
+import argparse
+import math
+import multiprocessing
+import time
+from multiprocessing import shared_memory
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from hand_capture import CaptureThread
+from hand_gestures import GESTURES
+from hand_metrics import StageMetrics, now_ns
+from hand_overlay import HAND_CONNECTIONS, OverlayRenderer
+from hand_scale import to_rgb
+from hand_smooth import LEFT, HandSmoother, handedness_codes
+from hand_vec import HandVec
+
+
+# --- CONFIG -----------------------------------------------------------------
+MODEL_PATH = str(Path(__file__).parent / "hand_landmarker.task")
+TILE_SIZE = (640, 360)    # (w, h) of every camera's tile in the mosaic
+NUM_HANDS = 2
+INPUT_SCALE = 1.0         # landmarker input scale inside each worker
+# ---------------------------------------------------------------------------
+
+# Worker states (header STATE field)
+STARTING, RUNNING, STOPPED, FAILED = 0, 1, 2, 3
+
+
+class ResultBlock:
+    """
+    One camera's results in a SharedMemory block, double buffered.
+
+    The worker writes the next buffer and then publishes its number; a
+    reader copies the newest published buffer and checks the buffer's begin
+    marker afterwards, retrying if the writer came around and overwrote it
+    meanwhile. Header fields are single int64 writes, one writer each.
+    """
+
+    # header fields
+    LATEST, STATE, PROCESSED, OVERRUNS, INFER_NS = range(5)
+    HEADER_FIELDS = 8
+
+    def __init__(self, tile_size, max_hands, name=None, create=False):
+        tw, th = tile_size
+        self.tile_size = tile_size
+        self.max_hands = max_hands
+        layout = [
+            ("header", (self.HEADER_FIELDS,), np.int64),
+            ("seq_begin", (2,), np.int64),
+            ("seq_end", (2,), np.int64),
+            ("capture_ns", (2,), np.int64),
+            ("timestamp_ms", (2,), np.int64),
+            ("n_hands", (2,), np.int64),
+            ("hands", (2, max_hands, 21, 3), np.float32),
+            ("sides", (2, max_hands), np.int8),
+            ("tiles", (2, th, tw, 3), np.uint8),
+        ]
+        size = sum(int(np.prod(shape)) * np.dtype(dtype).itemsize for _, shape, dtype in layout)
+        self.shm = shared_memory.SharedMemory(name=name, create=create, size=size if create else 0)
+        self.name = self.shm.name
+
+        offset = 0
+        for field, shape, dtype in layout:
+            arr = np.ndarray(shape, dtype=dtype, buffer=self.shm.buf, offset=offset)
+            setattr(self, field, arr)
+            offset += arr.nbytes
+        if create:
+            self.header[:] = 0
+            self.seq_begin[:] = -1
+            self.seq_end[:] = -1
+
+    @property
+    def state(self):
+        return int(self.header[self.STATE])
+
+    def set_state(self, state):
+        self.header[self.STATE] = state
+
+    def write(self, tile, hands, sides, timestamp_ms, capture_ns):
+        seq = int(self.header[self.LATEST]) + 1
+        idx = seq % 2
+        n = min(len(hands), self.max_hands)
+        self.seq_begin[idx] = seq
+        self.tiles[idx] = tile
+        self.hands[idx, :n] = hands[:n]
+        self.sides[idx, :n] = sides[:n]
+        self.n_hands[idx] = n
+        self.timestamp_ms[idx] = timestamp_ms
+        self.capture_ns[idx] = capture_ns
+        self.seq_end[idx] = seq
+        self.header[self.LATEST] = seq
+        self.header[self.PROCESSED] += 1
+
+    def read(self, tile_out, after_seq=0, retries=3):
+        """
+        Copy the newest result above after_seq: the tile goes into tile_out,
+        returns (seq, hands (n, 21, 3), sides (n,), timestamp_ms, capture_ns)
+        or None when there is nothing new (or the writer kept lapping us).
+        """
+        for _ in range(retries):
+            seq = int(self.header[self.LATEST])
+            if seq <= after_seq:
+                return None
+            idx = seq % 2
+            if self.seq_end[idx] != seq:
+                continue
+            tile_out[:] = self.tiles[idx]
+            n = int(self.n_hands[idx])
+            hands = self.hands[idx, :n].copy()
+            sides = self.sides[idx, :n].copy()
+            timestamp_ms = int(self.timestamp_ms[idx])
+            capture_ns = int(self.capture_ns[idx])
+            if self.seq_begin[idx] == seq:
+                return seq, hands, sides, timestamp_ms, capture_ns
+        return None
+
+    def close(self):
+        # Views must go before the mapping can be closed
+        for field in ("header", "seq_begin", "seq_end", "capture_ns", "timestamp_ms",
+                      "n_hands", "hands", "sides", "tiles"):
+            setattr(self, field, None)
+        self.shm.close()
+
+    def unlink(self):
+        self.shm.unlink()
+
+
+class FileSource:
+    """
+    A video file that behaves like a camera for CaptureThread: frames come
+    at the file's frame rate (grab() waits), optionally looping forever.
+    """
+
+    def __init__(self, path, loop=False, realtime=True):
+        self.cap = cv2.VideoCapture(path)
+        self.loop = loop
+        fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self.period_ns = int(1e9 / fps) if realtime else 0
+        self._due_ns = None
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def get(self, prop):
+        return self.cap.get(prop)
+
+    def set(self, prop, value):
+        return self.cap.set(prop, value)
+
+    def grab(self):
+        if self.period_ns:
+            t = now_ns()
+            if self._due_ns is None:
+                self._due_ns = t
+            elif t < self._due_ns:
+                time.sleep((self._due_ns - t) / 1e9)
+            self._due_ns = max(self._due_ns + self.period_ns, t)
+        ok = self.cap.grab()
+        if not ok and self.loop:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ok = self.cap.grab()
+        return ok
+
+    def retrieve(self, image=None):
+        return self.cap.retrieve(image)
+
+    def release(self):
+        self.cap.release()
+
+
+def open_source(source, loop=False):
+    # Camera index ("0", 2) or video file path
+    if isinstance(source, int) or str(source).isdigit():
+        cap = cv2.VideoCapture(int(source))
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+    else:
+        cap = FileSource(str(source), loop=loop)
+    return cap if cap.isOpened() else None
+
+
+def create_landmarker(model_path, num_hands):
+    # VIDEO mode: the worker runs inference synchronously on the newest frame
+    from mediapipe.tasks.python.core.base_options import BaseOptions
+    from mediapipe.tasks.python.vision import HandLandmarker, HandLandmarkerOptions, RunningMode
+    options = HandLandmarkerOptions(
+        base_options=BaseOptions(model_asset_path=model_path),
+        running_mode=RunningMode.VIDEO,
+        num_hands=num_hands,
+    )
+    return HandLandmarker.create_from_options(options)
+
+
+def camera_worker(source, shm_name, tile_size, max_hands, model_path, stop,
+                  loop=False, input_scale=INPUT_SCALE, landmarker_factory=create_landmarker):
+    """
+    Process entry point for one camera. Runs until stop is set or the
+    source ends; results go to the ResultBlock named shm_name.
+    """
+    import mediapipe as mp
+
+    cv2.setNumThreads(1)   # one core per camera; the processes provide the parallelism
+    block = ResultBlock(tile_size, max_hands, name=shm_name)
+    cap = open_source(source, loop)
+    if cap is None:
+        print(f"Cannot open camera source {source!r}.")
+        block.set_state(FAILED)
+        block.close()
+        return
+
+    try:
+        landmarker = landmarker_factory(model_path, max_hands)
+    except Exception as e:
+        print(f"Camera {source!r}: cannot create the landmarker: {e}")
+        cap.release()
+        block.set_state(FAILED)
+        block.close()
+        return
+    camera = CaptureThread(cap, ring_size=3).start()
+    renderer = OverlayRenderer(HAND_CONNECTIONS, joint_radius=3)
+    smoother = HandSmoother(max_hands=max_hands)
+    tw, th = tile_size
+    tile = np.empty((th, tw, 3), np.uint8)
+    frame_rgb = None
+    start_ns = now_ns()
+    last_seq = 0
+    last_timestamp = -1
+    block.set_state(RUNNING)
+
+    try:
+        while not stop.is_set():
+            got = camera.acquire(last_seq, timeout=0.5)
+            if got is None:
+                if camera.failed:
+                    break
+                continue
+            slot, frame, last_seq, capture_ns = got
+            try:
+                timestamp = max((capture_ns - start_ns) // 1_000_000, last_timestamp + 1)
+                last_timestamp = timestamp
+                frame_rgb = to_rgb(frame, input_scale, frame_rgb)
+                infer_ns = now_ns()
+                result = landmarker.detect_for_video(
+                    mp.Image(image_format=mp.ImageFormat.SRGB, data=frame_rgb), timestamp)
+                block.header[ResultBlock.INFER_NS] = now_ns() - infer_ns
+                cv2.resize(frame, tile_size, dst=tile, interpolation=cv2.INTER_LINEAR)
+            finally:
+                camera.release(slot)
+
+            hands = HandVec.from_landmarks(result.hand_landmarks or [])[:max_hands]
+            sides = handedness_codes(result)[:max_hands]
+            if len(hands):
+                # Overlay at tile resolution (cheaper than the full frame)
+                pts, _ = smoother.update(hands[..., :2] * (tw, th), sides, timestamp)
+                pts = pts.astype(np.int32)
+                for hand_pts in pts:
+                    renderer.bones(tile, hand_pts, (255, 255, 0), 2)
+                renderer.joints(tile, pts, (0, 255, 0))
+            block.header[ResultBlock.OVERRUNS] = camera.overruns
+            block.write(tile, hands, sides, timestamp, capture_ns)
+    finally:
+        camera.stop()
+        cap.release()
+        landmarker.close()
+        block.set_state(STOPPED)
+        block.close()
+
+
+def merge_gestures(per_camera):
+    """
+    Gestures of every hand seen by any camera, recognized in one batch.
+    per_camera: list of (hands (n, 21, 3), sides (n,)) or None per camera.
+    Returns [(camera, hand, number, op)].
+    """
+    owners, hands, right = [], [], []
+    for cam, entry in enumerate(per_camera):
+        if entry is None:
+            continue
+        cam_hands, cam_sides = entry
+        for i in range(len(cam_hands)):
+            owners.append((cam, i))
+        hands.append(cam_hands)
+        right.append(cam_sides != LEFT)
+    if not owners:
+        return []
+    hands = np.concatenate(hands)
+    keys = GESTURES.keys(hands, right=np.concatenate(right))
+    numbers = GESTURES.lookup("number", keys)
+    ops = GESTURES.lookup("op", keys)
+    return [(cam, i, n, op) for (cam, i), n, op in zip(owners, numbers, ops)]
+
+
+def run_multicam(sources, tile_size=TILE_SIZE, max_hands=NUM_HANDS, model_path=MODEL_PATH,
+                 loop=False, show=True, duration=None, landmarker_factory=create_landmarker,
+                 on_gestures=None):
+    """
+    Start one worker process per source and run the coordinator loop until
+    'q', all sources end, or duration seconds pass. on_gestures(merged) is
+    called whenever the merged gesture list changes. Returns per-camera
+    stats.
+    """
+    ctx = multiprocessing.get_context("spawn")
+    stop = ctx.Event()
+    tw, th = tile_size
+    n = len(sources)
+    cols = math.ceil(math.sqrt(n))
+    rows = math.ceil(n / cols)
+    mosaic = np.zeros((rows * th, cols * tw, 3), np.uint8)
+    tiles = [mosaic[(i // cols) * th:(i // cols + 1) * th, (i % cols) * tw:(i % cols + 1) * tw]
+             for i in range(n)]
+    renderer = OverlayRenderer(HAND_CONNECTIONS)
+    metrics = StageMetrics(("capture_to_display",))
+
+    blocks = [ResultBlock(tile_size, max_hands, create=True) for _ in sources]
+    procs = [ctx.Process(target=camera_worker, name=f"camera-{i}", daemon=True,
+                         args=(src, block.name, tile_size, max_hands, model_path, stop),
+                         kwargs={"loop": loop, "landmarker_factory": landmarker_factory})
+             for i, (src, block) in enumerate(zip(sources, blocks))]
+    for p in procs:
+        p.start()
+
+    last_seq = [0] * n
+    latest = [None] * n
+    merged = []
+    started = time.monotonic()
+    try:
+        while True:
+            changed = False
+            for i, block in enumerate(blocks):
+                got = block.read(tiles[i], last_seq[i])
+                if got is None:
+                    continue
+                last_seq[i], hands, sides, _, capture_ns = got
+                latest[i] = (hands, sides)
+                changed = True
+                metrics.record("capture_to_display", capture_ns)
+
+            if changed:
+                gestures = merge_gestures(latest)
+                if gestures != merged:
+                    merged = gestures
+                    if on_gestures is not None:
+                        on_gestures(merged)
+                if show:
+                    # Text goes on a copy: a tile not refreshed this round still holds its last
+                    # frame, and drawing on it again would stack the old and new text
+                    display = mosaic.copy()
+                    for i, block in enumerate(blocks):
+                        infer_ms = block.header[ResultBlock.INFER_NS] / 1e6
+                        text = f"cam {i}  {infer_ms:.0f} ms"
+                        for cam, _, number, op in merged:
+                            if cam == i and (number is not None or op is not None):
+                                text += f"  {number if number is not None else ''}{op or ''}"
+                        y, x = (i // cols) * th, (i % cols) * tw
+                        renderer.put_text(display[y:y + th, x:x + tw], text, (8, 22), (0, 255, 0), 0.6, 1)
+                    cv2.imshow("Hand Tracking (multi-camera)", display)
+
+            key = cv2.waitKey(5) & 0xFF if show else -1
+            if not show:
+                time.sleep(0.005)
+            if key == ord("q"):
+                break
+            if all(not p.is_alive() for p in procs):
+                break
+            if duration is not None and time.monotonic() - started > duration:
+                break
+    finally:
+        stop.set()
+        for p in procs:
+            p.join(timeout=5.0)
+            if p.is_alive():
+                p.terminate()
+        elapsed = time.monotonic() - started
+        stats = []
+        for src, block in zip(sources, blocks):
+            processed = int(block.header[ResultBlock.PROCESSED])
+            stats.append({"source": src, "processed": processed,
+                          "fps": processed / elapsed if elapsed else 0.0,
+                          "overruns": int(block.header[ResultBlock.OVERRUNS]),
+                          "failed": block.state == FAILED})
+            block.close()
+            block.unlink()
+        if show:
+            cv2.destroyAllWindows()
+        print(metrics.summary())
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Track hands on several cameras at once.")
+    parser.add_argument("sources", nargs="+", help="camera indices and/or video files")
+    parser.add_argument("--tile", default=f"{TILE_SIZE[0]}x{TILE_SIZE[1]}", help="tile size WxH")
+    parser.add_argument("--num-hands", type=int, default=NUM_HANDS)
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--loop", action="store_true", help="restart video files at the end")
+    parser.add_argument("--duration", type=float, default=None, help="stop after N seconds")
+    parser.add_argument("--no-window", action="store_true", help="don't show the mosaic")
+    args = parser.parse_args()
+
+    tile_size = tuple(int(v) for v in args.tile.lower().split("x"))
+    stats = run_multicam(args.sources, tile_size, args.num_hands, args.model, loop=args.loop,
+                         show=not args.no_window, duration=args.duration,
+                         on_gestures=lambda merged: print("gestures:", merged))
+    for i, s in enumerate(stats):
+        state = "failed" if s["failed"] else f"{s['processed']} frames, {s['fps']:.1f} fps"
+        print(f"camera {i} ({s['source']}): {state}, {s['overruns']} overruns")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+# hand_overlay.py
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+
+# Hard-coded MediaPipe hand connections (standard MediaPipe hand graph)
+HAND_CONNECTIONS = [
+    (0, 1), (1, 2), (2, 3), (3, 4),         # Thumb
+    (0, 5), (5, 6), (6, 7), (7, 8),         # Index finger
+    (5, 9), (9, 10), (10, 11), (11, 12),    # Middle finger
+    (9, 13), (13, 14), (14, 15), (15, 16),  # Ring finger
+    (13, 17), (17, 18), (18, 19), (19, 20), # Little finger
+    (0, 17)                                 # Palm base
+]
+
+
+def chain_connections(connections):
+    """
+    Join (start, end) bone pairs into as few polylines as possible, keeping
+    the input order, e.g. (0,1),(1,2),(2,3) -> [0, 1, 2, 3].
+    """
+    paths = []
+    for start, end in connections:
+        if paths and paths[-1][-1] == start:
+            paths[-1].append(end)
+        else:
+            paths.append([start, end])
+    return [np.asarray(p) for p in paths]
+
+
+def disk_offsets(radius):
+    # (dy, dx) of every pixel cv2.circle(..., radius, -1) fills
+    size = 2 * radius + 1
+    canvas = np.zeros((size, size), np.uint8)
+    cv2.circle(canvas, (radius, radius), radius, 255, -1)
+    dy, dx = np.nonzero(canvas)
+    return dy - radius, dx - radius
+
+
+class GlyphCache:
+    """
+    Text sprites rendered once with cv2.putText and then blitted into the
+    frame with a masked cv2.copyTo, instead of rasterizing the string again
+    every frame. Coverage is thresholded, so sprites are crisp LINE_8-style
+    glyphs even on OpenCV builds that always anti-alias text.
+    """
+
+    def __init__(self, scale, thickness, font=cv2.FONT_HERSHEY_SIMPLEX, max_entries=512):
+        self.scale = scale
+        self.thickness = thickness
+        self.font = font
+        self.max_entries = max_entries
+        self._sprites = OrderedDict()
+        self._solid = {}   # color -> solid BGR tile at least as large as any sprite
+
+    def sprite(self, text):
+        """(mask, dy, dx): uint8 mask and its top-left offset from the putText origin."""
+        sprite = self._sprites.get(text)
+        if sprite is not None:
+            self._sprites.move_to_end(text)
+            return sprite
+
+        (tw, th), baseline = cv2.getTextSize(text, self.font, self.scale, self.thickness)
+        pad = self.thickness + 2
+        mask = np.zeros((th + baseline + 2 * pad, tw + 2 * pad), np.uint8)
+        cv2.putText(mask, text, (pad, pad + th), self.font, self.scale, 255,
+                    self.thickness, cv2.LINE_8)
+        mask = np.where(mask >= 128, 255, 0).astype(np.uint8)
+        sprite = (mask, -(pad + th), -pad)
+
+        self._sprites[text] = sprite
+        if len(self._sprites) > self.max_entries:
+            self._sprites.popitem(last=False)
+        return sprite
+
+    def _tile(self, color, h, w):
+        tile = self._solid.get(color)
+        if tile is None or tile.shape[0] < h or tile.shape[1] < w:
+            size = (max(h, 64), max(w, 256)) if tile is None else \
+                   (max(h, tile.shape[0]), max(w, tile.shape[1]))
+            tile = np.empty(size + (3,), np.uint8)
+            tile[:] = color
+            self._solid[color] = tile
+        return tile
+
+    def blit(self, frame, text, org, color):
+        mask, dy, dx = self.sprite(text)
+        mh, mw = mask.shape
+        fh, fw = frame.shape[:2]
+        y0, x0 = int(org[1]) + dy, int(org[0]) + dx
+
+        # Clip the sprite to the frame
+        top, left = max(0, -y0), max(0, -x0)
+        bottom, right = min(mh, fh - y0), min(mw, fw - x0)
+        if top >= bottom or left >= right:
+            return
+
+        h, w = bottom - top, right - left
+        tile = self._tile(tuple(color), h, w)
+        roi = frame[y0 + top:y0 + bottom, x0 + left:x0 + right]
+        cv2.copyTo(tile[:h, :w], mask[top:bottom, left:right], roi)
+
+
+def _stamp(frame, ys, xs, color):
+    # frame[ys, xs] = color, clipped to the frame
+    h, w = frame.shape[:2]
+    keep = (ys >= 0) & (ys < h) & (xs >= 0) & (xs < w)
+    frame[ys[keep], xs[keep]] = color
+
+
+class OverlayRenderer:
+    """
+    Batched hand overlay: one cv2.polylines call per hand for the bones,
+    all joints stamped in one fancy-indexing pass, and text (landmark
+    indices, "Num:"/"Calc:" strings) blitted from cached glyph sprites.
+    """
+
+    def __init__(self, connections, joint_radius=4, label_scale=0.4, label_thickness=1,
+                 label_offset=(5, -5)):
+        self.paths = chain_connections(connections)
+        self.joint_dy, self.joint_dx = disk_offsets(joint_radius)
+        self.labels = GlyphCache(label_scale, label_thickness)
+        self.text = {}   # (scale, thickness) -> GlyphCache for larger strings
+
+        # Sprite pixels of the labels "0".."20" flattened into one table, so
+        # all labels of all hands are stamped with a single assignment
+        dys, dxs, owners = [], [], []
+        for idx in range(21):
+            mask, dy, dx = self.labels.sprite(str(idx))
+            py, px = np.nonzero(mask)
+            dys.append(py + dy + label_offset[1])
+            dxs.append(px + dx + label_offset[0])
+            owners.append(np.full(len(py), idx))
+        self.label_dy = np.concatenate(dys)
+        self.label_dx = np.concatenate(dxs)
+        self.label_owner = np.concatenate(owners)
+
+    def bones(self, frame, pts, color, thickness):
+        # pts: (21, 2) int32 pixel coords of one hand
+        cv2.polylines(frame, [pts[p] for p in self.paths], False, color, thickness)
+
+    def joints(self, frame, pts, color):
+        # pts: (N, 2) int32 pixel coords (any number of hands stacked)
+        pts = np.asarray(pts, dtype=np.int64).reshape(-1, 2)
+        ys = (pts[:, 1, None] + self.joint_dy).ravel()
+        xs = (pts[:, 0, None] + self.joint_dx).ravel()
+        _stamp(frame, ys, xs, color)
+
+    def joint_labels(self, frame, hands_pts, color):
+        # hands_pts: (H, 21, 2); draws the landmark index next to every joint
+        hands_pts = np.asarray(hands_pts, dtype=np.int64).reshape(-1, 21, 2)
+        at = hands_pts[:, self.label_owner]                # (H, P, 2)
+        ys = (at[..., 1] + self.label_dy).ravel()
+        xs = (at[..., 0] + self.label_dx).ravel()
+        _stamp(frame, ys, xs, color)
+
+    def put_text(self, frame, text, org, color, scale=1.0, thickness=1):
+        cache = self.text.get((scale, thickness))
+        if cache is None:
+            cache = self.text[(scale, thickness)] = GlyphCache(scale, thickness)
+        cache.blit(frame, text, org, color)
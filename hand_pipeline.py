@@ -0,0 +1,156 @@
+# hand_pipeline.py
+import threading
+import traceback
+from collections import deque
+
+from hand_metrics import now_ns
+
+
+class _Stage:
+    def __init__(self, name, fn, maxsize):
+        self.name = name
+        self.fn = fn
+        self.queue = deque()
+        self.maxsize = maxsize
+        self.cond = threading.Condition()
+        self.thread = None
+        self.processed = 0
+        self.dropped = 0
+        self.max_depth = 0
+        self._depth_total = 0
+        self._puts = 0
+
+    @property
+    def mean_depth(self):
+        return self._depth_total / self._puts if self._puts else 0.0
+
+
+class Pipeline:
+    """
+    Chain of stages, each with a worker thread fed by a bounded queue.
+
+    stages: [(name, fn)]; fn(item) returns the item for the next stage, or
+    None when the item stops there. put() never blocks: if a stage's queue
+    is full its oldest item is dropped and handed to on_drop (e.g. to unpin
+    a frame), and so is an item whose stage raised or that arrives after
+    stop(). Queue depth is sampled on every put and the time items wait in
+    each queue goes to metrics as "wait_<stage>".
+
+    Until start() is called the stages run inline in the caller's thread,
+    which is what the replay driver and the benchmarks use.
+    """
+
+    def __init__(self, stages, maxsize=2, metrics=None, on_drop=None):
+        self.stages = [_Stage(name, fn, maxsize) for name, fn in stages]
+        self.metrics = metrics
+        self.on_drop = on_drop
+        self._running = False
+        self._stopped = False
+
+    @property
+    def running(self):
+        return self._running
+
+    def start(self):
+        if not self._running:
+            self._running, self._stopped = True, False
+            for i, stage in enumerate(self.stages):
+                stage.thread = threading.Thread(target=self._work, args=(i,),
+                                                name=f"pipeline-{stage.name}", daemon=True)
+                stage.thread.start()
+        return self
+
+    def stop(self, timeout=1.0):
+        """Stops the workers; items still queued are handed to on_drop."""
+        if not self._running:
+            return
+        self._running, self._stopped = False, True
+        for stage in self.stages:
+            with stage.cond:
+                stage.cond.notify_all()
+        for stage in self.stages:
+            stage.thread.join(timeout)
+            stage.thread = None
+            with stage.cond:
+                left = [item for item, _ in stage.queue]
+                stage.queue.clear()
+            for item in left:
+                self._drop(item)
+
+    def put(self, item):
+        if self._running:
+            self._put(0, item)
+        elif self._stopped:
+            self._drop(item)
+        else:
+            # Inline: run every stage right here
+            for stage in self.stages:
+                item = stage.fn(item)
+                stage.processed += 1
+                if item is None:
+                    return
+
+    def _put(self, index, item):
+        stage = self.stages[index]
+        dropped = None
+        with stage.cond:
+            if not self._running:
+                dropped = item
+            elif len(stage.queue) >= stage.maxsize:
+                dropped = stage.queue.popleft()[0]
+                stage.dropped += 1
+            if dropped is not item:
+                stage.queue.append((item, now_ns()))
+                depth = len(stage.queue)
+                stage._depth_total += depth
+                stage._puts += 1
+                if depth > stage.max_depth:
+                    stage.max_depth = depth
+                stage.cond.notify()
+        if dropped is not None:
+            if self.metrics is not None:
+                self.metrics.count(f"dropped_{stage.name}")
+            self._drop(dropped)
+
+    def _drop(self, item):
+        if self.on_drop is not None:
+            self.on_drop(item)
+
+    def _work(self, index):
+        stage = self.stages[index]
+        wait_name = f"wait_{stage.name}"
+        last = index == len(self.stages) - 1
+        while True:
+            with stage.cond:
+                while self._running and not stage.queue:
+                    stage.cond.wait()
+                if not self._running:
+                    return
+                item, queued_ns = stage.queue.popleft()
+            if self.metrics is not None:
+                self.metrics.record(wait_name, queued_ns)
+            try:
+                item = stage.fn(item)
+            except Exception:
+                print(f"Pipeline stage {stage.name} failed:")
+                traceback.print_exc()
+                self._drop(item)
+                continue
+            stage.processed += 1
+            if item is not None and not last:
+                self._put(index + 1, item)
+
+    @property
+    def capacity(self):
+        # Most items held at once: full queues plus one in each running stage
+        if not self._running:
+            return 0
+        return sum(s.maxsize + 1 for s in self.stages)
+
+    def depths(self):
+        """{stage: (current, mean, max)} queue depths."""
+        return {s.name: (len(s.queue), s.mean_depth, s.max_depth) for s in self.stages}
+
+    def summary(self):
+        return "Pipeline queues (depth now/mean/max, dropped): " + "  ".join(
+            f"{s.name} {len(s.queue)}/{s.mean_depth:.1f}/{s.max_depth} {s.dropped}" for s in self.stages)
@@ -0,0 +1,253 @@
+# hand_record.py
+"""
+Compact binary recording of per-frame landmark results and a replay driver
+that feeds them back into hand_result_callback without a camera or model.
+
+File layout: a 64-byte header followed by fixed-size records
+(record_dtype()), so a recording can be opened with np.memmap and indexed
+like an array.
+
+    python hand_record.py replay session.hlr --speed 0 --calculator
+"""
+import argparse
+import os
+import struct
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from hand_vec import HandVec
+
+
+MAGIC = b"HLREC\x00\x00\x01"
+HEADER = struct.Struct("<8sIIII")   # magic, version, max_hands, width, height
+HEADER_SIZE = 64
+VERSION = 1
+CHUNK_FRAMES = 256   # records buffered in memory before each append
+
+# Handedness values stored per hand
+LEFT, RIGHT, UNKNOWN = 0, 1, -1
+
+# Stand-ins for the MediaPipe result types consumed by the callback
+Landmark = namedtuple("Landmark", "x y z")
+Category = namedtuple("Category", "category_name score")
+ReplayResult = namedtuple("ReplayResult", "hand_landmarks handedness")
+
+
+def record_dtype(max_hands):
+    return np.dtype([
+        ("timestamp_ms", "<i8"),
+        ("n_hands", "u1"),
+        ("handedness", "i1", (max_hands,)),
+        ("landmarks", "<f4", (max_hands, 21, 3)),
+    ])
+
+
+class ReplayImage:
+    # Minimal mp.Image stand-in; the callback copies the canvas before drawing
+    def __init__(self, width, height, background=None):
+        if background is None:
+            background = np.zeros((height, width, 3), dtype=np.uint8)
+        self._frame = background
+
+    def numpy_view(self):
+        return self._frame
+
+
+class LandmarkWriter:
+    """
+    Appends landmark records to a file in chunks of CHUNK_FRAMES.
+    Safe to call from the MediaPipe callback thread (single writer).
+    """
+
+    def __init__(self, path, width, height, max_hands=2, chunk_frames=CHUNK_FRAMES):
+        self.path = path
+        self.max_hands = max_hands
+        self.dtype = record_dtype(max_hands)
+        self._buf = np.zeros(chunk_frames, dtype=self.dtype)
+        self._n = 0
+        self.frames = 0
+
+        self._file = open(path, "wb")
+        header = HEADER.pack(MAGIC, VERSION, max_hands, width, height)
+        self._file.write(header.ljust(HEADER_SIZE, b"\x00"))
+
+    def append(self, timestamp_ms, hands, handedness=None):
+        # hands: (n, 21, 3) array; handedness: sequence of LEFT/RIGHT/UNKNOWN
+        n = min(len(hands), self.max_hands)
+        rec = self._buf[self._n]
+        rec["timestamp_ms"] = timestamp_ms
+        rec["n_hands"] = n
+        rec["handedness"] = UNKNOWN
+        rec["landmarks"] = 0
+        if n:
+            rec["landmarks"][:n] = np.asarray(hands, dtype=np.float32)[:n]
+            if handedness is not None:
+                rec["handedness"][:n] = np.asarray(handedness, dtype=np.int8)[:n]
+
+        self._n += 1
+        self.frames += 1
+        if self._n == len(self._buf):
+            self.flush()
+
+    def append_result(self, result, timestamp_ms):
+        # Record a MediaPipe HandLandmarkerResult
+        hands = getattr(result, "hand_landmarks", None) or []
+        sides = []
+        for categories in (getattr(result, "handedness", None) or [])[:len(hands)]:
+            name = categories[0].category_name if categories else None
+            sides.append(RIGHT if name == "Right" else LEFT if name == "Left" else UNKNOWN)
+        self.append(timestamp_ms, HandVec.from_landmarks(hands[:self.max_hands]), sides or None)
+
+    def flush(self):
+        if self._n:
+            self._file.write(self._buf[:self._n].tobytes())
+            self._file.flush()
+            self._n = 0
+
+    def close(self):
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class LandmarkRecording:
+    """Read-only view of a recording backed by np.memmap."""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            magic, version, max_hands, width, height = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a landmark recording")
+        if version != VERSION:
+            raise ValueError(f"unsupported recording version {version}")
+
+        self.path = path
+        self.max_hands = max_hands
+        self.width = width
+        self.height = height
+        self.dtype = record_dtype(max_hands)
+
+        # A trailing partial record (e.g. crash mid-write) is ignored
+        n = (os.path.getsize(path) - HEADER_SIZE) // self.dtype.itemsize
+        if n > 0:
+            self.records = np.memmap(path, dtype=self.dtype, mode="r",
+                                     offset=HEADER_SIZE, shape=(n,))
+        else:
+            self.records = np.zeros(0, dtype=self.dtype)
+
+    def __len__(self):
+        return len(self.records)
+
+    def hands(self, i):
+        # (n_hands, 21, 3) view of frame i
+        rec = self.records[i]
+        return rec["landmarks"][:rec["n_hands"]]
+
+    def result(self, i):
+        # Frame i as a MediaPipe-shaped result object
+        rec = self.records[i]
+        n = int(rec["n_hands"])
+        hand_landmarks = [[Landmark(*map(float, p)) for p in rec["landmarks"][h]]
+                          for h in range(n)]
+        handedness = []
+        for side in rec["handedness"][:n]:
+            name = "Right" if side == RIGHT else "Left" if side == LEFT else ""
+            handedness.append([Category(name, 1.0)])
+        return ReplayResult(hand_landmarks, handedness)
+
+
+def replay(recording, callback, speed=0.0, background=None, loops=1):
+    """
+    Feed every record into callback(result, output_image, timestamp_ms).
+    speed: 0 runs as fast as possible, 1.0 is real time, 4.0 is 4x.
+    Returns (frames, seconds).
+    """
+    if isinstance(recording, str):
+        recording = LandmarkRecording(recording)
+    image = ReplayImage(recording.width, recording.height, background)
+
+    frames = 0
+    start = time.perf_counter()
+    for loop in range(loops):
+        t0 = None
+        loop_start = time.perf_counter()
+        offset = loop * (int(recording.records["timestamp_ms"][-1]) + 1) if len(recording) else 0
+        for i in range(len(recording)):
+            ts = int(recording.records[i]["timestamp_ms"])
+            if speed > 0:
+                if t0 is None:
+                    t0 = ts
+                delay = (ts - t0) / 1000.0 / speed - (time.perf_counter() - loop_start)
+                if delay > 0:
+                    time.sleep(delay)
+            callback(recording.result(i), image, ts + offset)
+            frames += 1
+
+    return frames, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Landmark recording tools.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    rp = sub.add_parser("replay", help="replay a recording through hand_result_callback")
+    rp.add_argument("path")
+    rp.add_argument("--speed", type=float, default=0.0, help="0 = as fast as possible, 1 = real time")
+    rp.add_argument("--loops", type=int, default=1)
+    rp.add_argument("--show", action="store_true", help="display the rendered frames")
+    for toggle in ("no-draw", "no-landmarks", "no-bbox", "track-numbers", "calculator", "mouse"):
+        rp.add_argument(f"--{toggle}", action="store_true")
+
+    info = sub.add_parser("info", help="print a summary of a recording")
+    info.add_argument("path")
+
+    args = parser.parse_args()
+    recording = LandmarkRecording(args.path)
+
+    if args.cmd == "info":
+        ts = recording.records["timestamp_ms"]
+        span = (ts[-1] - ts[0]) / 1000.0 if len(ts) else 0.0
+        print(f"{args.path}: {len(recording)} frames, {span:.1f}s, "
+              f"{recording.width}x{recording.height}, max_hands={recording.max_hands}, "
+              f"{int(recording.records['n_hands'].sum())} hands")
+        return
+
+    import hand_tracking_cam as htc
+    htc.DRAW = not args.no_draw
+    htc.DRAW_LANDMARKS = not args.no_landmarks
+    htc.SHOW_BBOX = not args.no_bbox
+    htc.TRACK_NUMBERS = args.track_numbers
+    htc.CALCULATOR = args.calculator
+    htc.MOUSE_CONTROL = args.mouse
+
+    callback = htc.hand_result_callback
+    if args.show:
+        import cv2
+
+        def callback(result, image, ts):
+            htc.hand_result_callback(result, image, ts)
+            front = htc._display.acquire()
+            if front is not None:
+                cv2.imshow("Replay", front[0])
+                cv2.waitKey(1)
+
+    frames, seconds = replay(recording, callback, args.speed, loops=args.loops)
+    span = 0.0
+    if len(recording):
+        ts = recording.records["timestamp_ms"]
+        span = (ts[-1] - ts[0]) / 1000.0 * args.loops
+    print(f"Replayed {frames} frames in {seconds:.2f}s "
+          f"({frames / max(seconds, 1e-9):.0f} frames/s, "
+          f"{span / max(seconds, 1e-9):.1f}x real time)")
+
+
+if __name__ == "__main__":
+    main()
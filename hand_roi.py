@@ -0,0 +1,138 @@
+# hand_roi.py
+import threading
+
+import cv2
+
+
+class RoiTracker:
+    """
+    Crops the landmarker input to where the hands were last seen.
+
+    After every result the union box of all hands (normalized, full frame) is
+    stored together with its velocity. For the next frame the box is moved
+    to its predicted position, padded by `margin`, cut out of the BGR frame
+    and downscaled to at most `max_input` pixels on the long side before the
+    color conversion, so both conversion and inference run on a small image.
+    Landmarks coming back are in crop coordinates and are mapped back with
+    remap().
+
+    Full-frame detection is used when no hand is tracked (lost track), every
+    `redetect_interval` submissions while fewer than max_hands are tracked
+    (so new hands can enter), and when the crop would be nearly the whole
+    frame anyway.
+    """
+
+    def __init__(self, margin=0.35, min_size=0.2, max_input=480, max_hands=2,
+                 redetect_interval=30, max_area=0.6):
+        self.margin = margin
+        self.min_size = min_size
+        self.max_input = max_input
+        self.max_hands = max_hands
+        self.redetect_interval = redetect_interval
+        self.max_area = max_area
+        self._lock = threading.Lock()
+        self._box = None        # (x0, y0, x1, y1) normalized, last result
+        self._box_ts = None
+        self._hands = 0
+        self._velocity = (0.0, 0.0)   # box center, normalized units per ms
+        self._since_full = 0
+        self.cropped = 0
+        self.full = 0
+        self.lost = 0
+
+    def reset(self):
+        with self._lock:
+            self._box = None
+            self._box_ts = None
+            self._hands = 0
+            self._velocity = (0.0, 0.0)
+
+    def update(self, hands, timestamp_ms):
+        """Feed the (full-frame, normalized) landmarks of a result."""
+        box = None
+        for hand in hands:
+            xs = [lm.x for lm in hand]
+            ys = [lm.y for lm in hand]
+            hb = (min(xs), min(ys), max(xs), max(ys))
+            box = hb if box is None else (min(box[0], hb[0]), min(box[1], hb[1]),
+                                          max(box[2], hb[2]), max(box[3], hb[3]))
+        with self._lock:
+            if box is None:
+                if self._box is not None:
+                    self.lost += 1
+                self._box = None
+                self._box_ts = None
+                self._hands = 0
+                self._velocity = (0.0, 0.0)
+                return
+            if self._box is not None and timestamp_ms > self._box_ts:
+                dt = timestamp_ms - self._box_ts
+                self._velocity = (((box[0] + box[2]) - (self._box[0] + self._box[2])) / (2 * dt),
+                                  ((box[1] + box[3]) - (self._box[1] + self._box[3])) / (2 * dt))
+            self._box = box
+            self._box_ts = timestamp_ms
+            self._hands = len(hands)
+
+    def plan(self, timestamp_ms, w, h):
+        """Pixel crop (x0, y0, x1, y1) for the frame at timestamp_ms, or None for full frame."""
+        with self._lock:
+            box, box_ts, hands, (vx, vy) = self._box, self._box_ts, self._hands, self._velocity
+            redetect = hands < self.max_hands and self._since_full >= self.redetect_interval
+            if box is None or redetect:
+                self._since_full = 0
+                self.full += 1
+                return None
+            self._since_full += 1
+
+        # Predict where the hands are now, at most one box size away
+        bw, bh = box[2] - box[0], box[3] - box[1]
+        dt = timestamp_ms - box_ts
+        dx = max(-bw, min(vx * dt, bw))
+        dy = max(-bh, min(vy * dt, bh))
+        cx, cy = (box[0] + box[2]) / 2 + dx, (box[1] + box[3]) / 2 + dy
+
+        # Pad in pixels, keep a minimum size so fast hands stay inside
+        side = self.min_size * min(w, h)
+        cw = max(bw * w * (1 + 2 * self.margin), side)
+        ch = max(bh * h * (1 + 2 * self.margin), side)
+        x0 = max(0, int(cx * w - cw / 2))
+        y0 = max(0, int(cy * h - ch / 2))
+        x1 = min(w, int(cx * w + cw / 2))
+        y1 = min(h, int(cy * h + ch / 2))
+        if x1 - x0 < 2 or y1 - y0 < 2 or (x1 - x0) * (y1 - y0) > self.max_area * w * h:
+            with self._lock:
+                self.full += 1
+            return None
+        with self._lock:
+            self.cropped += 1
+        return x0, y0, x1, y1
+
+    def prepare(self, frame_bgr, roi, scale=1.0):
+        """
+        RGB landmarker input for roi: crop, downscale, then convert (small
+        image). scale shrinks the crop further (adaptive resolution).
+        """
+        x0, y0, x1, y1 = roi
+        crop = frame_bgr[y0:y1, x0:x1]
+        ch, cw = crop.shape[:2]
+        scale = min(scale, self.max_input / max(cw, ch))
+        if scale < 1.0:
+            # INTER_LINEAR: INTER_AREA costs more than converting the whole frame
+            crop = cv2.resize(crop, (max(1, round(cw * scale)), max(1, round(ch * scale))),
+                              interpolation=cv2.INTER_LINEAR)
+        return cv2.cvtColor(crop, cv2.COLOR_BGR2RGB)
+
+    @staticmethod
+    def remap(hands, roi, w, h):
+        """
+        Map normalized landmarks of the crop back to the full frame, in place.
+        z follows MediaPipe's convention of roughly the same scale as x.
+        """
+        x0, y0, x1, y1 = roi
+        sx, sy = (x1 - x0) / w, (y1 - y0) / h
+        ox, oy = x0 / w, y0 / h
+        for hand in hands:
+            for lm in hand:
+                lm.x = ox + lm.x * sx
+                lm.y = oy + lm.y * sy
+                lm.z = lm.z * sx
@@ -0,0 +1,84 @@
+# hand_scale.py
+from collections import deque
+
+import cv2
+import numpy as np
+
+
+def to_rgb(frame_bgr, scale=1.0, dst=None):
+    """
+    Landmarker input: frame_bgr downscaled by scale, converted to RGB. dst is
+    reused when it has the right shape (pass the previous return value).
+    """
+    if scale < 1.0:
+        h, w = frame_bgr.shape[:2]
+        frame_bgr = cv2.resize(frame_bgr, (max(1, round(w * scale)), max(1, round(h * scale))),
+                               interpolation=cv2.INTER_LINEAR)
+    if dst is None or dst.shape != frame_bgr.shape:
+        dst = np.empty_like(frame_bgr)
+    cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB, dst=dst)
+    return dst
+
+
+class ResolutionController:
+    """
+    Picks the scale of the landmarker input from measured inference latency.
+
+    Latencies are collected in a window; once it is full, its median is
+    compared with the budget. Over budget steps one level down, under
+    up_ratio * budget steps one level up, anything in between keeps the
+    level (hysteresis). The window restarts after every change so the next
+    decision only sees samples taken at the new scale.
+
+    Landmarks are normalized, so they map to the same full-frame pixels at
+    every scale; only the input image handed to the landmarker shrinks.
+    """
+
+    LEVELS = (1.0, 0.8, 0.64, 0.5, 0.4, 0.32, 0.25)
+
+    def __init__(self, budget_ms=33.0, window=15, up_ratio=0.6, min_width=320, metrics=None):
+        self.budget_ms = budget_ms
+        self.up_ratio = up_ratio
+        self.min_width = min_width
+        self.metrics = metrics
+        self.enabled = True
+        self._samples = deque(maxlen=window)
+        self.level = 0
+        self.changes = 0
+        self._max_level = len(self.LEVELS) - 1
+
+    @property
+    def scale(self):
+        return self.LEVELS[self.level] if self.enabled else 1.0
+
+    def start_at(self, scale):
+        # Level closest to scale (e.g. from a hand_tune.py profile)
+        self.level = min(range(len(self.LEVELS)), key=lambda i: abs(self.LEVELS[i] - scale))
+        self._samples.clear()
+
+    def set_frame_width(self, width):
+        # Never go below min_width pixels of input
+        self._max_level = max(
+            [i for i, s in enumerate(self.LEVELS) if width * s >= self.min_width] or [0])
+        self.level = min(self.level, self._max_level)
+
+    def observe(self, latency_ms):
+        """Feed one inference latency; returns the (possibly new) scale."""
+        samples = self._samples
+        samples.append(latency_ms)
+        if not self.enabled or len(samples) < samples.maxlen:
+            return self.scale
+
+        median = sorted(samples)[len(samples) // 2]
+        if median > self.budget_ms and self.level < self._max_level:
+            self._step(+1, "resolution_down")
+        elif median < self.budget_ms * self.up_ratio and self.level > 0:
+            self._step(-1, "resolution_up")
+        return self.scale
+
+    def _step(self, delta, counter):
+        self.level += delta
+        self.changes += 1
+        self._samples.clear()
+        if self.metrics is not None:
+            self.metrics.count(counter)
@@ -0,0 +1,68 @@
+# hand_sched.py
+import threading
+
+from hand_metrics import now_ns
+
+
+class InferenceScheduler:
+    """
+    Latest-frame-wins gate in front of detect_async: at most one frame is
+    in flight to the landmarker. The capture loop offers every new frame;
+    while a frame is in flight the new one is dropped, so whatever is
+    captured next after the result arrives is the one submitted.
+    """
+
+    def __init__(self, stale_ms=1000, metrics=None):
+        self.stale_ns = stale_ms * 1_000_000
+        self.metrics = metrics
+        self._lock = threading.Lock()
+        self._inflight_ts = None
+        self._inflight_since = 0
+        self.submitted = 0   # written by the capture thread
+        self.dropped = 0     # written by the capture thread
+        self.completed = 0   # written by the callback thread
+        self.stale = 0
+
+    def try_submit(self, timestamp_ms):
+        """Claim the slot for timestamp_ms; False means drop this frame."""
+        t = now_ns()
+        with self._lock:
+            if self._inflight_ts is not None:
+                if t - self._inflight_since < self.stale_ns:
+                    self.dropped += 1
+                    self._count("frames_dropped")
+                    return False
+                # Result never came back; don't stall forever
+                self.stale += 1
+                self._count("frames_stale")
+            self._inflight_ts = timestamp_ms
+            self._inflight_since = t
+        self.submitted += 1
+        self._count("frames_submitted")
+        return True
+
+    def cancel(self, timestamp_ms):
+        # Submission failed; free the slot again
+        with self._lock:
+            if self._inflight_ts == timestamp_ms:
+                self._inflight_ts = None
+
+    def done(self, timestamp_ms):
+        """Called from the result callback once the landmarker is free."""
+        with self._lock:
+            if self._inflight_ts is not None and timestamp_ms >= self._inflight_ts:
+                self._inflight_ts = None
+        self.completed += 1
+        self._count("frames_processed")
+
+    @property
+    def busy(self):
+        return self._inflight_ts is not None
+
+    def drop_ratio(self):
+        total = self.submitted + self.dropped
+        return self.dropped / total if total else 0.0
+
+    def _count(self, name):
+        if self.metrics is not None:
+            self.metrics.count(name)
@@ -0,0 +1,282 @@
+# hand_session.py
+"""
+Session recording for auditing: annotated video and raw landmarks written
+by a background thread into time-based segments, keeping only the newest.
+
+    sessions/session_20240101_120000_0001.avi   annotated frames (MJPG)
+    sessions/session_20240101_120000_0001.hlr   landmarks (hand_record.py format)
+
+The live threads only hand items over: add_frame() copies the frame into a
+bounded queue and add_landmarks() queues a small array. When a queue is
+full the new item is dropped and counted (before any copy), so slow
+encoding or disk I/O shows up as drop counters, never as latency.
+
+Frames arrive at the display rate (down to a few fps while the motion gate
+idles), but the video is written at a constant fps: each frame goes into
+the slot of its capture time, gaps repeat the previous frame, so playback
+runs at real speed and stays in step with the landmark timestamps.
+
+    python hand_session.py sessions/     # list segments with frame counts
+"""
+import argparse
+import os
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from hand_metrics import now_ns
+from hand_record import LandmarkRecording, LandmarkWriter
+from hand_smooth import handedness_codes
+from hand_vec import HandVec
+
+PREFIX = "session_"
+
+
+class SessionRecorder:
+    """
+    One writer thread fed by two bounded queues (frames, landmarks).
+    Segments rotate every segment_s seconds; beyond keep_segments the
+    oldest segment's files are deleted (0 = keep all), counting the
+    segments earlier runs left in the directory. video=False records
+    landmarks only (headless runs have no annotated frames).
+    """
+
+    def __init__(self, directory, size, fps=20.0, max_hands=2, segment_s=60, keep_segments=10,
+                 frame_queue=8, landmark_queue=256, codec="MJPG", metrics=None, video=True):
+        self.directory = Path(directory)
+        self.size = tuple(size)   # (w, h) of the recorded video
+        self.fps = fps
+        self.max_hands = max_hands
+        self.segment_s = segment_s
+        self.keep_segments = keep_segments
+        self.codec = codec
+        self.video = video
+        self.metrics = metrics
+        self._frames = deque()
+        self._landmarks = deque()
+        self._frame_queue = frame_queue
+        self._landmark_queue = landmark_queue
+        self._cond = threading.Condition()
+        self._thread = None
+        self._running = False
+        self._video = None
+        self._writer = None
+        self._opened = None
+        self._video_start_ns = None   # capture time of the segment's first video frame
+        self._video_frames = 0        # frames written to the segment, repeats included
+        self._last_frame = None
+        self._stamp = time.strftime("%Y%m%d_%H%M%S")
+        self.segments = []   # base paths (no suffix) still on disk, oldest first (set by start())
+        self.segment_count = 0
+        self.frames_written = self.frames_dropped = 0
+        self.landmarks_written = self.landmarks_dropped = 0
+
+    @property
+    def running(self):
+        return self._running
+
+    def start(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.segments = segment_bases(self.directory)
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="session-recorder", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=5.0):
+        """Writes what is still queued, then closes the current segment."""
+        if self._thread is None:
+            return
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def add_frame(self, frame_bgr, capture_ns=None):
+        """
+        Queues a copy of an annotated frame; False if it was dropped.
+        capture_ns: now_ns() time the frame was captured (default: now).
+        """
+        if not self.video:
+            return False
+        if capture_ns is None:
+            capture_ns = now_ns()
+        with self._cond:
+            if not self._running or len(self._frames) >= self._frame_queue:
+                self._drop("frames")
+                return False
+            self._frames.append((capture_ns, frame_bgr.copy()))
+            self._cond.notify()
+        return True
+
+    def add_landmarks(self, timestamp_ms, hands, sides=None, roi=None):
+        """
+        Queues (n, 21, 3) normalized landmarks. roi = (x0, y0, x1, y1) crop
+        the landmarks refer to (ROI tracking); mapped to the frame by the writer.
+        """
+        with self._cond:
+            if not self._running or len(self._landmarks) >= self._landmark_queue:
+                self._drop("landmarks")
+                return False
+            self._landmarks.append((timestamp_ms, hands, sides, roi))
+            self._cond.notify()
+        return True
+
+    def add_result(self, result, timestamp_ms, roi=None):
+        # Raw MediaPipe result from the callback, before anything edits its landmarks.
+        # Converted only if there is room (add_landmarks checks again, under the lock).
+        with self._cond:
+            if not self._running or len(self._landmarks) >= self._landmark_queue:
+                self._drop("landmarks")
+                return False
+        hands = getattr(result, "hand_landmarks", None) or []
+        return self.add_landmarks(timestamp_ms, HandVec.from_landmarks(hands[:self.max_hands]),
+                                  handedness_codes(result)[:self.max_hands], roi)
+
+    def _drop(self, kind):
+        if kind == "frames":
+            self.frames_dropped += 1
+        else:
+            self.landmarks_dropped += 1
+        if self.metrics is not None:
+            self.metrics.count(f"record_{kind}_dropped")
+
+    @property
+    def dropped(self):
+        return self.frames_dropped + self.landmarks_dropped
+
+    def _run(self):
+        try:
+            while True:
+                # Landmarks are cheap: take them all, frames one at a time
+                with self._cond:
+                    while self._running and not (self._frames or self._landmarks):
+                        self._cond.wait()
+                    if not (self._frames or self._landmarks):
+                        return
+                    landmarks, self._landmarks = self._landmarks, deque()
+                    frame = self._frames.popleft() if self._frames else None
+                if self._opened is None or self._segment_due():
+                    self._rotate()
+                for item in landmarks:
+                    self._write_landmarks(*item)
+                if frame is not None:
+                    self._write_frame(*frame)
+        except Exception as e:
+            print("Session recorder stopped:", e)
+            with self._cond:
+                self._running = False
+        finally:
+            self._close_segment()
+
+    def _segment_due(self):
+        return time.monotonic() - self._opened >= self.segment_s
+
+    def _rotate(self):
+        self._close_segment()
+        self.segment_count += 1
+        base = self.directory / f"{PREFIX}{self._stamp}_{self.segment_count:04d}"
+        w, h = self.size
+        if self.video:
+            self._video = cv2.VideoWriter(str(base) + ".avi", cv2.VideoWriter_fourcc(*self.codec), self.fps, (w, h))
+            if not self._video.isOpened():
+                raise OSError(f"cannot open video writer for {base}.avi")
+        self._writer = LandmarkWriter(str(base) + ".hlr", w, h, self.max_hands)
+        self._opened = time.monotonic()
+        self._video_start_ns = None
+        self._video_frames = 0
+        self._last_frame = None
+        if base in self.segments:   # a run restarted within the same second overwrites it
+            self.segments.remove(base)
+        self.segments.append(base)
+
+        # Oldest segments beyond keep_segments go
+        while self.keep_segments and len(self.segments) > self.keep_segments:
+            old = self.segments.pop(0)
+            for suffix in (".avi", ".hlr"):
+                try:
+                    os.remove(str(old) + suffix)
+                except OSError:
+                    pass
+
+    def _close_segment(self):
+        if self._video is not None:
+            self._video.release()
+            self._video = None
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def _write_frame(self, capture_ns, frame):
+        start_ns = now_ns()
+        if self._video_start_ns is None:
+            self._video_start_ns = capture_ns
+        slot = int((capture_ns - self._video_start_ns) * self.fps / 1e9)
+        if slot < self._video_frames:
+            return   # slot already filled: frames come faster than fps (or out of order)
+        if frame.shape[1::-1] != self.size:
+            frame = cv2.resize(frame, self.size, interpolation=cv2.INTER_LINEAR)
+        while self._video_frames < slot:   # gap: hold the previous frame
+            self._video.write(self._last_frame)
+            self._video_frames += 1
+        self._video.write(frame)
+        self._video_frames = slot + 1
+        self._last_frame = frame
+        self.frames_written += 1
+        if self.metrics is not None:
+            self.metrics.record("record_frame", start_ns)
+
+    def _write_landmarks(self, timestamp_ms, hands, sides, roi):
+        if roi is not None and len(hands):
+            # Crop-normalized -> frame-normalized (same mapping as RoiTracker.remap)
+            w, h = self.size
+            x0, y0, x1, y1 = roi
+            sx, sy = (x1 - x0) / w, (y1 - y0) / h
+            hands = hands * np.float32((sx, sy, sx)) + np.float32((x0 / w, y0 / h, 0))
+        self._writer.append(timestamp_ms, hands, sides)
+        self.landmarks_written += 1
+
+    def summary(self):
+        return (f"Session recording: {self.segment_count} segments ({len(self.segments)} kept) in {self.directory}, "
+                f"{self.frames_written} frames ({self.frames_dropped} dropped), "
+                f"{self.landmarks_written} landmark records ({self.landmarks_dropped} dropped)")
+
+
+def segment_bases(directory):
+    """Base paths (no suffix) of the segments in directory, oldest first."""
+    directory = Path(directory)
+    return sorted({path.with_suffix("") for suffix in (".avi", ".hlr")
+                   for path in directory.glob(f"{PREFIX}*{suffix}")})
+
+
+def list_segments(directory):
+    """[(base path, video frames, landmark records)] of the segments in directory, oldest first."""
+    rows = []
+    for base in segment_bases(directory):
+        video = base.with_suffix(".avi")
+        frames = 0
+        if video.exists():
+            cap = cv2.VideoCapture(str(video))
+            frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) if cap.isOpened() else 0
+            cap.release()
+        landmarks = base.with_suffix(".hlr")
+        records = len(LandmarkRecording(str(landmarks))) if landmarks.exists() else 0
+        rows.append((base, frames, records))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List recorded session segments.")
+    parser.add_argument("directory")
+    args = parser.parse_args()
+    for base, frames, records in list_segments(args.directory):
+        print(f"{base.name}  {frames:>6} frames  {records:>6} landmark records")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+# hand_smooth.py
+import math
+
+import numpy as np
+
+LEFT, RIGHT, UNKNOWN = 0, 1, -1   # same codes as hand_record
+
+
+def handedness_codes(result):
+    # (N,) int8 LEFT/RIGHT/UNKNOWN from a HandLandmarkerResult
+    sides = []
+    for categories in getattr(result, "handedness", None) or []:
+        name = categories[0].category_name if categories else ""
+        sides.append(LEFT if name == "Left" else RIGHT if name == "Right" else UNKNOWN)
+    n = len(getattr(result, "hand_landmarks", None) or [])
+    sides += [UNKNOWN] * (n - len(sides))
+    return np.array(sides[:n], dtype=np.int8)
+
+
+class HandSmoother:
+    """
+    One Euro filter over all landmarks of all hands at once, with stable
+    track IDs.
+
+    State lives in preallocated (max_hands, 21, 2) arrays, one row per track
+    slot. Every frame the detected hands are matched to slots by wrist
+    distance (in palm lengths) plus a penalty when handedness disagrees, so
+    two hands keep their own filter state when MediaPipe reorders them.
+
+    The filter cutoff grows with each landmark's speed: still hands are
+    smoothed hard (no jitter), fast moves pass through with little lag.
+    min_cutoff is in Hz, beta in Hz per pixel/second.
+    """
+
+    WRIST, MIDDLE_MCP = 0, 9
+
+    def __init__(self, max_hands=2, min_cutoff=1.0, beta=0.02, d_cutoff=1.0,
+                 match_radius=3.0, side_penalty=1.0, max_age_ms=300, n_points=21):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.match_radius = match_radius
+        self.side_penalty = side_penalty
+        self.max_age_ms = max_age_ms
+        shape = (max_hands, n_points, 2)
+        self.x = np.zeros(shape)           # filtered positions
+        self.dx = np.zeros(shape)          # filtered velocities (px/s)
+        self.t_ms = np.zeros(max_hands)    # last update per slot
+        self.active = np.zeros(max_hands, dtype=bool)
+        self.side = np.full(max_hands, UNKNOWN, dtype=np.int8)
+        self.track_id = np.full(max_hands, -1, dtype=np.int64)
+        self._next_id = 0
+
+    def reset(self):
+        self.active[:] = False
+        self.track_id[:] = -1
+
+    def _match(self, wrists, palms, sides, timestamp_ms):
+        # Slot for every hand; hands without a close enough track get a free slot.
+        # Plain Python: with a couple of hands this beats any array setup.
+        n_slots = len(self.active)
+        t_ms = self.t_ms.tolist()
+        active = [a and 0 <= timestamp_ms - t <= self.max_age_ms   # time went backwards: start over
+                  for a, t in zip(self.active.tolist(), t_ms)]
+        track_wrists = self.x[:, self.WRIST].tolist()
+        track_sides = self.side.tolist()
+
+        pairs = []
+        for i, ((x, y), palm, side) in enumerate(zip(wrists, palms, sides)):
+            for s in range(n_slots):
+                if active[s]:
+                    tx, ty = track_wrists[s]
+                    cost = math.hypot(x - tx, y - ty) / max(palm, 1.0)
+                    if side != UNKNOWN and track_sides[s] != UNKNOWN and side != track_sides[s]:
+                        cost += self.side_penalty
+                    if cost <= self.match_radius:
+                        pairs.append((cost, i, s))
+
+        # Greedy on the global minimum (a couple of hands at most)
+        slots = [-1] * len(wrists)
+        taken = set()
+        for _, i, s in sorted(pairs):
+            if slots[i] < 0 and s not in taken:
+                slots[i] = s
+                taken.add(s)
+
+        fresh = [False] * len(wrists)
+        for i in range(len(wrists)):
+            if slots[i] >= 0:
+                continue
+            free = [s for s in range(n_slots) if not active[s] and s not in taken]
+            if not free:
+                # More hands than slots: reuse the stalest unclaimed track
+                free = sorted((s for s in range(n_slots) if s not in taken), key=t_ms.__getitem__)
+            if not free:
+                continue
+            s = free[0]
+            slots[i] = s
+            fresh[i] = True
+            taken.add(s)
+            self.track_id[s] = self._next_id
+            self._next_id += 1
+        return slots, fresh
+
+    def update(self, points, sides=None, timestamp_ms=0):
+        """
+        points: (N, 21, 2) pixel coordinates of this frame's hands.
+        sides: (N,) handedness codes or None. Returns (smoothed (N, 21, 2)
+        float64, track IDs (N,)); hands beyond max_hands come back raw with
+        ID -1.
+        """
+        points = np.asarray(points, dtype=np.float64)
+        n = len(points)
+        sides = [UNKNOWN] * n if sides is None else [int(v) for v in sides]
+        if not n:
+            return points.copy(), np.full(0, -1, dtype=np.int64)
+
+        wrists = points[:, self.WRIST].tolist()
+        palms = np.hypot(*(points[:, self.MIDDLE_MCP] - points[:, self.WRIST]).T).tolist()
+        slots, fresh = self._match(wrists, palms, sides, timestamp_ms)
+
+        out = points.copy()
+        go = [i for i in range(n) if slots[i] >= 0 and not fresh[i]]
+        if go:
+            # One Euro step for all continuing tracks; per-track scalars are
+            # folded in Python, so the array work is a handful of ufuncs
+            h = go if len(go) < n else slice(None)
+            s = [slots[i] for i in go]
+            dt = [max((timestamp_ms - t) * 1e-3, 1e-3) for t in self.t_ms[s].tolist()]
+            a_d = [self._alpha(d, self.d_cutoff) for d in dt]
+            c_v = np.array([a / d for a, d in zip(a_d, dt)])[:, None, None]
+            c_p = np.array([1 - a for a in a_d])[:, None, None]
+            w = 2 * math.pi * np.array(dt)[:, None]
+
+            x, x_prev = points[h], self.x[s]
+            diff = x - x_prev
+            dx = diff * c_v + self.dx[s] * c_p
+            # alpha = 2*pi*f*dt / (2*pi*f*dt + 1), f = min_cutoff + beta * speed
+            wf = (self.min_cutoff + self.beta * np.hypot(dx[..., 0], dx[..., 1])) * w
+            diff *= (wf / (wf + 1))[..., None]
+            x_prev += diff
+
+            self.x[s] = x_prev
+            self.dx[s] = dx
+            out[h] = x_prev
+
+        for i in range(n):
+            s = slots[i]
+            if s < 0:
+                continue
+            if fresh[i]:
+                self.x[s] = points[i]
+                self.dx[s] = 0.0
+            self.t_ms[s] = timestamp_ms
+            self.active[s] = True
+            if sides[i] != UNKNOWN:
+                self.side[s] = sides[i]
+
+        ids = np.array([self.track_id[s] if s >= 0 else -1 for s in slots], dtype=np.int64)
+        return out, ids
+
+    @staticmethod
+    def _alpha(dt, cutoff):
+        w = 2 * math.pi * cutoff * dt
+        return w / (w + 1)
@@ -0,0 +1,282 @@
+# hand_stream.py
+"""
+Local streaming of landmarks and gesture events to other processes.
+
+Wire format (little endian, fixed layout), one message per UDP datagram or
+length-prefixed (uint32) on the Unix socket:
+
+    header  16 B   magic "HG", version, type, seq u32, timestamp_ms i64
+    FRAME          n_hands u8, 3 pad, then per hand 256 B:
+                   track i16, side i8, 1 pad, 21 x 3 float32 normalized landmarks
+    EVENT   8 B    kind u8, side i8, track i16, value i16, 2 pad
+
+Event kinds: NUMBER (value = number, -1 = none), OP (value = index into
+OP_SYMBOLS, 0 = none), PINCH_DOWN, PINCH_UP. Number/op events are the
+commits of hand_temporal.TemporalGestures, pinch events go through
+PinchDebouncer; frames go out every frame.
+
+Each Unix-socket subscriber has its own bounded queue: when a reader falls
+behind, its oldest messages are dropped (and counted), never the producer
+blocked. UDP subscribers register by sending SUBSCRIBE and must repeat it
+within UDP_TIMEOUT_S.
+"""
+import asyncio
+import os
+import struct
+import threading
+import time
+from collections import deque, namedtuple
+
+import numpy as np
+
+MAGIC = b"HG"
+VERSION = 1
+FRAME, EVENT = 1, 2
+NUMBER, OP, PINCH_DOWN, PINCH_UP = 1, 2, 3, 4
+EVENT_NAMES = {NUMBER: "number", OP: "op", PINCH_DOWN: "pinch_down", PINCH_UP: "pinch_up"}
+OP_SYMBOLS = (None, "=", "-", "+", "*", "/")   # same order as HandVec.OP_SYMBOLS
+
+HEADER = struct.Struct("<2sBBIq")
+FRAME_HEAD = struct.Struct("<B3x")
+HAND_HEAD = struct.Struct("<hbx")
+HAND_SIZE = HAND_HEAD.size + 21 * 3 * 4
+EVENT_BODY = struct.Struct("<Bbhh2x")
+LENGTH = struct.Struct("<I")
+
+SUBSCRIBE = b"HGSUB"
+UDP_TIMEOUT_S = 10.0
+
+Frame = namedtuple("Frame", "seq timestamp_ms tracks sides landmarks")   # landmarks (n, 21, 3)
+Event = namedtuple("Event", "seq timestamp_ms kind track side value")
+
+
+def encode_frame(seq, timestamp_ms, landmarks, tracks, sides):
+    landmarks = np.asarray(landmarks, dtype="<f4").reshape(-1, 21, 3)
+    parts = [HEADER.pack(MAGIC, VERSION, FRAME, seq & 0xFFFFFFFF, timestamp_ms),
+             FRAME_HEAD.pack(len(landmarks))]
+    for track, side, hand in zip(tracks, sides, landmarks):
+        parts.append(HAND_HEAD.pack(int(track), int(side)))
+        parts.append(hand.tobytes())
+    return b"".join(parts)
+
+
+def event_value(kind, value):
+    """Wire value of a gesture: numbers as is (None -> -1), ops as OP_SYMBOLS index (-1 if unknown)."""
+    if kind == NUMBER:
+        return -1 if value is None else int(value)
+    if kind == OP:
+        return OP_SYMBOLS.index(value) if value in OP_SYMBOLS else -1
+    return 0
+
+
+def encode_event(seq, timestamp_ms, kind, track, side, value):
+    return (HEADER.pack(MAGIC, VERSION, EVENT, seq & 0xFFFFFFFF, timestamp_ms)
+            + EVENT_BODY.pack(kind, int(side), int(track), int(value)))
+
+
+def decode(data):
+    """Frame or Event from one message; ValueError on anything else."""
+    if len(data) < HEADER.size:
+        raise ValueError("short message")
+    magic, version, kind, seq, timestamp_ms = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("not a hand stream message")
+    if kind == EVENT:
+        ev_kind, side, track, value = EVENT_BODY.unpack_from(data, HEADER.size)
+        return Event(seq, timestamp_ms, ev_kind, track, side, value)
+    if kind != FRAME:
+        raise ValueError(f"unknown message type {kind}")
+
+    (n,) = FRAME_HEAD.unpack_from(data, HEADER.size)
+    offset = HEADER.size + FRAME_HEAD.size
+    tracks, sides = [], []
+    landmarks = np.empty((n, 21, 3), np.float32)
+    for i in range(n):
+        track, side = HAND_HEAD.unpack_from(data, offset)
+        tracks.append(track)
+        sides.append(side)
+        landmarks[i] = np.frombuffer(data, "<f4", 63, offset + HAND_HEAD.size).reshape(21, 3)
+        offset += HAND_SIZE
+    return Frame(seq, timestamp_ms, tracks, sides, landmarks)
+
+
+class PinchDebouncer:
+    """
+    Pinch down/up per track with hysteresis: down below threshold, up only
+    above threshold * release_ratio, so a distance hovering at the threshold
+    doesn't chatter.
+    """
+
+    def __init__(self, release_ratio=1.15):
+        self.release_ratio = release_ratio
+        self._pinched = {}
+
+    def update(self, track, pinch_dist, threshold):
+        """PINCH_DOWN, PINCH_UP or None for one hand this frame."""
+        pinched = self._pinched.get(track, False)
+        if not pinched and pinch_dist < threshold:
+            self._pinched[track] = True
+            return PINCH_DOWN
+        if pinched and pinch_dist > threshold * self.release_ratio:
+            self._pinched[track] = False
+            return PINCH_UP
+        return None
+
+    def forget(self, live_tracks):
+        """Drops tracks that are gone; returns those that vanished mid-pinch (owed a PINCH_UP)."""
+        live = set(live_tracks)
+        released = []
+        for track in [t for t in self._pinched if t not in live]:
+            if self._pinched.pop(track):
+                released.append(track)
+        return released
+
+
+class _Subscriber:
+    def __init__(self, writer, queue_size):
+        self.writer = writer
+        self.queue = deque(maxlen=queue_size)
+        self.wakeup = asyncio.Event()
+        self.dropped = 0
+        self.closed = False
+
+
+class GestureServer:
+    """
+    asyncio server on its own thread. publish_*() are called from any
+    thread and never block: the message is encoded once and handed to the
+    loop, which fans it out to every subscriber.
+    """
+
+    def __init__(self, unix_path=None, udp_addr=None, queue_size=64):
+        if unix_path is None and udp_addr is None:
+            raise ValueError("need a Unix socket path and/or a UDP address")
+        self.unix_path = unix_path
+        self.udp_addr = udp_addr
+        self.queue_size = queue_size
+        self.loop = None
+        self._thread = None
+        self._ready = threading.Event()
+        self._subscribers = set()
+        self._udp = None
+        self._udp_peers = {}     # addr -> last subscribe time
+        self._seq = 0
+        self.sent = 0
+        self.dropped = 0         # messages dropped for slow subscribers
+
+    @property
+    def subscribers(self):
+        return len(self._subscribers) + len(self._udp_peers)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="gesture-server", daemon=True)
+        self._thread.start()
+        self._ready.wait(5.0)
+        return self
+
+    def stop(self):
+        if self.loop is not None and self.loop.is_running():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+        if self._thread is not None:
+            self._thread.join(2.0)
+            self._thread = None
+
+    @property
+    def active(self):
+        # Anyone listening? Lets the producer skip encoding entirely
+        return self.loop is not None and bool(self._subscribers or self._udp_peers)
+
+    def publish_frame(self, timestamp_ms, landmarks, tracks, sides):
+        if not self.active:
+            return
+        self._seq += 1
+        self._post(encode_frame(self._seq, timestamp_ms, landmarks, tracks, sides))
+
+    def publish_event(self, timestamp_ms, kind, track, side, value=None):
+        if not self.active:
+            return
+        self._seq += 1
+        self._post(encode_event(self._seq, timestamp_ms, kind, track, side, event_value(kind, value)))
+
+    def _post(self, message):
+        try:
+            self.loop.call_soon_threadsafe(self._fan_out, message)
+        except RuntimeError:
+            pass   # loop already closed
+
+    def _fan_out(self, message):
+        for sub in self._subscribers:
+            if len(sub.queue) == sub.queue.maxlen:
+                sub.dropped += 1
+                self.dropped += 1
+            sub.queue.append(message)   # full deque drops the oldest
+            sub.wakeup.set()
+        if self._udp is not None and self._udp_peers:
+            now = time.monotonic()
+            for addr, seen in list(self._udp_peers.items()):
+                if now - seen > UDP_TIMEOUT_S:
+                    del self._udp_peers[addr]
+                    continue
+                self._udp.sendto(message, addr)
+        self.sent += 1
+
+    async def _serve_unix(self, reader, writer):
+        sub = _Subscriber(writer, self.queue_size)
+        self._subscribers.add(sub)
+        try:
+            while not (sub.closed or reader.at_eof()):
+                await sub.wakeup.wait()
+                sub.wakeup.clear()
+                while sub.queue:
+                    message = sub.queue.popleft()
+                    writer.write(LENGTH.pack(len(message)) + message)
+                await writer.drain()
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            self._subscribers.discard(sub)
+            writer.close()
+
+    def _run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        server = None
+        try:
+            if self.unix_path is not None:
+                if os.path.exists(self.unix_path):
+                    os.unlink(self.unix_path)
+                server = self.loop.run_until_complete(
+                    asyncio.start_unix_server(self._serve_unix, path=self.unix_path))
+            if self.udp_addr is not None:
+                transport, _ = self.loop.run_until_complete(self.loop.create_datagram_endpoint(
+                    lambda: _UdpProtocol(self), local_addr=tuple(self.udp_addr)))
+                self._udp = transport
+        finally:
+            self._ready.set()
+        try:
+            self.loop.run_forever()
+        finally:
+            # Let the subscriber handlers return on their own
+            for sub in self._subscribers:
+                sub.closed = True
+                sub.wakeup.set()
+            self._udp_peers.clear()
+            if server is not None:
+                server.close()
+            if self._udp is not None:
+                self._udp.close()
+            tasks = asyncio.all_tasks(self.loop)
+            if tasks:
+                self.loop.run_until_complete(asyncio.wait(tasks, timeout=1.0))
+            if self.unix_path is not None and os.path.exists(self.unix_path):
+                os.unlink(self.unix_path)
+            self.loop.close()
+
+
+class _UdpProtocol(asyncio.DatagramProtocol):
+    def __init__(self, server):
+        self.server = server
+
+    def datagram_received(self, data, addr):
+        if data == SUBSCRIBE:
+            self.server._udp_peers[addr] = time.monotonic()
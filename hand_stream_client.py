@@ -0,0 +1,152 @@
+# hand_stream_client.py
+"""
+Subscriber side of hand_stream.py. Blocking and dependency-light (numpy
+only), so downstream apps can read landmarks and gesture events without
+MediaPipe:
+
+    with StreamClient("/tmp/hands.sock") as client:
+        for msg in client:
+            if isinstance(msg, Event) and msg.kind == NUMBER:
+                print("number", msg.value)
+
+A gap in msg.seq means this subscriber fell behind and the server dropped
+its oldest messages.
+"""
+import socket
+import time
+
+from hand_stream import (EVENT_NAMES, LENGTH, NUMBER, OP, OP_SYMBOLS, PINCH_DOWN, PINCH_UP,
+                         SUBSCRIBE, UDP_TIMEOUT_S, Event, Frame, decode)
+
+__all__ = ["StreamClient", "UdpStreamClient", "Frame", "Event", "EVENT_NAMES",
+           "NUMBER", "OP", "OP_SYMBOLS", "PINCH_DOWN", "PINCH_UP", "describe"]
+
+
+def describe(event):
+    """Readable form of an Event, e.g. 'track 0: op +'."""
+    name = EVENT_NAMES.get(event.kind, str(event.kind))
+    if event.kind == NUMBER:
+        return f"track {event.track}: {name} {event.value if event.value >= 0 else '-'}"
+    if event.kind == OP:
+        op = OP_SYMBOLS[event.value] if 0 <= event.value < len(OP_SYMBOLS) else "?"
+        return f"track {event.track}: {name} {op or '-'}"
+    return f"track {event.track}: {name}"
+
+
+class StreamClient:
+    """Reads messages from the server's Unix socket."""
+
+    def __init__(self, path, timeout=None):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        self.sock.connect(path)
+        self._buf = bytearray()
+        self.last_seq = None
+        self.gaps = 0    # messages lost to server-side drop-oldest
+
+    def _read(self, n):
+        while len(self._buf) < n:
+            chunk = self.sock.recv(65536)
+            if not chunk:
+                raise EOFError("server closed the stream")
+            self._buf += chunk
+        data = bytes(self._buf[:n])
+        del self._buf[:n]
+        return data
+
+    def recv(self):
+        """Next Frame or Event (blocks)."""
+        (size,) = LENGTH.unpack(self._read(LENGTH.size))
+        msg = decode(self._read(size))
+        if self.last_seq is not None and msg.seq > self.last_seq + 1:
+            self.gaps += msg.seq - self.last_seq - 1
+        self.last_seq = msg.seq
+        return msg
+
+    def __iter__(self):
+        try:
+            while True:
+                yield self.recv()
+        except EOFError:
+            return
+
+    def close(self):
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class UdpStreamClient:
+    """
+    Subscribes to the server's UDP port (repeating SUBSCRIBE well within
+    UDP_TIMEOUT_S) and reads one message per datagram.
+    """
+
+    def __init__(self, addr, timeout=None):
+        self.addr = tuple(addr)
+        self.timeout = timeout
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._renew_at = 0.0
+
+    def recv(self):
+        """Next Frame or Event; socket.timeout after timeout seconds without one."""
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        while True:
+            now = time.monotonic()
+            if now >= self._renew_at:
+                # Also re-registers with a restarted server
+                self.sock.sendto(SUBSCRIBE, self.addr)
+                self._renew_at = now + UDP_TIMEOUT_S / 3
+            wait = self._renew_at - now
+            if deadline is not None:
+                if now >= deadline:
+                    raise socket.timeout("no message from the server")
+                wait = min(wait, deadline - now)
+            self.sock.settimeout(wait)
+            try:
+                data, _ = self.sock.recvfrom(65536)
+            except socket.timeout:
+                continue
+            except ConnectionRefusedError:
+                # Server not up (yet): subscribe again shortly
+                self._renew_at = min(self._renew_at, time.monotonic() + 0.5)
+                continue
+            return decode(data)
+
+    def __iter__(self):
+        while True:
+            yield self.recv()
+
+    def close(self):
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Print gesture events from a running tracker.")
+    parser.add_argument("target", help="Unix socket path, or host:port for UDP")
+    parser.add_argument("--frames", action="store_true", help="also print per-frame hand counts")
+    args = parser.parse_args()
+
+    if ":" in args.target:
+        host, port = args.target.rsplit(":", 1)
+        client = UdpStreamClient((host, int(port)))
+    else:
+        client = StreamClient(args.target)
+    with client:
+        for msg in client:
+            if isinstance(msg, Event):
+                print(f"{msg.timestamp_ms} {describe(msg)}")
+            elif args.frames:
+                print(f"{msg.timestamp_ms} frame {msg.seq}: {len(msg.tracks)} hand(s)")
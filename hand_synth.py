@@ -0,0 +1,106 @@
+# hand_synth.py
+"""
+Synthetic hand landmark fixtures. Builds (21, 3) landmark arrays for a given
+finger bitcode (HandUtils.finger_code layout) with controllable rotation,
+scale, position, handedness and noise.
+"""
+import math
+
+import numpy as np
+
+from hand_record import Landmark, ReplayResult, Category
+from hand_utils import HandUtils
+
+
+# Right hand, palm facing the camera, fingers pointing up, wrist at origin.
+# Normalized image units at scale 1.0 (y grows downwards).
+_WRIST = (0.0, 0.0)
+_THUMB_BASE = [(-0.04, -0.03), (-0.07, -0.06)]              # CMC, MCP
+_THUMB_OPEN = [(-0.10, -0.09), (-0.13, -0.11)]              # IP, tip
+_THUMB_CLOSED = [(-0.05, -0.10), (-0.01, -0.10)]
+_FINGER_X = [-0.03, 0.0, 0.03, 0.06]                         # index..pinky
+_FINGER_OPEN = [-0.12, -0.17, -0.20, -0.23]                  # MCP, PIP, DIP, tip
+_FINGER_CLOSED = [-0.12, -0.16, -0.13, -0.11]
+
+# Rotation (degrees) that turns the upright pose into each direction
+ANGLE_UP, ANGLE_LEFT, ANGLE_DOWN, ANGLE_RIGHT = 0, 90, 180, 270
+
+# Operator gestures: finger code + pointing angle
+OP_POSES = {
+    "=": (0, ANGLE_UP),
+    "-": (2, ANGLE_LEFT),
+    "+": (6, ANGLE_LEFT),
+    "*": (14, ANGLE_LEFT),
+    "/": (30, ANGLE_LEFT),
+}
+
+
+def synth_hand(code, angle=0.0, scale=1.0, center=(0.5, 0.75), right=True,
+               noise=0.0, rng=None):
+    """
+    Landmarks for finger bitcode `code`, rotated by `angle` degrees
+    (counter-clockwise on screen, 90 = fingers point left) about the wrist.
+    """
+    pts = [_WRIST]
+    pts += _THUMB_BASE + (_THUMB_OPEN if code & 1 else _THUMB_CLOSED)
+    for i, x in enumerate(_FINGER_X):
+        ys = _FINGER_OPEN if code & (2 << i) else _FINGER_CLOSED
+        pts += [(x, y) for y in ys]
+
+    xy = np.asarray(pts, dtype=np.float64) * scale
+    if not right:
+        xy[:, 0] = -xy[:, 0]
+
+    a = math.radians(angle)
+    c, s = math.cos(a), math.sin(a)
+    rot = np.array([[c, -s], [s, c]])
+    xy = xy @ rot + center
+
+    out = np.zeros((21, 3), dtype=np.float32)
+    out[:, :2] = xy
+    out[:, 2] = -0.02 * np.arange(21) / 20.0
+    if noise:
+        rng = rng or np.random.default_rng()
+        out[:, :2] += rng.normal(0.0, noise, (21, 2))
+    return out
+
+
+def number_poses():
+    # (number, finger code) for every code in NUMBER_MAP
+    return [(num, code) for code, num in HandUtils.NUMBER_MAP.items()]
+
+
+def synth_dataset(n, rng=None, noise=0.0, jitter_angle=0.0, scales=(1.0,),
+                  right_ratio=1.0):
+    """
+    n random number/operator hands. Returns (hands (n, 21, 3) float32,
+    labels list of str, right (n,) bool).
+    """
+    rng = rng or np.random.default_rng(0)
+    poses = [(str(num), code, ANGLE_UP) for num, code in number_poses()]
+    poses += [(op, code, angle) for op, (code, angle) in OP_POSES.items()]
+
+    hands = np.empty((n, 21, 3), dtype=np.float32)
+    labels = []
+    right = rng.random(n) < right_ratio
+    for i in range(n):
+        label, code, angle = poses[rng.integers(len(poses))]
+        angle += rng.uniform(-jitter_angle, jitter_angle)
+        scale = scales[rng.integers(len(scales))]
+        center = (rng.uniform(0.35, 0.65), rng.uniform(0.6, 0.8))
+        hands[i] = synth_hand(code, angle, scale, center, right[i], noise, rng)
+        labels.append(label)
+    return hands, labels, right
+
+
+def to_landmarks(hand):
+    # (21, 3) array -> list of MediaPipe-like landmarks
+    return [Landmark(float(x), float(y), float(z)) for x, y, z in hand]
+
+
+def to_result(hands, right=None):
+    # (n, 21, 3) array -> MediaPipe-shaped HandLandmarkerResult
+    if right is None:
+        right = [True] * len(hands)
+    handedness = [[Category("Right" if r else "Left", 1.0)] for r in right]
+    return ReplayResult([to_landmarks(h) for h in hands], handedness)
@@ -0,0 +1,217 @@
+# hand_temporal.py
+"""
+Temporal gesture recognition: every frame's number/operator reading goes
+into a small ring buffer per tracked hand, and a gesture is committed once
+it holds a majority of the window. One noisy frame can't flip the result,
+and a new gesture commits after ceil(threshold * window) frames instead of
+waiting for a sampling interval.
+"""
+import math
+
+import numpy as np
+
+from hand_gestures import GESTURES
+from hand_smooth import LEFT
+from hand_vec import HandVec
+
+
+class GestureVoter:
+    """
+    Majority vote over the last `window` values pushed for each track.
+    Vote counts are updated incrementally (add the new value, drop the one
+    leaving the ring), so a push costs the same for any window size.
+    """
+
+    def __init__(self, window=5, threshold=0.6):
+        if not 0 < threshold <= 1:
+            raise ValueError("threshold must be in (0, 1]")
+        self.window = window
+        self.threshold = threshold
+        self.votes_needed = max(1, math.ceil(threshold * window))
+        self._tracks = {}   # track -> [ring, next position, counts, committed]
+
+    def reset(self):
+        self._tracks.clear()
+
+    def push(self, track, value):
+        """Adds this frame's value; returns True when the committed value changed."""
+        state = self._tracks.get(track)
+        if state is None:
+            state = self._tracks[track] = [[_EMPTY] * self.window, 0, {}, None]
+        ring, pos, counts, committed = state
+
+        old = ring[pos]
+        if old is not _EMPTY:
+            counts[old] -= 1
+        ring[pos] = value
+        state[1] = (pos + 1) % self.window
+        votes = counts[value] = counts.get(value, 0) + 1
+
+        if value != committed and votes >= self.votes_needed:
+            state[3] = value
+            return True
+        return False
+
+    def committed(self, track):
+        state = self._tracks.get(track)
+        return state[3] if state is not None else None
+
+    def confidence(self, track):
+        # Share of the window agreeing with the committed value
+        state = self._tracks.get(track)
+        if state is None:
+            return 0.0
+        return state[2].get(state[3], 0) / self.window
+
+    def forget(self, live_tracks):
+        live = set(live_tracks)
+        for track in [t for t in self._tracks if t not in live]:
+            del self._tracks[track]
+
+
+_EMPTY = object()   # ring slot not filled yet
+
+
+class TemporalGestures:
+    """
+    Per-frame number and operator recognition (one batched gesture key
+    lookup per frame) voted over a window per track ID (HandSmoother tracks).
+    """
+
+    KINDS = ("number", "op")
+
+    def __init__(self, window=5, threshold=0.6, table=GESTURES):
+        self.table = table
+        self.voters = {kind: GestureVoter(window, threshold) for kind in self.KINDS}
+
+    def reset(self):
+        for voter in self.voters.values():
+            voter.reset()
+
+    def update(self, hands, track_ids, sides=None):
+        """
+        hands: MediaPipe landmark lists or an (N, 21, 3) array, track_ids:
+        matching track IDs (negative = untracked, skipped), sides: matching
+        handedness codes (None or UNKNOWN = right hand). Returns the commits
+        of this frame as [(track, kind, value)]; value None means the gesture ended.
+        """
+        commits = []
+        if len(hands):
+            if not isinstance(hands, np.ndarray):
+                hands = HandVec.from_landmarks(hands)
+            right = True if sides is None else np.asarray(sides)[:len(hands)] != LEFT
+            keys = self.table.keys(hands, right=right)
+            values = {kind: self.table.lookup(kind, keys) for kind in self.voters}
+            for i, track in enumerate(track_ids):
+                if track < 0:
+                    continue
+                for kind, voter in self.voters.items():
+                    if voter.push(track, values[kind][i]):
+                        commits.append((track, kind, voter.committed(track)))
+        for voter in self.voters.values():
+            voter.forget(track_ids)
+        return commits
+
+    def committed(self, track, kind):
+        return self.voters[kind].committed(track)
+
+
+class Calculator:
+    """
+    Builds an expression from committed gestures: numbers are digits of the
+    current operand, "-", "+", "*", "/" append an operator (a second one in a
+    row replaces the first) and "=" evaluates with the usual precedence.
+    After a result, a digit starts a new expression and an operator
+    continues from the result.
+    """
+
+    OPERATORS = {"+": 1, "-": 1, "*": 2, "/": 2}
+
+    def __init__(self, max_digits=9):
+        self.max_digits = max_digits
+        self.clear()
+
+    def clear(self):
+        self.tokens = []       # operands (str) and operators, alternating
+        self.result = None     # text after "=" (number or "Error")
+
+    @property
+    def text(self):
+        expr = "".join(self.tokens)
+        if self.result is not None:
+            return f"{expr}={self.result}"
+        return expr
+
+    def feed(self, kind, value):
+        """One committed gesture; gestures ending (value None) are ignored."""
+        if value is None:
+            return
+        if kind == "number":
+            self._digit(str(value))
+        elif value == "=":
+            self._evaluate()
+        elif value in self.OPERATORS:
+            self._operator(value)
+
+    def _digit(self, digit):
+        if self.result is not None:
+            self.clear()
+        if self.tokens and self.tokens[-1] not in self.OPERATORS:
+            if len(self.tokens[-1]) < self.max_digits:
+                self.tokens[-1] += digit
+        else:
+            self.tokens.append(digit)
+
+    def _operator(self, op):
+        if self.result is not None:
+            if self.result == "Error":
+                self.clear()
+                return
+            self.tokens, self.result = [self.result], None
+        if not self.tokens:
+            return
+        if self.tokens[-1] in self.OPERATORS:
+            self.tokens[-1] = op
+        else:
+            self.tokens.append(op)
+
+    def _evaluate(self):
+        if self.result is not None or not self.tokens:
+            return
+        if self.tokens[-1] in self.OPERATORS:
+            self.tokens.pop()
+        try:
+            value = self.evaluate(self.tokens)
+        except ZeroDivisionError:
+            self.result = "Error"
+            return
+        self.result = f"{value:g}" if isinstance(value, float) else str(value)
+
+    @classmethod
+    def evaluate(cls, tokens):
+        """Value of alternating operand/operator tokens, * and / before + and -."""
+        values, ops = [], []
+
+        def apply():
+            b, a, op = values.pop(), values.pop(), ops.pop()
+            if op == "+":
+                values.append(a + b)
+            elif op == "-":
+                values.append(a - b)
+            elif op == "*":
+                values.append(a * b)
+            else:
+                q = a / b
+                values.append(int(q) if q == int(q) else q)
+
+        for token in tokens:
+            if token in cls.OPERATORS:
+                while ops and cls.OPERATORS[ops[-1]] >= cls.OPERATORS[token]:
+                    apply()
+                ops.append(token)
+            else:
+                values.append(int(token) if isinstance(token, str) and token.lstrip("-").isdigit()
+                              else float(token))
+        while ops:
+            apply()
+        return values[0]
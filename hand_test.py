@@ -5,6 +5,8 @@ from mediapipe.tasks.python.vision import hand_landmarker
 # 1️⃣ Import BaseOptions to specify model
 from mediapipe.tasks.python.vision.core import BaseOptions
 
+from hand_capture import CaptureThread
+
 # 2️⃣ Create options
 options = hand_landmarker.HandLandmarkerOptions(
     base_options=BaseOptions(model_asset_path="hand_landmarker.task"),  # model file
@@ -16,22 +18,37 @@ landmarker = hand_landmarker.HandLandmarker.create_from_options(options)
 
 # 4️⃣ Open webcam
 cap = cv2.VideoCapture(0)
+camera = CaptureThread(cap).start()
+start_ns = None
+last_ts = -1
+last_seq = 0
+rgb = None
 
 while True:
-    ret, frame = cap.read()
-    if not ret:
+    got = camera.acquire(last_seq)
+    if got is None:
         break
-
-    rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-    result = landmarker.detect_for_video(rgb, 0)  # frame, timestamp
+    slot, frame, last_seq, capture_ns = got
+
+    if rgb is None or rgb.shape != frame.shape:
+        rgb = frame.copy()
+    cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=rgb)
+    # VIDEO mode needs strictly increasing timestamps
+    if start_ns is None:
+        start_ns = capture_ns
+    ts = max(last_ts + 1, (capture_ns - start_ns) // 1_000_000)
+    last_ts = ts
+    result = landmarker.detect_for_video(rgb, ts)  # frame, timestamp
 
     if result.handedness:
         for hand in result.handedness:
             print(hand)  # prints detected hand labels
 
     cv2.imshow("Hand Tracking", frame)
+    camera.release(slot)
     if cv2.waitKey(1) & 0xFF == 27:  # ESC to quit
         break
 
+camera.stop()
 cap.release()
 cv2.destroyAllWindows()
@@ -1,65 +1,179 @@
 # hand_tracking_cam.py
-import threading
+import argparse
+import math
+import signal
 import time
 from pathlib import Path
-import pyautogui
 
+_IMPORT_START_NS = time.monotonic_ns()
+
+# mediapipe is imported by the background model loader, pyautogui (on the
+# mouse thread) only once mouse control is turned on
 import cv2
-import mediapipe as mp
-from mediapipe.tasks.python.vision import (
-    HandLandmarker,
-    HandLandmarkerOptions,
-    RunningMode,
-)
-from mediapipe.tasks.python.core.base_options import BaseOptions
-
-from hand_calc import HandCalc
+import numpy as np
+
+from hand_cams import format_devices, select_camera
+from hand_capture import CaptureThread, FrameHandoff
+from hand_control import Controls
+from hand_gate import MotionGate
+from hand_loader import LandmarkerLoader
+from hand_metrics import StageMetrics, now_ns
+from hand_mouse import MouseController, PyAutoGuiBackend
+from hand_overlay import HAND_CONNECTIONS, OverlayRenderer
+from hand_pipeline import Pipeline
+from hand_record import LandmarkWriter
+from hand_roi import RoiTracker
+from hand_scale import ResolutionController, to_rgb
+from hand_sched import InferenceScheduler
+from hand_session import SessionRecorder
+from hand_smooth import UNKNOWN, HandSmoother, handedness_codes
+from hand_stream import NUMBER, OP, PINCH_UP, GestureServer, PinchDebouncer
+from hand_temporal import Calculator, TemporalGestures
+from hand_tune import PROFILE_SETTINGS, load_profile
 from hand_utils import HandUtils
 
 
 # --- CONFIG -----------------------------------------------------------------
 MODEL_PATH = str(Path(__file__).parent / "hand_landmarker.task")
-CAM_INDEX = 2             # set to your detected Camo index (0/1/2...). change if needed
-FPS_APPROX = 20
+CAM_INDEX = None          # None = best camera from the list_cams.py cache (probed once if missing); or force an index
+FPS_APPROX = 20          # frame rate requested from the camera
+NUM_HANDS = 2            # most hands the landmarker looks for
 LINE_THICKNESS = 4
 BONE_THICKNESS = 2
 TEXT_SIZE = 1
 PINCH_THRESHOLD = 70  # distance in pixels, adjust for your camera resolution
 CAM_BOX_MARGIN = 0.2  # x% margin on each side
+RECORD_PATH = None    # e.g. "session.hlr" to record landmarks for hand_record.py replay
+SESSION_DIR = None    # e.g. "sessions": annotated video + landmarks in rotating segments (hand_session.py)
+SESSION_SEGMENT_S = 60
+SESSION_KEEP_SEGMENTS = 10   # oldest segments beyond this are deleted (0 = keep all)
+METRICS_PRINT_INTERVAL = 10   # seconds between latency summaries on stdout (0 = off)
+METRICS_DUMP_PATH = None      # e.g. "metrics.json" to dump latency stats on exit
+ROI_TRACKING = False  # feed the landmarker only a downscaled crop around the tracked hands
+LATENCY_BUDGET_MS = 33  # adaptive input resolution holds inference latency under this (0 = off)
+INPUT_SCALE = 1.0       # landmarker input scale to start from (LATENCY_BUDGET_MS adapts it from there)
+PROFILE_PATH = str(Path(__file__).parent / "profile.json")   # written by hand_tune.py; overrides the settings it lists
+STREAM_SOCKET = None  # e.g. "/tmp/hand_tracking.sock": stream landmarks + gesture events (hand_stream_client.py)
+STREAM_UDP = None     # e.g. ("127.0.0.1", 5055): same stream over UDP
+HEADLESS = False      # no window, no drawing (--headless); control via CONTROL_SOCKET and signals
+CONTROL_SOCKET = None # e.g. "/tmp/hand_tracking.ctl": toggles, settings and health (hand_control.py)
+HEALTH_STALE_S = 5    # health turns "stale" when no landmarker result arrived for this long
 # PERFORMANCE TIPS:
-# - Lower FPS_APPROX (e.g., 15) reduces processing frequency
+# - Lower FPS_APPROX (e.g., 15) reduces capture rate; inference rate follows the machine
+# - LATENCY_BUDGET_MS shrinks the landmarker input on slow machines; overlays,
+#   PINCH_THRESHOLD and the mouse box always use full camera-resolution pixels
 # - Increase BONE_THICKNESS/LINE_THICKNESS for less detailed drawing (GPU may not benefit but looks cleaner)
-# - Use CAM_INDEX wisely; some cameras are slower than others
+# - Use CAM_INDEX wisely; some cameras are slower than others (list_cams.py shows first-frame latency)
+# - ROI_TRACKING ('r') cuts color conversion and inference cost on high-resolution cameras
+# - HEADLESS skips all overlay drawing and GUI event pumping: the most frames per core
+# - python hand_tune.py clip.mp4 measures this machine and writes PROFILE_PATH with the best settings
 # ---------------------------------------------------------------------------
 
 
-# Hard-coded MediaPipe hand connections (standard MediaPipe hand graph)
-HAND_CONNECTIONS = [
-    (0, 1), (1, 2), (2, 3), (3, 4),         # Thumb
-    (0, 5), (5, 6), (6, 7), (7, 8),         # Index finger
-    (5, 9), (9, 10), (10, 11), (11, 12),    # Middle finger
-    (9, 13), (13, 14), (14, 15), (15, 16),  # Ring finger
-    (13, 17), (17, 18), (18, 19), (19, 20), # Little finger
-    (0, 17)                                 # Palm base
-]
+# Batched overlay drawing (bones as polylines, joints/labels/text as sprites)
+_renderer = OverlayRenderer(HAND_CONNECTIONS, joint_radius=4, label_scale=0.4, label_thickness=TEXT_SIZE)
 
 
-# Shared buffer written by callback and read by main thread
-_latest_frame = None
-_latest_lock = threading.Lock()
+# Annotated frames handed from the callback to the main thread (no copies)
+_display = FrameHandoff()
 _last_pinch = {}
+_recorder = None   # LandmarkWriter when RECORD_PATH is set
+_session = None    # SessionRecorder when SESSION_DIR is set; drops (and counts) rather than blocks
+
+# Per-stage latency. capture is written by the capture thread, bgr2rgb/submit/
+# imshow/capture_to_display by the main thread, inference/rgb2bgr/callback by
+# the callback thread and the rest by the pipeline workers.
+_metrics = StageMetrics(("capture", "bgr2rgb", "submit", "inference", "rgb2bgr", "callback",
+                         "overlay", "result_to_display", "imshow", "capture_to_display",
+                         "capture_to_result"))
+_inflight = {}   # timestamp_ms -> (capture_ns, submit_ns, ring slot, BGR frame, crop)
+_NO_FRAME = (None, None, None, None, None)
+INFLIGHT_TIMEOUT_MS = 2000  # unpin submitted frames MediaPipe never answered
+_last_result_ns = None   # when the newest landmarker result arrived (health)
+SHOW_METRICS = False
+
+# Results are processed off the MediaPipe thread by a staged worker pipeline
+# (see _pipeline below). Full queues drop their oldest frame.
+PIPELINE_WORKERS = True
+PIPELINE_QUEUE_SIZE = 1
+
+# Motion gate: no hand for GATE_IDLE_AFTER_MS and a static scene -> inference
+# drops to GATE_IDLE_FPS; any motion restores full rate ('g' toggles)
+MOTION_GATE = True
+GATE_IDLE_AFTER_MS = 3000
+GATE_IDLE_FPS = 2
+_gate = MotionGate(idle_after_ms=GATE_IDLE_AFTER_MS, idle_interval_ms=1000 // GATE_IDLE_FPS, metrics=_metrics)
+_gate.enabled = MOTION_GATE
+
+# Keeps one frame in flight to the landmarker; newer frames win
+_scheduler = InferenceScheduler(metrics=_metrics)
+
+# Crop around the previous result's hands (ROI_TRACKING)
+_roi = RoiTracker(max_hands=NUM_HANDS)
+
+# Landmarker input scale chosen from inference latency (LATENCY_BUDGET_MS)
+_resolution = ResolutionController(budget_ms=LATENCY_BUDGET_MS, metrics=_metrics)
+_resolution.enabled = LATENCY_BUDGET_MS > 0
+_resolution.start_at(INPUT_SCALE)
+_frame_size = None   # (w, h) of camera frames; overlays are drawn at this size
+
+# One Euro landmark smoothing with stable per-hand tracks (see hand_smooth.py).
+# Lower SMOOTH_MIN_CUTOFF = steadier still hands, higher SMOOTH_BETA = less lag on fast moves
+SMOOTH_MIN_CUTOFF = 1.0
+SMOOTH_BETA = 0.02
+_smoother = HandSmoother(max_hands=NUM_HANDS, min_cutoff=SMOOTH_MIN_CUTOFF, beta=SMOOTH_BETA)
+
+# Number/operator recognition runs every frame; a gesture is committed once it
+# holds GESTURE_THRESHOLD of the last GESTURE_WINDOW frames of its hand's track.
+# Committed gestures drive the calculator's expression.
+GESTURE_WINDOW = 5
+GESTURE_THRESHOLD = 0.6
+_temporal = TemporalGestures(window=GESTURE_WINDOW, threshold=GESTURE_THRESHOLD)
+_calc = Calculator()
+
+
+# Allowed (min, max) of profile values, on top of matching the CONFIG default's type
+PROFILE_LIMITS = {"NUM_HANDS": (1, 8), "INPUT_SCALE": (0.1, 1.0), "LATENCY_BUDGET_MS": (0, 1000),
+                  "SMOOTH_MIN_CUTOFF": (0.01, 100.0), "SMOOTH_BETA": (0.0, 100.0),
+                  "GESTURE_WINDOW": (1, 100), "GESTURE_THRESHOLD": (0.01, 1.0)}
+
+
+def profile_value(name, value):
+    """value converted to the type of CONFIG's name, or None if it doesn't fit."""
+    default = globals()[name]
+    if isinstance(default, bool) or isinstance(value, bool):
+        return value if type(value) is type(default) else None
+    if not isinstance(value, (int, float)) or not math.isfinite(value) \
+            or (isinstance(default, int) and value != int(value)):
+        return None
+    value = type(default)(value)
+    low, high = PROFILE_LIMITS.get(name, (value, value))
+    return value if low <= value <= high else None
+
+
+def apply_profile(path=PROFILE_PATH):
+    """Overrides the CONFIG settings saved by hand_tune.py for this machine, if a profile exists."""
+    global _smoother, _temporal
+    settings = load_profile(path)
+    if not settings:
+        return False
+    for name, value in list(settings.items()):
+        checked = profile_value(name, value)
+        if checked is None:
+            print(f"Profile {path}: ignoring {name}={value!r}")
+            del settings[name]
+        else:
+            settings[name] = checked
+    globals().update(settings)
+    _roi.max_hands = NUM_HANDS
+    _resolution.budget_ms = LATENCY_BUDGET_MS
+    _resolution.enabled = LATENCY_BUDGET_MS > 0
+    _resolution.start_at(INPUT_SCALE)
+    _smoother = HandSmoother(max_hands=NUM_HANDS, min_cutoff=SMOOTH_MIN_CUTOFF, beta=SMOOTH_BETA)
+    _temporal = TemporalGestures(window=GESTURE_WINDOW, threshold=GESTURE_THRESHOLD)
+    print(f"Profile {path}:", ", ".join(f"{k}={settings[k]}" for k in PROFILE_SETTINGS if k in settings))
+    return True
 
-# Smoothed landmark positions: one dict per hand
-_smoothed = {}   # key = (hand_index, landmark_index) -> (x, y)
-SMOOTH_ALPHA = 0.65
-
-# Cached number tracking (persist text while updating less frequently)
-_last_number = None
-_last_number_pos = None
-
-# Cached calculator text and position
-_calc_text = None
-_calc_pos = None
 
 #Toggles
 DRAW = True
@@ -70,311 +184,691 @@ TRACK_NUMBERS = False
 CALCULATOR = False
 _click_state = False  # track whether we are currently "holding click"
 
-# Mouse control
+# Mouse control: the callback only posts targets and clicks; the mouse thread
+# (started when mouse control is first turned on) moves the cursor right away
+# and glides it between landmark updates at MOUSE_REFRESH_HZ
 MOUSE_CONTROL = False
-SCREEN_W, SCREEN_H = pyautogui.size()
-pyautogui.PAUSE = 0      # remove small automatic pause
-pyautogui.FAILSAFE = False
-
-# Shared mouse target (updated by callback, consumed by mouse thread)
-_mouse_target = None     # (x, y) in screen coords
-_mouse_lock = threading.Lock()
-_mouse_thread = None
-_mouse_thread_stop = False
-
-# Throttle parameters
-MOUSE_THREAD_HZ = 30  # Reduced from 60 Hz (30 Hz is plenty for mouse)
-MOUSE_MOVE_THRESHOLD = 5   # Increased threshold to ignore more tiny moves
+MOUSE_REFRESH_HZ = 60
+MOUSE_INTERPOLATE = True
+MOUSE_MOVE_THRESHOLD = 2   # pixels; smaller moves are skipped
+_mouse = MouseController(PyAutoGuiBackend(), refresh_hz=MOUSE_REFRESH_HZ, interpolate=MOUSE_INTERPOLATE,
+                         move_threshold=MOUSE_MOVE_THRESHOLD, metrics=_metrics)
 
-# Frame counter for throttling expensive operations
-_frame_counter = 0
-TEXT_RENDER_INTERVAL = 5  # Render text every 5 frames (was 3)
-LANDMARK_DRAW_INTERVAL = 1  # Draw landmarks every N frames (1 = every frame, 2 = every other)
+# Landmark/gesture stream for other local processes (STREAM_SOCKET / STREAM_UDP)
+_stream = None
+_pinches = PinchDebouncer()
 
 
-def smooth_point(hand_id, lm_id, x, y):
-    key = (hand_id, lm_id)
-
-    if key not in _smoothed:
-        _smoothed[key] = (x, y)
-        return x, y
-
-    prev_x, prev_y = _smoothed[key]
-    sx = int(SMOOTH_ALPHA * x + (1 - SMOOTH_ALPHA) * prev_x)
-    sy = int(SMOOTH_ALPHA * y + (1 - SMOOTH_ALPHA) * prev_y)
-
-    _smoothed[key] = (sx, sy)
-    return sx, sy
+class _FrameJob:
+    """One landmarker result on its way through _pipeline."""
+    __slots__ = ("result", "timestamp_ms", "entry_ns", "capture_ns", "slot", "frame", "roi",
+                 "hands", "smoothed", "pts", "track_ids", "sides", "commits")
 
+    def __init__(self, result, timestamp_ms, entry_ns, capture_ns, slot, frame, roi):
+        self.result = result
+        self.timestamp_ms = timestamp_ms
+        self.entry_ns = entry_ns
+        self.capture_ns = capture_ns
+        self.slot = slot
+        self.frame = frame
+        self.roi = roi
 
 
 def hand_result_callback(result, output_image, timestamp_ms):
     """
     Called by MediaPipe in LIVE_STREAM mode.
-    output_image is a mediapipe Image. Convert -> numpy, draw, store.
+    Only frees the landmarker for the next frame and queues the result; the
+    _pipeline workers smooth, recognize, act and draw straight onto the BGR
+    capture frame submitted with timestamp_ms (still pinned in the capture
+    ring), then swap it into the display slot. Without a matching capture
+    frame, output_image is converted here, while it is still valid.
     """
-    global _latest_frame, _frame_counter, _mouse_target
-    _frame_counter += 1
-    # Convert MediaPipe Image -> writable NumPy RGB array
+    global _last_result_ns
+    entry_ns = _last_result_ns = now_ns()
+    capture_ns, submit_ns, slot, frame_bgr, roi = _inflight.pop(timestamp_ms, _NO_FRAME)
+    if submit_ns is not None:
+        _metrics.record("inference", submit_ns, entry_ns)
+        _resolution.observe((entry_ns - submit_ns) / 1e6)
+    _scheduler.done(timestamp_ms)
+    if _session is not None:
+        _session.add_result(result, timestamp_ms, roi)
+
+    if frame_bgr is None:
+        # Convert MediaPipe Image (RGB) -> new BGR array we can draw on
+        try:
+            convert_ns = now_ns()
+            frame_bgr = cv2.cvtColor(output_image.numpy_view(), cv2.COLOR_RGB2BGR)
+            if _frame_size is not None and frame_bgr.shape[1::-1] != _frame_size:
+                # Scaled-down input: draw at camera size so pixel thresholds keep their meaning
+                frame_bgr = cv2.resize(frame_bgr, _frame_size, interpolation=cv2.INTER_LINEAR)
+            _metrics.record("rgb2bgr", convert_ns)
+        except Exception as e:
+            # If conversion fails, skip drawing this frame
+            print("Callback: couldn't numpy_view() the output_image:", e)
+            return
+
+    job = _FrameJob(result, timestamp_ms, entry_ns, capture_ns, slot, frame_bgr, roi)
     try:
-        frame_rgb = output_image.numpy_view().copy()  # RGB, HxWx3, writable copy
-    except Exception as e:
-        # If conversion fails, skip drawing this frame
-        print("Callback: couldn't numpy_view() the output_image:", e)
-        return
+        _pipeline.put(job)
+    except BaseException:
+        # Inline pipeline (not started) failed before handing the frame to the display
+        _release_job(job)
+        raise
+    _metrics.record("callback", entry_ns)
+
+
+def _release_job(job):
+    # Dropped or failed job: unpin its capture frame
+    _display.release(job.slot)
+
+
+def draw_metrics(frame):
+    e2e = _metrics.hist("capture_to_display").snapshot()
+    inf = _metrics.hist("inference").snapshot()
+    cv2.putText(frame, f"e2e p50 {e2e['p50_ms']:.0f}ms p99 {e2e['p99_ms']:.0f}ms  "
+                       f"inference p50 {inf['p50_ms']:.0f}ms  input x{_resolution.scale:.2f}"
+                       + (f"  gate {_gate.state}" if _gate.enabled else "")
+                       + (f"  rec dropped {_session.dropped}" if _session is not None else ""),
+                (10, 25), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), TEXT_SIZE)
+
+
+def extract_features(job):
+    """Pipeline stage 1: full-frame landmarks and smoothing with track IDs."""
+    result, frame = job.result, job.frame
+    h, w = frame.shape[:2]
+    hands = job.hands = getattr(result, "hand_landmarks", None) or []
+    if job.roi is not None:
+        # Landmarks of a cropped input -> full-frame coordinates
+        RoiTracker.remap(hands, job.roi, w, h)
+    if ROI_TRACKING:
+        _roi.update(hands, job.timestamp_ms)
+    if _gate.enabled:
+        _gate.observe(len(hands), (job.capture_ns or now_ns()) // 1_000_000)
+    if _recorder is not None:
+        _recorder.append_result(result, job.timestamp_ms)
+
+    job.pts = None   # smoothed (H, 21, 2) pixel coords, joints drawn for all hands at once
+    job.smoothed, job.track_ids, job.sides = np.empty((0, 21, 2)), [], []
+    if hands:
+        # Pixel coords of every hand, smoothed in one pass (rows follow result order)
+        raw = np.array([[(lm.x, lm.y) for lm in hand] for hand in hands]) * (w, h)
+        job.sides = handedness_codes(result)
+        job.smoothed, ids = _smoother.update(raw, job.sides, job.timestamp_ms)
+        job.track_ids = ids.tolist()
+        job.pts = job.smoothed.astype(np.int32)
+    return job
+
+
+def run_actions(job):
+    """Pipeline stage 2: voted gestures, then mouse, calculator and stream output."""
+    global _click_state
+    h, w = job.frame.shape[:2]
+
+    # Gesture readings every frame, voted per track (empty frames end the tracks).
+    # Voting here, where the commits are consumed, means a job dropped from a
+    # full queue costs one vote, never a committed gesture.
+    job.commits = ()
+    if TRACK_NUMBERS or CALCULATOR or (_stream is not None and _stream.active):
+        job.commits = _temporal.update(job.hands, job.track_ids, job.sides)
+    if _mouse.error is not None:
+        # Backend failed to open; check_mouse_backend() turns mouse control off
+        _click_state = False
+    elif MOUSE_CONTROL and job.pts is not None:
+        _mouse.start()   # no-op once running
+        for pts in job.pts:
+            # Move mouse using index fingertip
+            index_x, index_y = pts[8].tolist()
+
+            # Control box (optional)
+            min_x = int(CAM_BOX_MARGIN * w)
+            max_x = int((1 - CAM_BOX_MARGIN) * w)
+            min_y = int(CAM_BOX_MARGIN * h)
+            max_y = int((1 - CAM_BOX_MARGIN) * h)
+
+            clamped_x = max(min_x, min(index_x, max_x))
+            clamped_y = max(min_y, min(index_y, max_y))
+
+            # Normalize inside control box
+            nx = (clamped_x - min_x) / (max_x - min_x)
+            ny = (clamped_y - min_y) / (max_y - min_y)
+
+            # optional flip
+            #nx = 1 - nx
+
+            # Mouse thread maps to the screen
+            _mouse.set_target(nx, ny, job.capture_ns)
 
-    h, w = frame_rgb.shape[:2]
-
-    # Draw landmarks and connections on the RGB frame
-    if getattr(result, "hand_landmarks", None):
-        for hand_id, hand_landmarks in enumerate(result.hand_landmarks):
-            xs, ys = [], []
-            smoothed_points = {}
-           
-            for idx, landmark in enumerate(hand_landmarks):
-                x, y = HandUtils.lm_to_pixel(landmark, w, h)
-                sx, sy = smooth_point(hand_id, idx, x, y)
-                smoothed_points[idx] = (sx, sy)
-                xs.append(sx)
-                ys.append(sy)
-                
-                # Only draw landmarks every Nth frame to reduce CPU load
-                if DRAW and DRAW_LANDMARKS and _frame_counter % LANDMARK_DRAW_INTERVAL == 0:
-                    cv2.circle(frame_rgb, (sx, sy), 4, (0, 255, 0), -1)
-                    cv2.putText(frame_rgb, str(idx), (sx+5, sy-5),
-                                cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255,255,255), TEXT_SIZE)
-
-            # --- Step 4: draw connections using smoothed points ---
-            for start_idx, end_idx in HAND_CONNECTIONS:
-                s = hand_landmarks[start_idx]
-                e = hand_landmarks[end_idx]
-
-                sx, sy = smoothed_points[start_idx]
-                ex, ey = smoothed_points[end_idx]
-
-                # Only draw connections if drawing is enabled (skip entirely if not)
-                if DRAW:
-                    cv2.line(frame_rgb, (sx, sy), (ex, ey), (0, 255, 255), BONE_THICKNESS)
-
-            # Move mouse using index fingertip (runs once per hand after landmarks are processed)
-            if MOUSE_CONTROL and 8 in smoothed_points:
-                index_x, index_y = smoothed_points[8]  # index tip
-
-                # Control box (optional)
-                min_x = int(CAM_BOX_MARGIN * w)
-                max_x = int((1 - CAM_BOX_MARGIN) * w)
-                min_y = int(CAM_BOX_MARGIN * h)
-                max_y = int((1 - CAM_BOX_MARGIN) * h)
-
-                clamped_x = max(min_x, min(index_x, max_x))
-                clamped_y = max(min_y, min(index_y, max_y))
-
-                # Normalize inside control box
-                nx = (clamped_x - min_x) / (max_x - min_x)
-                ny = (clamped_y - min_y) / (max_y - min_y)
-
-                # optional flip
-                #nx = 1 - nx
-
-                # Map to screen
-                screen_x = int(nx * SCREEN_W)
-                screen_y = int(ny * SCREEN_H)
-
-                with _mouse_lock:
-                    _mouse_target = (screen_x, screen_y)
-
-
-            # Always compute smoothed points for landmarks
             # --- CLICK LOGIC using thumb + middle finger ---
-            if MOUSE_CONTROL and 4 in smoothed_points and 12 in smoothed_points:
-                thumb_x, thumb_y = smoothed_points[4]
-                middle_x, middle_y = smoothed_points[12]
-
+            pinch_dist = HandUtils.distance(pts[4].tolist(), pts[12].tolist())
+            if pinch_dist < PINCH_THRESHOLD and not _click_state:
+                _mouse.press()    # start click
+                _click_state = True
+            elif pinch_dist >= PINCH_THRESHOLD and _click_state:
+                _mouse.release()  # release click
+                _click_state = False
+
+    if CALCULATOR:
+        for _, kind, value in job.commits:
+            _calc.feed(kind, value)
+    if _stream is not None and _stream.active:
+        # Frames without hands are streamed too, so subscribers see hands leave
+        publish_stream(job.hands, job.smoothed, job.track_ids, job.sides, job.commits,
+                       job.timestamp_ms, w, h)
+    if HEADLESS:
+        # Nothing to draw or show: the frame is done here
+        if job.capture_ns is not None:
+            _metrics.record("capture_to_result", job.capture_ns)
+        _release_job(job)
+        return None
+    return job
+
+
+def render_frame(job):
+    """Pipeline stage 3: overlays onto the frame, then hand it to the display loop."""
+    overlay_ns = now_ns()
+    draw_hands(job.frame, job.pts, job.track_ids)
+    if SHOW_METRICS:
+        draw_metrics(job.frame)
+    done_ns = _metrics.record("overlay", overlay_ns)
+    _metrics.record("result_to_display", job.entry_ns, done_ns)
+
+    # Hand off to the display loop (drops our pin on the previous frame)
+    _display.publish(job.frame, job.capture_ns, job.slot)
+
+
+def draw_hands(frame_bgr, hands_pts, track_ids):
+    """Overlays for one result (BGR colors): bones, pinch line, boxes, numbers, calculator, joints."""
+    h, w = frame_bgr.shape[:2]
+
+    # Draw landmarks and connections on the BGR frame
+    if DRAW and hands_pts is not None:
+        for hand_id, pts in enumerate(hands_pts):
+            (x_min, y_min), (x_max, y_max) = pts.min(axis=0).tolist(), pts.max(axis=0).tolist()
+
+            # --- connections using smoothed points: one polylines call per hand ---
+            _renderer.bones(frame_bgr, pts, (255, 255, 0), BONE_THICKNESS)
+
+            # Optional: draw thumb-middle pinch line for debugging
+            if MOUSE_CONTROL and DRAW_PINCH_LINE:
+                thumb_x, thumb_y = pts[4].tolist()
+                middle_x, middle_y = pts[12].tolist()
                 pinch_dist = HandUtils.distance((thumb_x, thumb_y), (middle_x, middle_y))
-
-                global _click_state
-                if pinch_dist < PINCH_THRESHOLD and not _click_state:
-                    pyautogui.mouseDown()  # start click
-                    _click_state = True
-                elif pinch_dist >= PINCH_THRESHOLD and _click_state:
-                    pyautogui.mouseUp()    # release click
-                    _click_state = False
-
-                # Optional: draw line for debugging
-                if DRAW and DRAW_PINCH_LINE:
-                    cv2.line(frame_rgb, (thumb_x, thumb_y), (middle_x, middle_y), (0, 0, 255), LINE_THICKNESS)
-                    if _frame_counter % TEXT_RENDER_INTERVAL == 0:
-                        mid_x = (thumb_x + middle_x) // 2
-                        mid_y = (thumb_y + middle_y) // 2
-                        cv2.putText(frame_rgb, str(int(pinch_dist)), (mid_x, mid_y),
-                                    cv2.FONT_HERSHEY_SIMPLEX, 0.4, (0, 255, 0), TEXT_SIZE)
+                cv2.line(frame_bgr, (thumb_x, thumb_y), (middle_x, middle_y), (255, 0, 0), LINE_THICKNESS)
+                mid_x = (thumb_x + middle_x) // 2
+                mid_y = (thumb_y + middle_y) // 2
+                _renderer.put_text(frame_bgr, str(int(pinch_dist)), (mid_x, mid_y),
+                                   (0, 255, 0), 0.4, TEXT_SIZE)
 
             # Draw bounding box only if enabled
-            if DRAW and SHOW_BBOX and xs:
+            if SHOW_BBOX:
                 # --- bounding box (only once per hand, after all points) ---
-                    cv2.rectangle(frame_rgb,
-                                    (min(xs), min(ys)),
-                                    (max(xs), max(ys)),
-                                    (0, 255, 255), BONE_THICKNESS)
-                    
-            # --- Number tracking ---
-            if DRAW and TRACK_NUMBERS:
-                # Only update recognition every N frames to reduce CPU load
-                if _frame_counter % TEXT_RENDER_INTERVAL == 0:
-                    global _last_number, _last_number_pos
-                    _last_number = HandUtils.recognize_number(hand_landmarks,HandUtils.get_finger_states(hand_landmarks))
-                    _last_number_pos = (min(xs), min(ys)-10)
-                
-                # Draw the number every frame using cached value
-                if _last_number is not None and _last_number_pos is not None:
-                    cv2.putText(frame_rgb, f"Num: {_last_number}", _last_number_pos,
-                                cv2.FONT_HERSHEY_SIMPLEX, 1.0, (255, 255, 255), TEXT_SIZE + 5)
-
-            # --- Calculator ---
-            if DRAW and CALCULATOR:
-                if _frame_counter % TEXT_RENDER_INTERVAL == 0:
-                    global _calc_text, _calc_pos
-                    gesture = HandUtils.recognize_number(hand_landmarks, HandUtils.get_finger_states(hand_landmarks))
-                    operation = HandCalc.recognize_op(hand_landmarks, HandUtils.get_finger_states(hand_landmarks))
-                    _calc_text = f"Calc: {gesture if gesture is not None else ''}{operation if operation is not None else ''}"
-                    _calc_pos = (0.1*w, 0.9*h)
-                
-                # Draw the calculator operation every frame using cached value
-                if _calc_text is not None and _calc_pos is not None:
-                    cv2.putText(frame_rgb, _calc_text, _calc_pos,
-                                cv2.FONT_HERSHEY_SIMPLEX, 1.0, (0, 255, 0), TEXT_SIZE + 5)
-                    
-    # Convert RGB back to BGR for OpenCV             
-    frame_bgr = cv2.cvtColor(frame_rgb, cv2.COLOR_RGB2BGR)
-    # Store into shared buffer (thread-safe)
-    with _latest_lock:
-        _latest_frame = frame_bgr
-
-
-def mouse_worker():
-    global _mouse_thread_stop
-    last_pos = None
-    delay = 1.0 / MOUSE_THREAD_HZ
-    while not _mouse_thread_stop:
-        with _mouse_lock:
-            target = _mouse_target
-
-        if target is not None:
-            tx, ty = target
-            # Only move if different enough
-            if last_pos is None or abs(tx - last_pos[0]) > MOUSE_MOVE_THRESHOLD or abs(ty - last_pos[1]) > MOUSE_MOVE_THRESHOLD:
-                try:
-                    pyautogui.moveTo(tx, ty, duration=0)  # instantaneous jump
-                except Exception:
-                    pass
-                last_pos = (tx, ty)
-        time.sleep(delay)
-
-
-
-def main():
-    global _latest_frame, DRAW_PINCH_LINE, SHOW_BBOX, DRAW_LANDMARKS, MOUSE_CONTROL, DRAW, TRACK_NUMBERS, CALCULATOR
-    
-    # start mouse thread
-    _mouse_thread_stop = False
-    _mouse_thread = threading.Thread(target=mouse_worker, daemon=True)
-    _mouse_thread.start()
-
-    # Create HandLandmarker in LIVE_STREAM with required callback
-    options = HandLandmarkerOptions(
-        base_options=BaseOptions(model_asset_path=MODEL_PATH),
-        running_mode=RunningMode.LIVE_STREAM,
-        num_hands=2,
-        result_callback=hand_result_callback,
-    )
-    hand_landmarker = HandLandmarker.create_from_options(options)
-
-    cap = cv2.VideoCapture(CAM_INDEX)
-    if not cap.isOpened():
-        print(f"Cannot open camera index {CAM_INDEX}. Run list_cams.py to find indices.")
-        hand_landmarker.close()
+                cv2.rectangle(frame_bgr, (x_min, y_min), (x_max, y_max), (255, 255, 0), BONE_THICKNESS)
+
+            # --- Number tracking (committed number of this hand's track) ---
+            if TRACK_NUMBERS:
+                number = _temporal.committed(track_ids[hand_id], "number")
+                if number is not None:
+                    _renderer.put_text(frame_bgr, f"Num: {number}", (x_min, y_min-10),
+                                       (255, 255, 255), 1.0, TEXT_SIZE + 5)
+
+    # --- Calculator: expression built from committed gestures ---
+    if DRAW and CALCULATOR and _calc.tokens:
+        _renderer.put_text(frame_bgr, f"Calc: {_calc.text}", (int(0.1*w), int(0.9*h)),
+                           (0, 255, 0), 1.0, TEXT_SIZE + 5)
+
+    # Joints and their index labels for every hand in one pass each
+    if DRAW and DRAW_LANDMARKS and hands_pts is not None:
+        _renderer.joints(frame_bgr, hands_pts, (0, 255, 0))
+        _renderer.joint_labels(frame_bgr, hands_pts, (255, 255, 255))
+
+
+# Callback -> features -> actions -> render, one worker thread per stage
+# (PIPELINE_WORKERS = False runs all of it in the MediaPipe callback)
+_pipeline = Pipeline([("features", extract_features), ("actions", run_actions), ("render", render_frame)],
+                     maxsize=PIPELINE_QUEUE_SIZE, metrics=_metrics, on_drop=_release_job)
+
+
+def publish_stream(hands, smoothed, track_ids, sides, commits, timestamp_ms, w, h):
+    """Smoothed landmarks (normalized), committed number/op and pinch events to stream subscribers."""
+    n = len(track_ids)
+    landmarks = np.empty((n, 21, 3), np.float32)
+    if n:
+        landmarks[..., :2] = smoothed[:n] / (w, h)
+        landmarks[..., 2] = [[lm.z for lm in hand] for hand in hands[:n]]
+    _stream.publish_frame(timestamp_ms, landmarks, track_ids, sides)
+
+    side_of = dict(zip(track_ids, sides))
+    for track, kind, value in commits:
+        _stream.publish_event(timestamp_ms, NUMBER if kind == "number" else OP, track, side_of[track], value)
+    for pts, track, side in zip(smoothed, track_ids, sides):
+        if track < 0:
+            continue   # beyond the smoother's max_hands: no stable identity
+        pinch = _pinches.update(track, HandUtils.distance(pts[4], pts[12]), PINCH_THRESHOLD)
+        if pinch is not None:
+            _stream.publish_event(timestamp_ms, pinch, track, side)
+    for track in _pinches.forget(track_ids):
+        _stream.publish_event(timestamp_ms, PINCH_UP, track, UNKNOWN)
+
+
+def format_startup(marks, model_timings):
+    """One line: milestones as ms since the module started importing, plus the model loader's stages."""
+    steps = "  ".join(f"{name} {(ns - _IMPORT_START_NS) / 1e6:.0f}" for name, ns in marks)
+    model = "  ".join(f"{name} {ms:.0f}" for name, ms in model_timings.items())
+    return f"Time to first frame (ms since start): {steps}  [model: {model}]"
+
+
+def set_mouse_control(on):
+    """Mouse control on/off; DRAW flips with it, so overlays stay hidden while the mouse is on."""
+    global MOUSE_CONTROL, DRAW
+    if on == MOUSE_CONTROL:
         return
+    MOUSE_CONTROL, DRAW = on, not DRAW
+    if on:
+        _mouse.start()
 
-    print("'b' to toggle bounding box, 'z' to toggle thumb-index line.")
-    print("Starting. Press 'q' in the window to quit.")
 
-    frame_timestamp = 0  # milliseconds, incremental
-    frame_interval_ms = int(1000 / FPS_APPROX)
+def check_mouse_backend():
+    # Main loop: mouse control off again (and DRAW back) if the backend failed to open
+    if MOUSE_CONTROL and _mouse.error is not None:
+        print("Mouse control off:", _mouse.error)
+        set_mouse_control(False)
 
-    try:
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                print("Frame grab failed, stopping.")
-                break
 
-            # Convert BGR -> RGB for MediaPipe
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+def handle_key(key):
+    """One key press (or the matching control command); False means quit."""
+    global SHOW_METRICS, ROI_TRACKING, DRAW_PINCH_LINE, SHOW_BBOX, DRAW_LANDMARKS, TRACK_NUMBERS, CALCULATOR
 
-            # Wrap as mediapipe Image (required by detect_async)
-            mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=frame_rgb)
+    #Quit 'q'
+    if key == ord("q"):
+        return False
+    
+    #Track numbers 'n'
+    if key == ord("n"):
+        TRACK_NUMBERS = not TRACK_NUMBERS
+        print("Number Tracking:", "ON" if TRACK_NUMBERS else "OFF")
+
+    #Mouse control 'm'
+    if key == ord("m"):
+        set_mouse_control(not MOUSE_CONTROL)
+        print("Mouse:", "ON" if MOUSE_CONTROL else "OFF")
+
+    #Draw landmarks 'l'
+    if key == ord("l"):
+        DRAW_LANDMARKS = not DRAW_LANDMARKS
+        print("Landmarks:", "ON" if DRAW_LANDMARKS else "OFF")
+
+    #Bounding box 'b'
+    if key == ord("b"):
+        SHOW_BBOX = not SHOW_BBOX
+        print("Bounding box:", "ON" if SHOW_BBOX else "OFF")
+
+    #Thumb to index 'z'
+    if key == ord("z"):
+        DRAW_PINCH_LINE = not DRAW_PINCH_LINE
+        print("Pinch line:", "ON" if DRAW_PINCH_LINE else "OFF")
+
+    # Calculator 'c'
+    if key == ord("c"):
+        CALCULATOR = not CALCULATOR
+        print("Calculator:", "ON" if CALCULATOR else "OFF")
+
+    # Clear calculator 'x'
+    if key == ord("x"):
+        _calc.clear()
+        print("Calculator cleared")
+
+    # ROI-crop tracking 'r'
+    if key == ord("r"):
+        ROI_TRACKING = not ROI_TRACKING
+        _roi.reset()
+        print("ROI tracking:", "ON" if ROI_TRACKING else "OFF")
+
+    # Motion gate 'g'
+    if key == ord("g"):
+        _gate.enabled = not _gate.enabled
+        _gate.reset()
+        print("Motion gate:", "ON" if _gate.enabled else "OFF")
+
+    # Latency stats 'p' (print) / 'i' (on-screen)
+    if key == ord("p"):
+        print(_metrics.summary())
+        print(_pipeline.summary())
+    if key == ord("i"):
+        SHOW_METRICS = not SHOW_METRICS
+        print("Latency overlay:", "ON" if SHOW_METRICS else "OFF")
+    return True
+
+
+# Control commands (CONTROL_SOCKET, signals): toggles named after their keys
+CONTROL_KEYS = {"quit": "q", "numbers": "n", "mouse": "m", "landmarks": "l", "bbox": "b", "pinch_line": "z",
+                "calculator": "c", "clear": "x", "roi": "r", "gate": "g", "print": "p", "overlay": "i"}
+CONTROL_TOGGLES = ("TRACK_NUMBERS", "MOUSE_CONTROL", "DRAW", "DRAW_LANDMARKS", "SHOW_BBOX", "DRAW_PINCH_LINE",
+                   "CALCULATOR", "ROI_TRACKING", "SHOW_METRICS")
+# Settings `set NAME VALUE` may change while running
+CONTROL_SETTINGS = ("PINCH_THRESHOLD", "CAM_BOX_MARGIN", "LATENCY_BUDGET_MS", "METRICS_PRINT_INTERVAL")
+_quit = False
+
+
+def control_state():
+    state = {name: globals()[name] for name in CONTROL_TOGGLES + CONTROL_SETTINGS}
+    state["MOTION_GATE"] = _gate.enabled
+    state["calculator_text"] = _calc.text
+    return state
+
+
+def health():
+    """Throughput and health snapshot (control `stats`)."""
+    snap = _metrics.snapshot()
+    uptime = max(snap["uptime_s"], 1e-9)
+    camera = _display.camera
+    captured = camera.frames if camera is not None else 0
+    age = None if _last_result_ns is None else (now_ns() - _last_result_ns) / 1e9
+    if camera is not None and camera.failed:
+        status = "camera_failed"
+    elif age is None:
+        status = "starting"
+    elif age > HEALTH_STALE_S:
+        status = "stale"   # the motion gate still lets GATE_IDLE_FPS frames through
+    else:
+        status = "ok"
+    latency = {name: {k: round(v, 2) for k, v in snap["stages"][name].items() if k != "count"}
+               for name in ("inference", "capture_to_result", "capture_to_display")
+               if snap["stages"].get(name, {}).get("count")}
+    return {
+        "status": status,
+        "uptime_s": round(uptime, 1),
+        "captured": captured,
+        "capture_fps": round(captured / uptime, 1),
+        "inferred": _scheduler.completed,
+        "inference_fps": round(_scheduler.completed / uptime, 1),
+        "inference_skipped": _scheduler.dropped,
+        "last_result_age_s": None if age is None else round(age, 2),
+        "latency_ms": latency,
+        "pipeline": {name: {"depth": d[0], "max": d[2], "dropped": st.dropped}
+                     for (name, d), st in zip(_pipeline.depths().items(), _pipeline.stages)},
+        "gate": _gate.state if _gate.enabled else "off",
+        "gate_skipped": _gate.skipped,
+        "input_scale": _resolution.scale,
+        "stream_subscribers": _stream.subscribers if _stream is not None else 0,
+        "session_dropped": _session.dropped if _session is not None else 0,
+        "counters": snap["counters"],
+    }
+
+
+def handle_command(command, args):
+    """One control command; returns the JSON-able reply."""
+    global _quit
+    if command in ("stats", "health"):
+        return health()
+    if command == "get":
+        return control_state()
+    if command == "set":
+        if len(args) != 2 or args[0] not in CONTROL_SETTINGS:
+            return {"error": f"usage: set NAME VALUE, NAME one of {', '.join(CONTROL_SETTINGS)}"}
+        name, value = args[0], float(args[1])
+        globals()[name] = type(globals()[name])(value)
+        if name == "LATENCY_BUDGET_MS":
+            _resolution.budget_ms = LATENCY_BUDGET_MS
+            _resolution.enabled = LATENCY_BUDGET_MS > 0
+        return {name: globals()[name]}
+    key = CONTROL_KEYS.get(command)
+    if key is None:
+        return {"error": f"unknown command {command!r}; try stats, get, set or one of {', '.join(CONTROL_KEYS)}"}
+    if HEADLESS and command == "mouse":
+        return {"error": "mouse control needs a display"}
+    if not handle_key(ord(key)):
+        _quit = True
+        return {"quit": True}
+    return control_state()
 
-            # Send to Landmarker (async) with timestamp
-            hand_landmarker.detect_async(mp_image, timestamp_ms=frame_timestamp)
-            frame_timestamp += frame_interval_ms
 
-            # Display the most recent processed frame if available; otherwise show camera
-            with _latest_lock:
-                show = _latest_frame.copy() if _latest_frame is not None else frame
+def main():
+    global _recorder, _session, _frame_size, _stream, _quit, MOUSE_CONTROL
+    
+    startup = [("main", now_ns())]   # time-to-first-frame milestones
+    apply_profile()
+    _quit = False
+    if HEADLESS and MOUSE_CONTROL:
+        print("Mouse control needs a display; off in headless mode.")
+        MOUSE_CONTROL = False
+
+    # Model loads (mediapipe import, model read, warm-up) while the camera opens
+    loader = LandmarkerLoader(MODEL_PATH, num_hands=NUM_HANDS, result_callback=hand_result_callback).start()
+    hand_landmarker = None
+    mp = None
+
+    cam_index, from_cache = CAM_INDEX, False
+    if cam_index is None:
+        cam_index, devices, from_cache = select_camera()
+    cap = cv2.VideoCapture(cam_index) if cam_index is not None else None
+    if cap is not None and not cap.isOpened() and from_cache:
+        # Cached device is gone (unplugged / renumbered): probe again once
+        cap.release()
+        cam_index, devices, from_cache = select_camera(reprobe=True)
+        cap = cv2.VideoCapture(cam_index) if cam_index is not None else None
+    if cap is None or not cap.isOpened():
+        # Nothing else has started yet except the model loader
+        loader.cancel()
+        if cap is not None:
+            cap.release()
+        if cam_index is None:
+            print(format_devices(devices))
+            print("No working camera found. Set CAM_INDEX or run list_cams.py.")
+        else:
+            print(f"Cannot open camera index {cam_index}. Run list_cams.py to find indices.")
+        return
+    print("Using camera", cam_index, "(cached)" if from_cache else "")
+    startup.append(("camera_open", now_ns()))
+    cap.set(cv2.CAP_PROP_FPS, FPS_APPROX)
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # don't queue stale frames in the driver
+
+    if MOUSE_CONTROL:
+        _mouse.start()
+
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    if width > 0 and height > 0:
+        _frame_size = (width, height)
+        _resolution.set_frame_width(width)
+
+    if STREAM_SOCKET or STREAM_UDP:
+        _stream = GestureServer(STREAM_SOCKET, STREAM_UDP).start()
+        print("Streaming gestures on", " and ".join(str(a) for a in (STREAM_SOCKET, STREAM_UDP) if a))
+
+    if RECORD_PATH:
+        _recorder = LandmarkWriter(RECORD_PATH, width, height, NUM_HANDS)
+        print("Recording landmarks to", RECORD_PATH)
+
+    if SESSION_DIR:
+        if _frame_size is None:
+            print("Session recording needs the camera frame size; not recording.")
+        else:
+            # Headless runs draw no frames: landmarks only, no empty videos
+            _session = SessionRecorder(SESSION_DIR, _frame_size, fps=FPS_APPROX, max_hands=NUM_HANDS,
+                                       segment_s=SESSION_SEGMENT_S, keep_segments=SESSION_KEEP_SEGMENTS,
+                                       metrics=_metrics, video=not HEADLESS).start()
+            print("Recording session landmarks to" if HEADLESS else "Recording session to", SESSION_DIR)
+
+    # Commands from CONTROL_SOCKET and signals run in this loop, between frames
+    controls = Controls(CONTROL_SOCKET).start()
+    signal.signal(signal.SIGTERM, lambda *_: controls.post("quit"))
+    if hasattr(signal, "SIGUSR1"):
+        signal.signal(signal.SIGUSR1, lambda *_: controls.post("print"))
+    if CONTROL_SOCKET:
+        print("Control socket on", CONTROL_SOCKET, "(python hand_control.py", CONTROL_SOCKET, "stats)")
+
+    if HEADLESS:
+        print("Starting headless. Stop with SIGTERM/Ctrl+C or the 'quit' control command.")
+    else:
+        print("'b' to toggle bounding box, 'z' to toggle thumb-index line, 'p' to print latency stats.")
+        print("Starting. Press 'q' in the window to quit.")
+
+    start_ns = now_ns()
+    last_timestamp = -1  # MediaPipe needs strictly increasing timestamps
+    last_seq = 0
+    frame_rgb = None     # reused RGB buffer for the landmarker input
+
+    # Frames are read on their own thread into a reused ring of buffers
+    # Ring holds: one being written, the newest, one in flight, the display
+    # front and the frame being shown, plus what the pipeline workers hold
+    if PIPELINE_WORKERS:
+        _pipeline.start()
+    camera = CaptureThread(cap, ring_size=6 + _pipeline.capacity, metrics=_metrics).start()
+    _display.camera = camera
+    last_shown_seq = 0
 
-            cv2.imshow("Hand Tracking", show)
+    try:
+        while True:
+            got = camera.acquire(last_seq, timeout=0.25)
+            if got is None:
+                if camera.failed:
+                    print("Frame grab failed, stopping.")
+                    break
+                # Stalled camera: control commands and SIGTERM still get through
+                controls.poll(handle_command)
+                if _quit:
+                    break
+                continue
+            slot, frame, last_seq, capture_ns = got
+            if last_timestamp < 0:
+                startup.append(("first_capture", capture_ns))
+
+            # Raw frames are shown until the model is ready
+            if hand_landmarker is None and loader.ready:
+                hand_landmarker = loader.result()
+                mp = loader.mp
+                last_timestamp = max(last_timestamp, loader.warmup_timestamp_ms)
+                startup.append(("model_ready", now_ns()))
+
+            # Timestamp from the capture clock, not a frame counter
+            frame_timestamp = max((capture_ns - start_ns) // 1_000_000, last_timestamp + 1)
+            last_timestamp = frame_timestamp
+
+            # Only the newest frame goes to the landmarker; skip while one is in flight
+            # or while the motion gate holds back a static, empty scene
+            if hand_landmarker is not None and _gate.should_infer(frame, capture_ns // 1_000_000) \
+                    and _scheduler.try_submit(frame_timestamp):
+                roi = _roi.plan(frame_timestamp, frame.shape[1], frame.shape[0]) if ROI_TRACKING else None
+                scale = _resolution.scale
+                if roi is not None:
+                    # Only the predicted hand region, downscaled, is converted
+                    landmarker_input = _roi.prepare(frame, roi, scale)
+                else:
+                    # Convert BGR -> RGB for MediaPipe at the current input scale (into
+                    # the reused buffer; mp.Image copies the pixels, so it can be
+                    # overwritten next frame)
+                    frame_rgb = to_rgb(frame, scale, frame_rgb)
+                    landmarker_input = frame_rgb
+                submit_ns = _metrics.record("bgr2rgb", capture_ns)
+
+                # Wrap as mediapipe Image (required by detect_async)
+                mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=landmarker_input)
+
+                # Send to Landmarker (async) with timestamp. The BGR frame stays
+                # pinned so the callback can draw on it directly.
+                camera.retain(slot)
+                _inflight[frame_timestamp] = (capture_ns, submit_ns, slot, frame, roi)
+                try:
+                    hand_landmarker.detect_async(mp_image, timestamp_ms=frame_timestamp)
+                except Exception:
+                    if _inflight.pop(frame_timestamp, None) is not None:
+                        camera.release(slot)
+                    _scheduler.cancel(frame_timestamp)
+                    raise
+                _metrics.record("submit", submit_ns)
+
+            if HEADLESS:
+                # No window: processed frames were already released by the pipeline
+                if startup[-1][0] != "first_result" and _last_result_ns is not None:
+                    startup.append(("first_result", _last_result_ns))
+                    print(format_startup(startup, loader.timings))
+            else:
+                # Display the most recent processed frame if available; otherwise show camera
+                front = _display.acquire()
+                if front is not None:
+                    show, shown_capture_ns, show_slot, show_seq = front
+                else:
+                    show, shown_capture_ns, show_slot, show_seq = frame, capture_ns, None, -last_seq
+
+                # Only push a frame to the window when it changed
+                if show_seq != last_shown_seq:
+                    imshow_ns = now_ns()
+                    cv2.imshow("Hand Tracking", show)
+                    shown_ns = _metrics.record("imshow", imshow_ns)
+                    if _session is not None:
+                        _session.add_frame(show, shown_capture_ns)
+                    if shown_capture_ns is not None:
+                        _metrics.record("capture_to_display", shown_capture_ns, shown_ns)
+                    if last_shown_seq == 0:
+                        startup.append(("first_display", shown_ns))
+                    last_shown_seq = show_seq
+                    if front is not None and startup[-1][0] != "first_result":
+                        startup.append(("first_result", shown_ns))
+                        print(format_startup(startup, loader.timings))
+                _display.release(show_slot)
+            camera.release(slot)
+            _metrics.maybe_print(METRICS_PRINT_INTERVAL)
+
+            # Unpin frames MediaPipe never answered (whoever pops an entry owns its pin)
+            for ts in list(_inflight):
+                if ts < frame_timestamp - INFLIGHT_TIMEOUT_MS:
+                    stale = _inflight.pop(ts, None)
+                    if stale is not None:
+                        camera.release(stale[2])
 
             # Key cmds
-            key = cv2.waitKey(1) & 0xFF
-
-            #Quit 'q'
-            if key == ord("q"):
+            check_mouse_backend()
+            if not HEADLESS and not handle_key(cv2.waitKey(1) & 0xFF):
+                break
+            controls.poll(handle_command)
+            if _quit:
                 break
-            
-            #Track numbers 'n'
-            if key == ord("n"):
-                TRACK_NUMBERS = not TRACK_NUMBERS
-                print("Number Tracking:", "ON" if TRACK_NUMBERS else "OFF")
-
-            #Mouse control 'm'
-            if key == ord("m"):
-                MOUSE_CONTROL = not MOUSE_CONTROL
-                DRAW = not DRAW
-                print("Mouse:", "ON" if MOUSE_CONTROL else "OFF")
-
-            #Draw landmarks 'l'
-            if key == ord("l"):
-                DRAW_LANDMARKS = not DRAW_LANDMARKS
-                print("Landmarks:", "ON" if DRAW_LANDMARKS else "OFF")
-
-            #Bounding box 'b'
-            if key == ord("b"):
-                SHOW_BBOX = not SHOW_BBOX
-                print("Bounding box:", "ON" if SHOW_BBOX else "OFF")
-
-            #Thumb to index 'z'
-            if key == ord("z"):
-                DRAW_PINCH_LINE = not DRAW_PINCH_LINE
-                print("Pinch line:", "ON" if DRAW_PINCH_LINE else "OFF")
-
-            # Calculator 'c'
-            if key == ord("c"):
-                CALCULATOR = not CALCULATOR
-                print("Calculator:", "ON" if CALCULATOR else "OFF")
-            
-            # small sleep to yield CPU (keeps loop pacing closer to FPS_APPROX)
-            time.sleep(frame_interval_ms / 1000.0)
 
     finally:
-        # stop mouse thread
-        _mouse_thread_stop = True
-        if _mouse_thread is not None:
-            _mouse_thread.join(timeout=0.5)
-
+        controls.stop()
+        _pipeline.stop()
+        _mouse.stop()
+        if _stream is not None:
+            if _stream.sent:
+                print(f"Stream: {_stream.sent} messages, {_stream.dropped} dropped for slow subscribers")
+            _stream.stop()
+            _stream = None
+
+        camera.stop()
+        _display.clear()
         cap.release()
-        cv2.destroyAllWindows()
-        hand_landmarker.close()
+        if not HEADLESS:
+            cv2.destroyAllWindows()
+        if hand_landmarker is not None:
+            hand_landmarker.close()
+        if _recorder is not None:
+            _recorder.close()
+            _recorder = None
+        if _session is not None:
+            _session.stop()
+            print(_session.summary())
+            _session = None
+
+        print(_metrics.summary())
+        print(_pipeline.summary())
+        print(f"Inference: {_scheduler.completed} processed, {_scheduler.dropped} dropped "
+              f"({_scheduler.drop_ratio():.0%})")
+        if _resolution.changes:
+            print(f"Input resolution: {_resolution.changes} changes, final scale x{_resolution.scale:.2f}")
+        if _gate.passed or _gate.skipped:
+            print(_gate.summary())
+        if _roi.cropped:
+            print(f"ROI: {_roi.cropped} cropped, {_roi.full} full-frame, {_roi.lost} tracks lost")
+        if METRICS_DUMP_PATH:
+            _metrics.dump(METRICS_DUMP_PATH)
+            print("Latency metrics written to", METRICS_DUMP_PATH)
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Hand tracking from the camera.")
+    parser.add_argument("--headless", action="store_true", help="no window or drawing (service mode)")
+    parser.add_argument("--control", metavar="SOCKET", help="control socket path (CONTROL_SOCKET)")
+    args = parser.parse_args()
+    HEADLESS = HEADLESS or args.headless
+    CONTROL_SOCKET = args.control or CONTROL_SOCKET
     main()
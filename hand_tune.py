@@ -0,0 +1,277 @@
+# hand_tune.py
+"""
+Offline auto-tuner: sweeps pipeline settings over a recorded clip on this
+machine and writes the best combination as a profile that
+hand_tracking_cam.py loads at startup instead of its CONFIG defaults.
+
+    python hand_tune.py clip.mp4                       # -> profile.json
+    python hand_tune.py clip.mp4 --budget-ms 40 --min-agreement 0.9
+
+The landmarker runs once per input scale / num_hands / ROI combination
+(VIDEO mode, decode time excluded). Smoothing and gesture-window settings
+only post-process landmarks, so they are swept over the reference run's
+recorded results without running the model again.
+
+Reference = full resolution, the most hands, no ROI crop, default gesture
+window. Agreement is the share of frames whose committed gestures (number
+and operator of every tracked hand) match the reference's.
+"""
+import argparse
+import json
+import os
+import platform
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from hand_metrics import now_ns
+from hand_roi import RoiTracker
+from hand_scale import to_rgb
+from hand_smooth import HandSmoother, handedness_codes
+from hand_temporal import TemporalGestures
+
+
+PROFILE_PATH = str(Path(__file__).parent / "profile.json")
+PROFILE_VERSION = 1
+MODEL_PATH = str(Path(__file__).parent / "hand_landmarker.task")
+
+# Settings a profile may carry (names of hand_tracking_cam CONFIG globals). Not
+# FPS_APPROX: the scheduler already skips frames inference can't keep up with,
+# and a slower camera only adds capture latency
+PROFILE_SETTINGS = ("NUM_HANDS", "INPUT_SCALE", "ROI_TRACKING", "LATENCY_BUDGET_MS",
+                    "SMOOTH_MIN_CUTOFF", "SMOOTH_BETA", "GESTURE_WINDOW", "GESTURE_THRESHOLD")
+
+# Sweep grid
+SCALES = (1.0, 0.8, 0.64, 0.5)        # subset of ResolutionController.LEVELS
+HAND_COUNTS = (2, 1)
+ROI_MODES = (False, True)
+GESTURE_WINDOWS = ((3, 0.67), (5, 0.6), (7, 0.57))    # (window, threshold)
+SMOOTHING = ((0.5, 0.01), (1.0, 0.02), (1.5, 0.05), (2.0, 0.1))   # (min_cutoff, beta)
+DEFAULT_WINDOW = (5, 0.6)
+DEFAULT_SMOOTHING = (1.0, 0.02)
+
+
+def create_landmarker(model_path, num_hands):
+    # VIDEO mode: synchronous detect_for_video, so per-frame latency is measurable
+    from mediapipe.tasks.python.core.base_options import BaseOptions
+    from mediapipe.tasks.python.vision import HandLandmarker, HandLandmarkerOptions, RunningMode
+    options = HandLandmarkerOptions(
+        base_options=BaseOptions(model_asset_path=model_path),
+        running_mode=RunningMode.VIDEO,
+        num_hands=num_hands,
+    )
+    return HandLandmarker.create_from_options(options)
+
+
+def run_landmarker(clip, scale=1.0, num_hands=2, roi=False, model_path=MODEL_PATH,
+                   landmarker_factory=create_landmarker, max_frames=None):
+    """
+    One pass over the clip. Returns a dict with per-frame latency (ms:
+    color conversion/crop + inference + remap), the detected hands
+    (MediaPipe landmark lists, full-frame coordinates), handedness codes,
+    timestamps and the frame size.
+    """
+    import mediapipe as mp
+
+    cap = cv2.VideoCapture(clip)
+    if not cap.isOpened():
+        raise OSError(f"cannot open {clip}")
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    landmarker = landmarker_factory(model_path, num_hands)
+    tracker = RoiTracker(max_hands=num_hands) if roi else None
+    latencies, hands, sides, timestamps = [], [], [], []
+    frame_rgb = None
+    size = None
+    try:
+        while max_frames is None or len(latencies) < max_frames:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            h, w = frame.shape[:2]
+            size = (w, h)
+            ts = int(len(latencies) * 1000 / fps)
+
+            t = now_ns()
+            crop = tracker.plan(ts, w, h) if tracker is not None else None
+            if crop is not None:
+                image = tracker.prepare(frame, crop, scale)
+            else:
+                image = frame_rgb = to_rgb(frame, scale, frame_rgb)
+            result = landmarker.detect_for_video(mp.Image(image_format=mp.ImageFormat.SRGB, data=image), ts)
+            found = list(result.hand_landmarks or [])
+            if crop is not None:
+                RoiTracker.remap(found, crop, w, h)
+            if tracker is not None:
+                tracker.update(found, ts)
+            latencies.append((now_ns() - t) / 1e6)
+
+            hands.append(found)
+            sides.append(handedness_codes(result))
+            timestamps.append(ts)
+    finally:
+        cap.release()
+        landmarker.close()
+    return {"latency_ms": np.array(latencies), "hands": hands, "sides": sides,
+            "timestamps": timestamps, "size": size}
+
+
+def committed_gestures(run, window=DEFAULT_WINDOW, smoothing=DEFAULT_SMOOTHING):
+    """Per frame: sorted tuple of (number, op) committed for every tracked hand."""
+    w, h = run["size"]
+    smoother = HandSmoother(max_hands=max(HAND_COUNTS), min_cutoff=smoothing[0], beta=smoothing[1])
+    temporal = TemporalGestures(window=window[0], threshold=window[1])
+    frames, commits = [], 0
+    for found, sides, ts in zip(run["hands"], run["sides"], run["timestamps"]):
+        ids = []
+        if found:
+            raw = np.array([[(lm.x, lm.y) for lm in hand] for hand in found]) * (w, h)
+            ids = smoother.update(raw, sides, ts)[1].tolist()
+        commits += len(temporal.update(found, ids, sides))
+        frames.append(tuple(sorted((str(temporal.committed(t, "number")), str(temporal.committed(t, "op")))
+                                   for t in ids if t >= 0)))
+    return frames, commits
+
+
+def agreement(frames, reference):
+    if not reference:
+        return 1.0
+    return sum(a == b for a, b in zip(frames, reference)) / len(reference)
+
+
+def smoothing_error(run, min_cutoff, beta):
+    """
+    (lag, jitter) of the smoothed landmarks in pixels: lag = mean distance
+    to the raw landmarks, jitter = mean frame-to-frame acceleration.
+    """
+    w, h = run["size"]
+    smoother = HandSmoother(max_hands=max(HAND_COUNTS), min_cutoff=min_cutoff, beta=beta)
+    lag, jitter = [], []
+    history = {}   # track -> last two smoothed positions
+    for found, sides, ts in zip(run["hands"], run["sides"], run["timestamps"]):
+        if not found:
+            history.clear()
+            continue
+        raw = np.array([[(lm.x, lm.y) for lm in hand] for hand in found]) * (w, h)
+        smoothed, ids = smoother.update(raw, sides, ts)
+        lag.append(np.linalg.norm(smoothed - raw, axis=-1).mean())
+        for pts, track in zip(smoothed, ids.tolist()):
+            prev = history.get(track)
+            if prev is not None and len(prev) == 2:
+                jitter.append(np.linalg.norm(pts - 2 * prev[1] + prev[0], axis=-1).mean())
+            history[track] = ((prev[-1],) if prev else ()) + (pts,)
+    return (float(np.mean(lag)) if lag else 0.0, float(np.mean(jitter)) if jitter else 0.0)
+
+
+def tune(clip, model_path=MODEL_PATH, budget_ms=33.0, min_agreement=0.95, max_frames=None,
+         landmarker_factory=create_landmarker, log=print):
+    """Runs the sweep; returns the profile dict (settings + every measurement)."""
+    runs = []
+    reference = None
+    for scale in SCALES:
+        for num_hands in HAND_COUNTS:
+            for roi in ROI_MODES:
+                run = run_landmarker(clip, scale, num_hands, roi, model_path, landmarker_factory, max_frames)
+                if run["size"] is None:
+                    raise ValueError(f"no frames in {clip}")
+                lat = run["latency_ms"]
+                frames, _ = committed_gestures(run)
+                if reference is None:
+                    reference, reference_run = frames, run   # first combination is the reference
+                entry = {"scale": scale, "num_hands": num_hands, "roi": roi,
+                         "frames": int(len(lat)),
+                         "fps": float(len(lat) / max(lat.sum() / 1000, 1e-9)),
+                         "p50_ms": float(np.percentile(lat, 50)) if len(lat) else 0.0,
+                         "p99_ms": float(np.percentile(lat, 99)) if len(lat) else 0.0,
+                         "agreement": agreement(frames, reference)}
+                runs.append(entry)
+                log(f"scale {scale:<4} hands {num_hands} roi {'on ' if roi else 'off'}  "
+                    f"{entry['fps']:6.1f} fps  p50 {entry['p50_ms']:6.1f} ms  p99 {entry['p99_ms']:6.1f} ms  "
+                    f"agreement {entry['agreement']:.1%}")
+
+    # Fastest combination that agrees with the reference and holds the budget;
+    # otherwise the agreeing one with the lowest p99
+    agreeing = [r for r in runs if r["agreement"] >= min_agreement] or runs[:1]
+    in_budget = [r for r in agreeing if r["p99_ms"] <= budget_ms]
+    best = max(in_budget, key=lambda r: r["fps"]) if in_budget else min(agreeing, key=lambda r: r["p99_ms"])
+
+    # Shortest gesture window that still agrees and doesn't flicker more than the default
+    ref_frames, ref_commits = committed_gestures(reference_run, DEFAULT_WINDOW)
+    windows = []
+    for window in GESTURE_WINDOWS:
+        frames, commits = committed_gestures(reference_run, window)
+        windows.append({"window": window[0], "threshold": window[1], "commits": commits,
+                        "agreement": agreement(frames, ref_frames)})
+    ok = [w for w in windows if w["agreement"] >= min_agreement and w["commits"] <= ref_commits * 1.1]
+    window = min(ok, key=lambda w: w["window"]) if ok else {"window": DEFAULT_WINDOW[0],
+                                                             "threshold": DEFAULT_WINDOW[1]}
+
+    # Least lag among smoothing settings no more jittery than the defaults
+    smoothing = []
+    for min_cutoff, beta in SMOOTHING:
+        lag, jitter = smoothing_error(reference_run, min_cutoff, beta)
+        smoothing.append({"min_cutoff": min_cutoff, "beta": beta, "lag_px": lag, "jitter_px": jitter})
+    default_jitter = smoothing_error(reference_run, *DEFAULT_SMOOTHING)[1]
+    steady = [s for s in smoothing if s["jitter_px"] <= default_jitter * 1.05]
+    smooth = min(steady, key=lambda s: s["lag_px"]) if steady else {"min_cutoff": DEFAULT_SMOOTHING[0],
+                                                                    "beta": DEFAULT_SMOOTHING[1]}
+
+    settings = {
+        "NUM_HANDS": best["num_hands"],
+        "INPUT_SCALE": best["scale"],
+        "ROI_TRACKING": best["roi"],
+        "LATENCY_BUDGET_MS": round(budget_ms),   # whole ms, like the CONFIG default
+        "SMOOTH_MIN_CUTOFF": smooth["min_cutoff"],
+        "SMOOTH_BETA": smooth["beta"],
+        "GESTURE_WINDOW": window["window"],
+        "GESTURE_THRESHOLD": window["threshold"],
+    }
+    return {
+        "version": PROFILE_VERSION,
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "machine": {"node": platform.node(), "processor": platform.processor() or platform.machine(),
+                    "cpus": os.cpu_count()},
+        "clip": os.path.abspath(clip),
+        "settings": settings,
+        "measurements": {"landmarker": runs, "gesture_windows": windows, "smoothing": smoothing},
+    }
+
+
+def save_profile(profile, path=PROFILE_PATH):
+    with open(path, "w") as f:
+        json.dump(profile, f, indent=2)
+
+
+def load_profile(path=PROFILE_PATH):
+    """Settings of a saved profile, or None if missing/unreadable/outdated."""
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if data.get("version") != PROFILE_VERSION:
+        return None
+    settings = data.get("settings") or {}
+    return {k: v for k, v in settings.items() if k in PROFILE_SETTINGS}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tune pipeline settings on a recorded clip.")
+    parser.add_argument("clip", help="video recorded with this machine's camera")
+    parser.add_argument("-o", "--output", default=PROFILE_PATH, help="profile to write")
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--budget-ms", type=float, default=33.0, help="p99 latency budget per frame")
+    parser.add_argument("--min-agreement", type=float, default=0.95,
+                        help="minimum gesture agreement with the reference run")
+    parser.add_argument("--max-frames", type=int, help="only use the first N frames")
+    args = parser.parse_args()
+
+    profile = tune(args.clip, args.model, args.budget_ms, args.min_agreement, args.max_frames)
+    save_profile(profile, args.output)
+    print("Best settings:", ", ".join(f"{k}={v}" for k, v in profile["settings"].items()))
+    print("Profile written to", args.output)
+
+
+if __name__ == "__main__":
+    main()
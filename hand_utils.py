@@ -1,4 +1,8 @@
 import math
+
+import numpy as np
+
+
 class HandUtils:
     
     FINGER_TIPS = {
@@ -89,6 +93,10 @@ class HandUtils:
     #returns dictionary of finger states (extended or not)
     @staticmethod
     def get_finger_states(hand):
+        if isinstance(hand, np.ndarray):
+            from hand_vec import HandVec
+            return HandVec.code_to_states(HandVec.finger_codes(hand)[0])
+
         fingers = {}
 
         # Index, middle, ring, pinky
@@ -105,6 +113,11 @@ class HandUtils:
     #returns finger direction
     @staticmethod
     def finger_direction(hand, tip, base, deadzone=0.02):
+        if isinstance(hand, np.ndarray):
+            from hand_vec import HandVec
+            code = HandVec.directions(hand, [tip], [base], deadzone)[0, 0]
+            return HandVec.DIRECTION_NAMES[code]
+
         dx = hand[tip].x - hand[base].x
         dy = hand[tip].y - hand[base].y
 
@@ -139,6 +152,11 @@ class HandUtils:
 
     @staticmethod
     def recognize_number(hand, f):
+        if isinstance(hand, np.ndarray):
+            from hand_vec import HandVec
+            num = HandVec.recognize_numbers(hand, [HandUtils.finger_code(f)])[0]
+            return int(num) if num else None
+
         if not HandUtils.all_extended_fingers_up(hand, f):
             return None
         code = HandUtils.finger_code(f)
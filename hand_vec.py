@@ -0,0 +1,137 @@
+import numpy as np
+
+from hand_utils import HandUtils
+
+
+class HandVec:
+    """
+    Batched gesture engine. Works on (N, 21, 3) landmark arrays instead of
+    one MediaPipe landmark at a time; results match HandUtils/HandCalc.
+    """
+
+    # finger_code bits, same layout as HandUtils.finger_code
+    THUMB, INDEX, MIDDLE, RING, PINKY = 1, 2, 4, 8, 16
+
+    # Index, middle, ring, pinky joints
+    TIPS = np.array([8, 12, 16, 20])
+    PIPS = np.array([6, 10, 14, 18])
+    MCPS = np.array([5, 9, 13, 17])
+    FINGER_BITS = np.array([2, 4, 8, 16])
+
+    # Direction codes (index into DIRECTION_NAMES)
+    NEUTRAL, LEFT, RIGHT, UP, DOWN = 0, 1, 2, 3, 4
+    DIRECTION_NAMES = ("neutral", "left", "right", "up", "down")
+
+    # Operator codes (index into OP_SYMBOLS), 0 = no operator
+    OP_SYMBOLS = (None, "=", "-", "+", "*", "/")
+
+    # finger_code -> number (0 = not a number)
+    NUMBER_LUT = np.zeros(32, dtype=np.int8)
+    for _code, _num in HandUtils.NUMBER_MAP.items():
+        NUMBER_LUT[_code] = _num
+
+    # finger_code -> operator code; every extended finger must also point left
+    OP_LUT = np.zeros(32, dtype=np.int8)
+    OP_LUT[0] = 1    # fist -> "="
+    OP_LUT[2] = 2    # index -> "-"
+    OP_LUT[6] = 3    # index + middle -> "+"
+    OP_LUT[14] = 4   # index + middle + ring -> "*"
+    OP_LUT[30] = 5   # index + middle + ring + pinky -> "/"
+    del _code, _num
+
+    @staticmethod
+    def from_landmarks(hands):
+        # list of MediaPipe landmark lists -> (N, 21, 3) float32
+        arr = np.empty((len(hands), 21, 3), dtype=np.float32)
+        for i, hand in enumerate(hands):
+            arr[i] = [(lm.x, lm.y, lm.z) for lm in hand]
+        return arr
+
+    @staticmethod
+    def _xy(hands):
+        # float64 so thresholds behave exactly like the math.hypot path
+        hands = np.asarray(hands)
+        if hands.ndim == 2:
+            hands = hands[None]
+        return hands[..., :2].astype(np.float64)
+
+    @staticmethod
+    def finger_codes(hands, right=True, threshold=0.04, palm_margin=0.04):
+        """
+        Finger-state bitcodes for every hand, shape (N,) uint8.
+        right: bool or (N,) bool array of handedness (default assumes right hand).
+        """
+        xy = HandVec._xy(hands)
+
+        # Index, middle, ring, pinky: tip-to-MCP vs PIP-to-MCP
+        mcp = xy[:, HandVec.MCPS]
+        tip_dist = np.hypot(*np.moveaxis(xy[:, HandVec.TIPS] - mcp, -1, 0))
+        pip_dist = np.hypot(*np.moveaxis(xy[:, HandVec.PIPS] - mcp, -1, 0))
+        extended = tip_dist > pip_dist + threshold
+        codes = (extended * HandVec.FINGER_BITS).sum(axis=1)
+
+        # Thumb: points outward from the palm and does not cross it
+        v = xy[:, 4] - xy[:, 2]
+        wv = xy[:, 2] - xy[:, 0]
+        dot = (v * wv).sum(axis=1)
+        outward = (dot > 0) & (np.hypot(v[:, 0], v[:, 1]) > 0.04)
+        tip_x = xy[:, 4, 0]
+        index_mcp_x = xy[:, 5, 0]
+        right = np.broadcast_to(np.asarray(right, dtype=bool), tip_x.shape)
+        not_across = np.where(right,
+                              tip_x < index_mcp_x - palm_margin,
+                              tip_x > index_mcp_x + palm_margin)
+        codes = codes + (outward & not_across)
+
+        return codes.astype(np.uint8)
+
+    @staticmethod
+    def directions(hands, tips, bases, deadzone=0.02):
+        # Direction codes of tip relative to base, shape (N, len(tips))
+        xy = HandVec._xy(hands)
+        d = xy[:, np.asarray(tips)] - xy[:, np.asarray(bases)]
+        dx, dy = d[..., 0], d[..., 1]
+        adx, ady = np.abs(dx), np.abs(dy)
+
+        horiz = np.where(dx < 0, HandVec.LEFT, HandVec.RIGHT)
+        vert = np.where(dy < 0, HandVec.UP, HandVec.DOWN)
+        out = np.where(adx > ady, horiz, vert)
+        out[(adx < deadzone) & (ady < deadzone)] = HandVec.NEUTRAL
+        return out.astype(np.uint8)
+
+    @staticmethod
+    def _finger_mask(codes):
+        # (N,) codes -> (N, 4) bool for index, middle, ring, pinky
+        return (np.asarray(codes, dtype=np.uint8)[:, None] & HandVec.FINGER_BITS) != 0
+
+    @staticmethod
+    def recognize_numbers(hands, codes=None):
+        # Numbers per hand, shape (N,) int8 with 0 meaning "no number"
+        if codes is None:
+            codes = HandVec.finger_codes(hands)
+        codes = np.asarray(codes, dtype=np.uint8)
+        up = HandVec.directions(hands, HandVec.TIPS, HandVec.TIPS - 3) == HandVec.UP
+        ok = (up | ~HandVec._finger_mask(codes)).all(axis=1)
+        return np.where(ok, HandVec.NUMBER_LUT[codes], 0).astype(np.int8)
+
+    @staticmethod
+    def recognize_ops(hands, codes=None):
+        # Operator codes per hand, shape (N,) int8; see OP_SYMBOLS
+        if codes is None:
+            codes = HandVec.finger_codes(hands)
+        codes = np.asarray(codes, dtype=np.uint8)
+        left = HandVec.directions(hands, HandVec.TIPS, HandVec.PIPS) == HandVec.LEFT
+        ok = (left | ~HandVec._finger_mask(codes)).all(axis=1)
+        return np.where(ok, HandVec.OP_LUT[codes], 0).astype(np.int8)
+
+    @staticmethod
+    def code_to_states(code):
+        # Bitcode -> dict in the same shape as HandUtils.get_finger_states
+        code = int(code)
+        return {
+            "index": bool(code & HandVec.INDEX),
+            "middle": bool(code & HandVec.MIDDLE),
+            "ring": bool(code & HandVec.RING),
+            "pinky": bool(code & HandVec.PINKY),
+            "thumb": bool(code & HandVec.THUMB),
+        }
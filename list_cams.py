@@ -1,7 +1,14 @@
-import cv2
+import argparse
 
-for i in range(6):
-    cap = cv2.VideoCapture(i)
-    if cap.isOpened():
-        print("Camera index", i, "is available")
-        cap.release()
+from hand_cams import CACHE_PATH, MAX_INDEX, PROBE_TIMEOUT_S, best_device, discover, format_devices, save_cache
+
+parser = argparse.ArgumentParser(description="Probe camera indices (in parallel) and cache the result.")
+parser.add_argument("--max-index", type=int, default=MAX_INDEX, help="probe indices below this")
+parser.add_argument("--timeout", type=float, default=PROBE_TIMEOUT_S, help="seconds to wait for all probes")
+parser.add_argument("--cache", default=CACHE_PATH, help="where hand_tracking_cam.py looks for the result")
+args = parser.parse_args()
+
+devices = discover(range(args.max_index), args.timeout)
+print(format_devices(devices))
+save_cache(devices, args.cache)
+print("Best camera:", best_device(devices), "(cached in", args.cache + ")")
@@ -0,0 +1,12 @@
+from hand_loader import LandmarkerLoader
+
+
+def test_only_the_warmup_result_is_swallowed():
+    got = []
+    loader = LandmarkerLoader("unused.task", result_callback=lambda r, img, ts: got.append(ts))
+    # Warm-up result arriving after the first real frame's
+    loader._on_result("real", None, loader.warmup_timestamp_ms + 33)
+    loader._on_result("warm-up", None, loader.warmup_timestamp_ms)
+    loader._on_result("real", None, loader.warmup_timestamp_ms + 66)
+    assert got == [loader.warmup_timestamp_ms + 33, loader.warmup_timestamp_ms + 66]
+    assert loader._warm.is_set()
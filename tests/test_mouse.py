@@ -0,0 +1,62 @@
+import time
+
+import hand_tracking_cam as htc
+from hand_mouse import MouseController, RecordingBackend
+
+
+class _NoDisplay(RecordingBackend):
+    def open(self):
+        raise RuntimeError("no display")
+
+
+def _wait(predicate, timeout=5.0):
+    end = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < end, "timed out"
+        time.sleep(0.001)
+
+
+def test_backend_open_failure_stops_the_controller():
+    mouse = MouseController(_NoDisplay())
+    mouse.start()
+    _wait(lambda: not mouse.running)
+    assert isinstance(mouse.error, RuntimeError)
+
+    # No thread to send them: clicks are not queued
+    mouse.press()
+    mouse.release()
+    assert not mouse._events
+    mouse.stop()
+
+    # start() tries again with a working backend
+    mouse.backend = RecordingBackend()
+    mouse.start()
+    try:
+        assert mouse.running and mouse.error is None
+        mouse.set_target(0.5, 0.5)
+        mouse.press()
+        _wait(lambda: any(e[1] == "down" for e in mouse.backend.events))
+    finally:
+        mouse.stop()
+
+
+def test_failed_backend_turns_mouse_control_and_draw_back(monkeypatch):
+    monkeypatch.setattr(htc, "_mouse", MouseController(_NoDisplay()))
+    monkeypatch.setattr(htc, "MOUSE_CONTROL", False)
+    monkeypatch.setattr(htc, "DRAW", True)
+    try:
+        htc.handle_key(ord("m"))
+        assert htc.MOUSE_CONTROL and not htc.DRAW
+        _wait(lambda: htc._mouse.error is not None)
+
+        htc.check_mouse_backend()
+        assert not htc.MOUSE_CONTROL and htc.DRAW
+
+        # The next 'm' is a normal toggle again
+        htc._mouse.backend = RecordingBackend()
+        htc.handle_key(ord("m"))
+        assert htc.MOUSE_CONTROL and not htc.DRAW
+        htc.check_mouse_backend()
+        assert htc.MOUSE_CONTROL and htc._mouse.running
+    finally:
+        htc._mouse.stop()
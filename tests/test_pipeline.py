@@ -0,0 +1,71 @@
+import threading
+import time
+
+import numpy as np
+
+import hand_tracking_cam as htc
+from hand_metrics import now_ns
+from hand_pipeline import Pipeline
+from hand_synth import ANGLE_UP, synth_hand, to_result
+
+
+def _job(code, ts):
+    hands = np.stack([synth_hand(code, ANGLE_UP)])
+    frame = np.zeros((480, 640, 3), np.uint8)
+    return htc._FrameJob(to_result(hands), ts, now_ns(), None, None, frame, None)
+
+
+def _wait(predicate, timeout=5.0):
+    end = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < end, "timed out"
+        time.sleep(0.001)
+
+
+def test_full_actions_queue_loses_no_commit(monkeypatch):
+    monkeypatch.setattr(htc, "CALCULATOR", True)
+    htc._smoother.reset()
+    htc._temporal.reset()
+    htc._calc.clear()
+
+    produced, fed = [], []
+    update, feed = htc._temporal.update, htc._calc.feed
+
+    def recording_update(hands, track_ids, *args, **kwargs):
+        commits = update(hands, track_ids, *args, **kwargs)
+        produced.extend(commits)
+        return commits
+
+    def recording_feed(kind, value):
+        fed.append(value)
+        feed(kind, value)
+
+    monkeypatch.setattr(htc._temporal, "update", recording_update)
+    monkeypatch.setattr(htc._calc, "feed", recording_feed)
+
+    # The actions worker holds the first job until every other job has passed
+    # features, so the actions queue (size 1) overflows on each put
+    release = threading.Event()
+
+    def held_actions(job):
+        release.wait(5.0)
+        return htc.run_actions(job)
+
+    pipeline = Pipeline([("features", htc.extract_features), ("actions", held_actions)], maxsize=1)
+    pipeline.start()
+    try:
+        features = pipeline.stages[0]
+        ts = 0
+        for code in [2] * 8 + [6] * 8:   # "1" held, then "2" held
+            ts += 33
+            pipeline.put(_job(code, ts))
+            _wait(lambda: features.processed == ts // 33)
+        assert pipeline.stages[1].dropped > 0
+        release.set()
+        _wait(lambda: not pipeline.stages[1].queue)
+    finally:
+        release.set()
+        pipeline.stop()
+
+    # Every commit the voter made reached the calculator
+    assert [value for _, _, value in produced if value is not None] == fed
@@ -0,0 +1,25 @@
+import json
+
+import hand_tracking_cam as htc
+from hand_tune import PROFILE_VERSION
+
+
+def test_profile_values_must_fit_the_config_types(tmp_path, monkeypatch):
+    for name in ("NUM_HANDS", "INPUT_SCALE", "ROI_TRACKING", "LATENCY_BUDGET_MS", "GESTURE_WINDOW",
+                 "GESTURE_THRESHOLD", "SMOOTH_MIN_CUTOFF", "SMOOTH_BETA", "FPS_APPROX"):
+        monkeypatch.setattr(htc, name, getattr(htc, name))
+    monkeypatch.setattr(htc, "_smoother", htc._smoother)
+    monkeypatch.setattr(htc, "_temporal", htc._temporal)
+    monkeypatch.setattr(htc._roi, "max_hands", htc._roi.max_hands)
+    for name in ("budget_ms", "enabled", "level"):
+        monkeypatch.setattr(htc._resolution, name, getattr(htc._resolution, name))
+    path = tmp_path / "profile.json"
+    path.write_text(json.dumps({"version": PROFILE_VERSION, "settings": {
+        "NUM_HANDS": 1, "INPUT_SCALE": 0.8, "LATENCY_BUDGET_MS": 40.0, "GESTURE_WINDOW": 3,
+        "ROI_TRACKING": "yes", "GESTURE_THRESHOLD": 5, "SMOOTH_BETA": "0.1", "FPS_APPROX": 7}}))
+
+    assert htc.apply_profile(str(path))
+    assert (htc.NUM_HANDS, htc.INPUT_SCALE, htc.LATENCY_BUDGET_MS, htc.GESTURE_WINDOW) == (1, 0.8, 40, 3)
+    assert type(htc.LATENCY_BUDGET_MS) is int
+    # Wrong type or out of range: defaults kept; FPS_APPROX is not a profile setting
+    assert (htc.ROI_TRACKING, htc.GESTURE_THRESHOLD, htc.SMOOTH_BETA, htc.FPS_APPROX) == (False, 0.6, 0.02, 20)
@@ -0,0 +1,57 @@
+import cv2
+import numpy as np
+
+from hand_metrics import now_ns
+from hand_session import SessionRecorder
+
+
+def _video_frames(path):
+    cap = cv2.VideoCapture(str(path))
+    frames = []
+    while True:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        frames.append(int(frame[0, 0, 1]))   # which input frame it shows
+    cap.release()
+    return frames
+
+
+def test_video_keeps_real_time_at_a_low_frame_rate(tmp_path):
+    fps = 20
+    recorder = SessionRecorder(tmp_path, (64, 48), fps=fps, segment_s=60).start()
+    t0 = now_ns()
+    # Three frames at 2 fps (motion gate idling) and one that falls into a filled slot
+    for value, seconds in ((50, 0.0), (100, 0.5), (150, 1.0), (200, 1.01)):
+        frame = np.full((48, 64, 3), value, np.uint8)
+        assert recorder.add_frame(frame, t0 + int(seconds * 1e9))
+    recorder.stop()
+
+    frames = _video_frames(recorder.segments[0].with_suffix(".avi"))
+    assert len(frames) == fps + 1   # 1 s of video plus the last frame
+    shown = [round(v / 50) * 50 for v in frames]
+    assert shown[fps // 2 - 1] == 50 and shown[fps // 2] == 100 and shown[-1] == 150
+
+
+def test_segments_of_earlier_runs_count_towards_keep_segments(tmp_path):
+    old = [tmp_path / f"session_20200101_000000_{i:04d}" for i in (1, 2, 3)]
+    for base in old:
+        base.with_suffix(".avi").write_bytes(b"")
+        base.with_suffix(".hlr").write_bytes(b"")
+
+    recorder = SessionRecorder(tmp_path, (64, 48), keep_segments=2).start()
+    assert recorder.segments == old
+    recorder.add_frame(np.zeros((48, 64, 3), np.uint8))
+    recorder.stop()
+
+    assert recorder.segments[0] == old[2] and len(recorder.segments) == 2
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted(
+        base.with_suffix(suffix).name for base in recorder.segments for suffix in (".avi", ".hlr"))
+
+
+def test_landmarks_only_session_writes_no_video(tmp_path):
+    recorder = SessionRecorder(tmp_path, (64, 48), video=False).start()
+    assert not recorder.add_frame(np.zeros((48, 64, 3), np.uint8))
+    assert recorder.add_landmarks(33, np.zeros((1, 21, 3), np.float32))
+    recorder.stop()
+    assert [p.suffix for p in tmp_path.iterdir()] == [".hlr"]
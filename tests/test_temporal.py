@@ -0,0 +1,17 @@
+import numpy as np
+
+from hand_smooth import LEFT, RIGHT
+from hand_synth import ANGLE_UP, number_poses, synth_hand, to_landmarks
+from hand_temporal import TemporalGestures
+
+
+def test_left_hands_commit_the_same_numbers():
+    for number, code in number_poses():
+        right = np.stack([synth_hand(code, ANGLE_UP)])
+        left = np.stack([synth_hand(code, ANGLE_UP, right=False)])
+        for hands, sides in ((right, [RIGHT]), (left, [LEFT])):
+            temporal = TemporalGestures(window=3, threshold=0.6)
+            lists = [to_landmarks(h) for h in hands]
+            for _ in range(3):
+                temporal.update(lists, [0], sides)
+            assert temporal.committed(0, "number") == number